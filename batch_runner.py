@@ -0,0 +1,158 @@
+"""Headless batch runner: run a JSONL file of prompts through the chatbot classes.
+
+Each input line is a JSON object with a "prompt" and optionally "id",
+"provider", "model", "system_prompt" and "options". Results are appended to the
+output JSONL as they complete, and the output file doubles as the checkpoint:
+re-running the same command skips ids that already have a successful result
+and retries the ones that failed. With --cache, prompts run at temperature 0
+reuse replies from response_cache.db.
+
+    python batch_runner.py prompts.jsonl results.jsonl --provider Ollama --model gemma2:2b -j 4
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from PyQt5.QtCore import Qt
+from utils.controllers import create_chatbot, LOCAL_PROVIDERS
+from providers.rate_limiter import BACKGROUND
+from database.response_cache import open_response_cache
+
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+
+ERROR_PREFIX = "Sorry, there was an error"
+
+
+def read_prompts(path):
+    """Yield prompt records, assigning the line number as id when none is given."""
+    with open(path, 'r', encoding='utf-8') as file:
+        for line_number, line in enumerate(file, 1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            record.setdefault("id", line_number)
+            yield record
+
+
+def load_checkpoint(path):
+    """Return the ids that already have a successful result in the output file."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                result = json.loads(line)
+                if result.get("error") is None:
+                    done.add(result["id"])
+            except (ValueError, KeyError):
+                continue  # A line cut short by an interruption is simply re-run
+    return done
+
+
+def run_prompt(record, provider, model, system_prompt, response_cache=None):
+    """Run one prompt to completion in the calling thread and return its result."""
+    provider = record.get("provider", provider)
+    model = record.get("model", model)
+    # Cloud requests yield to interactive chat in the provider's rate-limit queue
+    kwargs = {} if provider in LOCAL_PROVIDERS else {"priority": BACKGROUND}
+    if response_cache is not None:
+        kwargs["response_cache"] = response_cache
+    chatbot = create_chatbot(provider, model,
+                             system_prompt=record.get("system_prompt", system_prompt),
+                             options=record.get("options"), **kwargs)
+    replies = []
+    # The runner has no Qt event loop, so the slot must run in the emitting thread
+    chatbot.response_signal.connect(replies.append, Qt.DirectConnection)
+    chatbot.run_chatbot(record["prompt"])
+
+    response = replies[-1] if replies else None
+    error = chatbot.last_error or (None if response is not None else "No response")
+    return {
+        "id": record["id"],
+        "provider": provider,
+        "model": model,
+        "prompt": record["prompt"],
+        "response": None if error else response,
+        "error": error,
+        "stats": chatbot.last_stats,
+    }
+
+
+def run_batch(input_path, output_path, provider, model, system_prompt, concurrency, response_cache=None):
+    done = load_checkpoint(output_path)
+    pending = [record for record in read_prompts(input_path) if record["id"] not in done]
+    if done:
+        logging.info(f"Resuming: {len(done)} prompts already done, {len(pending)} remaining")
+
+    # Make sure a torn last line from an interrupted run doesn't swallow the next result
+    if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+        with open(output_path, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            needs_newline = file.read(1) != b"\n"
+    else:
+        needs_newline = False
+
+    write_lock = threading.Lock()
+    completed = failed = tokens = 0
+    started = time.perf_counter()
+
+    with open(output_path, 'a', encoding='utf-8') as output, \
+            ThreadPoolExecutor(max_workers=concurrency) as executor:
+        if needs_newline:
+            output.write("\n")
+        futures = {executor.submit(run_prompt, record, provider, model, system_prompt, response_cache): record
+                   for record in pending}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                record = futures[future]
+                result = {"id": record["id"], "prompt": record["prompt"], "response": None,
+                          "error": f"{ERROR_PREFIX}: {e}", "stats": None}
+            with write_lock:
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+            completed += 1
+            failed += result["error"] is not None
+            if result["stats"]:
+                tokens += result["stats"]["tokens"]
+            if completed % 10 == 0 or completed == len(pending):
+                logging.info(f"{completed}/{len(pending)} prompts done")
+
+    elapsed = time.perf_counter() - started
+    if completed:
+        logging.info(f"Finished {completed} prompts ({failed} failed) in {elapsed:.1f}s: "
+                     f"{completed / elapsed:.2f} prompts/s, {tokens / elapsed:.1f} tokens/s")
+    return failed
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run a JSONL file of prompts without the GUI.")
+    parser.add_argument("input", help="JSONL file of prompts")
+    parser.add_argument("output", help="JSONL file to append results to (also the resume checkpoint)")
+    parser.add_argument("--provider", default="Ollama", help="Default provider for prompts that don't set one")
+    parser.add_argument("--model", help="Default model for prompts that don't set one")
+    parser.add_argument("--system-prompt", default="You are a helpful assistant")
+    parser.add_argument("-j", "--concurrency", type=int, default=1, help="Prompts to run at once")
+    parser.add_argument("--cache", action="store_true",
+                        help="Reuse cached replies for prompts run at temperature 0 (response_cache.db)")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    response_cache = open_response_cache() if args.cache else None
+    try:
+        failures = run_batch(args.input, args.output, args.provider, args.model,
+                             args.system_prompt, max(1, args.concurrency), response_cache)
+    finally:
+        if response_cache is not None:
+            response_cache.close()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,154 @@
+"""Benchmark cases, grouped by the subsystem they exercise.
+
+Each group is a function yielding Case objects after doing its own untimed
+setup. Application modules are imported inside the groups, so a group whose
+dependencies are missing is skipped without affecting the others.
+"""
+import os
+import random
+import shutil
+import stat
+import time
+from benchmarks import generators
+
+DB_SIZES = (10_000, 100_000, 1_000_000)
+MODEL_COUNTS = (50, 500, 2000)
+INSERT_MESSAGES = 1000
+CHAT_MODEL = "bench-model:latest"
+
+_app = None
+
+
+class Case:
+    """A timed callable; setup runs untimed before every repetition.
+
+    run() may return its own measurement in seconds, e.g. time to first token,
+    instead of being timed as a whole.
+    """
+
+    def __init__(self, name, run, setup=None, repeat=5):
+        self.name = name
+        self.run = run
+        self.setup = setup
+        self.repeat = repeat
+
+
+def qt_application():
+    """The QApplication the widget cases need; run.py selects the offscreen platform."""
+    global _app
+    from PyQt5.QtWidgets import QApplication
+    _app = QApplication.instance() or QApplication([])
+    return _app
+
+
+def database_cases(workdir, sizes=DB_SIZES):
+    from database.models import DatabaseService
+
+    for size in sizes:
+        db_path = os.path.join(workdir, f"chat_history_{size}.db")
+        chat_ids = generators.populate_database(db_path, size)
+        db_service = DatabaseService(db_path)
+        middle_chat = chat_ids[len(chat_ids) // 2]
+        rows = list(generators.message_rows([middle_chat], INSERT_MESSAGES, seed=size))
+        repeat = 5 if size < 1_000_000 else 3
+
+        def insert(db_service=db_service, rows=rows):
+            for start in range(0, len(rows), generators.INSERT_BATCH):
+                db_service.save_messages(rows[start:start + generators.INSERT_BATCH])
+
+        yield Case(f"db.open[{size}]", lambda db_path=db_path: DatabaseService(db_path).close(), repeat=repeat)
+        yield Case(f"db.save_messages[{size}]", insert, repeat=repeat)
+        yield Case(f"db.load_chat_messages[{size}]",
+                   lambda db_service=db_service, chat_id=chat_ids[-1]: db_service.load_chat_messages(chat_id),
+                   repeat=repeat)
+        yield Case(f"db.load_chat_history[{size}]", db_service.load_chat_history, repeat=repeat)
+        db_service.close()
+
+
+def model_list_cases(workdir, counts=MODEL_COUNTS):
+    """`ollama list` parsing, alone and end to end through a fake CLI."""
+    from local import ollama_manager
+
+    bin_dir = os.path.join(workdir, "bin")
+    os.makedirs(bin_dir, exist_ok=True)
+    models_file = os.path.join(workdir, "models.json")
+    shutil.copyfile(ollama_manager.MODELS_FILE, models_file)
+    original_models_file = ollama_manager.MODELS_FILE
+    original_path = os.environ.get("PATH", "")
+    ollama_manager.MODELS_FILE = models_file
+    os.environ["PATH"] = bin_dir + os.pathsep + original_path
+    try:
+        for count in counts:
+            output = generators.ollama_list_output(generators.ollama_models(count))
+            output_file = os.path.join(bin_dir, f"list_{count}.txt")
+            with open(output_file, 'w') as file:
+                file.write(output)
+            script = os.path.join(bin_dir, "ollama")
+            yield Case(f"models.parse_ollama_list[{count}]",
+                       lambda output=output: ollama_manager.parse_ollama_list(output))
+            yield Case(f"models.show_ollama_list[{count}]", ollama_manager.show_ollama_list,
+                       setup=lambda script=script, output_file=output_file: _write_fake_cli(script, output_file))
+    finally:
+        ollama_manager.MODELS_FILE = original_models_file
+        os.environ["PATH"] = original_path
+
+
+def _write_fake_cli(script, output_file):
+    with open(script, 'w') as file:
+        file.write(f"#!/bin/sh\ncat '{output_file}'\n")
+    os.chmod(script, os.stat(script).st_mode | stat.S_IXUSR)
+
+
+def model_table_cases(counts=MODEL_COUNTS):
+    """Filling and refreshing the installed-models table through OllamaModelList.process_output."""
+    qt_application()
+    from local.ollama_model_list import OllamaModelList
+
+    window = OllamaModelList()
+    window.worker.wait()  # The initial load from the stub server; its result is never delivered
+    for count in counts:
+        models = generators.ollama_models(count)
+        refreshed = generators.changed_models(models)
+        yield Case(f"models.table_populate[{count}]", lambda models=models: window.process_output(models),
+                   setup=lambda: window.process_output([]))
+        yield Case(f"models.table_refresh[{count}]", lambda refreshed=refreshed: window.process_output(refreshed),
+                   setup=lambda models=models: window.process_output(models))
+        yield Case(f"models.table_filter[{count}]", lambda: window.model.set_filter("qwen"),
+                   setup=lambda: window.model.set_filter(""))
+    window.close()
+
+
+def chat_cases(server, history_lengths=(20, 200)):
+    """Turns through OllamaChatbot against the stub server, which streams server.tokens tokens."""
+    from local.model_registry import registry
+    from local.ollama import OllamaChatbot
+
+    registry.invalidate()
+    if not server.models:
+        server.models = generators.ollama_models(1)
+    server.models[0] = dict(server.models[0], name=CHAT_MODEL, model=CHAT_MODEL)
+    for length in history_lengths:
+        history = generators.conversation(random.Random(length), length)
+        chatbot = OllamaChatbot(CHAT_MODEL)
+        first_token = []
+        chatbot.chunk_signal.connect(lambda _, marks=first_token: marks or marks.append(time.perf_counter()))
+
+        def reset(chatbot=chatbot, history=history, first_token=first_token):
+            chatbot.messages = [{"role": "system", "content": chatbot.system_prompt}] + list(history)
+            first_token.clear()
+
+        def time_to_first_token(chatbot=chatbot, first_token=first_token):
+            started = time.perf_counter()
+            _turn(chatbot)
+            return first_token[0] - started
+
+        yield Case(f"chat.turn[history={length},tokens={server.tokens}]",
+                   lambda chatbot=chatbot: _turn(chatbot), setup=reset)
+        yield Case(f"chat.first_token[history={length}]", time_to_first_token, setup=reset)
+
+
+def _turn(chatbot):
+    chatbot.run_chatbot("Summarize our conversation so far.")
+    if chatbot.messages[-1]["role"] != "assistant":  # Errors are reported through response_signal
+        raise RuntimeError("The chat turn did not produce a reply")
+
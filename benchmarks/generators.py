@@ -0,0 +1,116 @@
+"""Deterministic synthetic data for the benchmarks."""
+import random
+from database.models import DatabaseService
+
+WORDS = (
+    "the model answer question context token python server request stream local cloud "
+    "memory cache prompt message history window thread query result table index batch "
+    "latency faster slower because should would could every other first"
+).split()
+FAMILIES = ["llama", "qwen2", "gemma2", "mistral", "phi3", "deepseek2", "nomic-bert"]
+QUANTIZATIONS = ["Q4_0", "Q4_K_M", "Q5_K_M", "Q8_0", "F16"]
+PARAMETER_SIZES = ["0.5B", "1.5B", "3B", "7B", "8B", "13B", "70B"]
+INSERT_BATCH = 200  # Same batch size the chat writer uses
+
+
+def sentence(rng, min_words=4, max_words=60):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))).capitalize() + "."
+
+
+def message_content(rng, role):
+    """A user question is a sentence or two; an assistant reply a few paragraphs."""
+    if role == "user":
+        return " ".join(sentence(rng, 4, 30) for _ in range(rng.randint(1, 2)))
+    paragraphs = rng.randint(1, 4)
+    return "\n\n".join(" ".join(sentence(rng) for _ in range(rng.randint(1, 4))) for _ in range(paragraphs))
+
+
+def conversation(rng, length):
+    """Alternating {"role", "content"} messages, starting with the user."""
+    roles = ("user", "assistant")
+    return [{"role": roles[i % 2], "content": message_content(rng, roles[i % 2])} for i in range(length)]
+
+
+def message_rows(chat_ids, messages_per_chat, seed=0, pool_size=1000):
+    """Yield (chat_id, role, content) rows, messages_per_chat for each chat.
+
+    Contents are drawn from a pool so a million rows don't take minutes to generate.
+    """
+    rng = random.Random(seed)
+    pools = {role: [message_content(rng, role) for _ in range(pool_size)] for role in ("user", "assistant")}
+    roles = ("user", "assistant")
+    for chat_id in chat_ids:
+        for i in range(messages_per_chat):
+            role = roles[i % 2]
+            yield chat_id, role, rng.choice(pools[role])
+
+
+def populate_database(db_path, message_count, messages_per_chat=50, seed=0):
+    """Fill a chat database with message_count messages; returns the chat ids."""
+    db_service = DatabaseService(db_path)
+    try:
+        chat_count = max(1, message_count // messages_per_chat)
+        rng = random.Random(seed)
+        db_service.conn.executemany("INSERT INTO chats (title) VALUES (?)",
+                                    ((sentence(rng, 2, 8)[:50],) for _ in range(chat_count)))
+        db_service.conn.commit()
+        chat_ids = [row[0] for row in db_service.fetch_all("SELECT id FROM chats ORDER BY id")]
+        batch = []
+        for row in message_rows(chat_ids, messages_per_chat, seed):
+            batch.append(row)
+            if len(batch) == INSERT_BATCH:
+                db_service.save_messages(batch)
+                batch = []
+        if batch:
+            db_service.save_messages(batch)
+        return chat_ids
+    finally:
+        db_service.close()
+
+
+def ollama_models(count, seed=0):
+    """Model entries shaped like the /api/tags response."""
+    rng = random.Random(seed)
+    models = []
+    for i in range(count):
+        family = rng.choice(FAMILIES)
+        parameter_size = rng.choice(PARAMETER_SIZES)
+        name = f"{family}-{i}:{parameter_size.lower()}"
+        models.append({
+            "name": name,
+            "model": name,
+            "modified_at": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T12:00:00Z",
+            "size": rng.randint(300 * 1024 ** 2, 40 * 1024 ** 3),
+            "digest": f"{rng.getrandbits(256):064x}",
+            "details": {
+                "parent_model": "",
+                "format": "gguf",
+                "family": family,
+                "families": [family],
+                "parameter_size": parameter_size,
+                "quantization_level": rng.choice(QUANTIZATIONS),
+            },
+        })
+    return models
+
+
+def ollama_list_output(models):
+    """The table `ollama list` prints for the given models."""
+    lines = [f"{'NAME':<40}{'ID':<16}{'SIZE':<10}MODIFIED"]
+    for model in models:
+        size = f"{model['size'] / 1024 ** 3:.1f} GB"
+        lines.append(f"{model['name']:<40}{model['digest'][:12]:<16}{size:<10}3 weeks ago")
+    return "\n".join(lines) + "\n"
+
+
+def changed_models(models, fraction=0.05, seed=1):
+    """A refreshed copy of models with a fraction removed, added or resized."""
+    rng = random.Random(seed)
+    changes = max(1, int(len(models) * fraction))
+    refreshed = [dict(model) for model in models[changes:]]
+    for model in rng.sample(refreshed, min(changes, len(refreshed))):
+        model["size"] += 1024
+    refreshed.extend(ollama_models(changes, seed=seed + len(models)))
+    for i, model in enumerate(refreshed[-changes:]):
+        model["name"] = model["model"] = f"new-{i}:{model['details']['parameter_size'].lower()}"
+    return refreshed
@@ -0,0 +1,158 @@
+"""Performance regression benchmarks.
+
+Run from the repository root; Qt uses the offscreen platform, so no display is needed:
+
+    python -m benchmarks.run                         # every group, compared with baselines.json
+    python -m benchmarks.run --only db --sizes 10000
+    python -m benchmarks.run --save-baseline         # record this machine's numbers
+
+A case regresses when its best time is more than --threshold slower than its
+baseline's; the best of several runs is far less noisy than the median. The
+exit status is 1 if any case regressed or failed.
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from benchmarks import cases
+from benchmarks.generators import ollama_models
+from benchmarks.stub_ollama import StubOllamaServer
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR = 0.0005  # Seconds; smaller differences are timer noise
+MIN_SAMPLE_TIME = 0.02
+GROUPS = ("db", "models", "table", "chat")
+
+
+def loops_for(case):
+    """How many calls make up one sample, so sub-millisecond cases aren't lost in timer noise."""
+    if case.setup is not None:
+        return 1
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            result = case.run()
+        if isinstance(result, float) or time.perf_counter() - started >= MIN_SAMPLE_TIME:
+            return loops
+        loops *= 2
+
+
+def measure(case):
+    loops = loops_for(case)
+    samples = []
+    for _ in range(case.repeat):
+        if case.setup is not None:
+            case.setup()
+        started = time.perf_counter()
+        for _ in range(loops):
+            result = case.run()
+        elapsed = (time.perf_counter() - started) / loops
+        samples.append(result if isinstance(result, float) else elapsed)
+    return {"median": statistics.median(samples), "min": min(samples)}
+
+
+def compare(result, baseline, threshold):
+    if baseline is None:
+        return "new"
+    change = result["min"] - baseline["min"]
+    if change > max(baseline["min"] * threshold, NOISE_FLOOR):
+        return "REGRESSED"
+    if -change > max(baseline["min"] * threshold, NOISE_FLOOR):
+        return "faster"
+    return "ok"
+
+
+def load_baselines(path):
+    try:
+        with open(path, 'r') as file:
+            return json.load(file).get("cases", {})
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(path, results):
+    baselines = load_baselines(path)
+    baselines.update(results)
+    with open(path, 'w') as file:
+        json.dump({"machine": f"{platform.platform()}, Python {platform.python_version()}",
+                   "cases": dict(sorted(baselines.items()))}, file, indent=4)
+        file.write("\n")
+
+
+def parse_ints(value):
+    return tuple(int(part) for part in value.split(",") if part)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the performance benchmarks.")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"Comma-separated groups: {', '.join(GROUPS)}")
+    parser.add_argument("--sizes", type=parse_ints, default=cases.DB_SIZES, help="Database sizes in messages")
+    parser.add_argument("--model-counts", type=parse_ints, default=cases.MODEL_COUNTS)
+    parser.add_argument("--tokens", type=int, default=256, help="Tokens the stub server streams per reply")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed tokens")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    groups = [group for group in args.only.split(",") if group]
+    unknown = set(groups) - set(GROUPS)
+    if unknown:
+        parser.error(f"Unknown groups: {', '.join(sorted(unknown))}")
+
+    # Point every Ollama client at the stub before any application module is imported
+    server = StubOllamaServer(models=ollama_models(10), tokens=args.tokens, token_delay=args.token_delay).start()
+    os.environ["OLLAMA_HOST"] = server.host
+
+    baselines = load_baselines(args.baseline)
+    results = {}
+    regressed = failed = 0
+    print(f"{'case':<44}{'median ms':>12}{'min ms':>12}{'baseline min':>13}{'change':>9}  status")
+    with tempfile.TemporaryDirectory(prefix="supernova-bench-") as workdir:
+        factories = {
+            "db": lambda: cases.database_cases(workdir, args.sizes),
+            "models": lambda: cases.model_list_cases(workdir, args.model_counts),
+            "table": lambda: cases.model_table_cases(args.model_counts),
+            "chat": lambda: cases.chat_cases(server),
+        }
+        for group in groups:
+            try:
+                for case in factories[group]():
+                    try:
+                        result = measure(case)
+                    except Exception as e:
+                        failed += 1
+                        print(f"{case.name:<44}{'':>46}  FAILED: {e}")
+                        continue
+                    results[case.name] = result
+                    baseline = baselines.get(case.name)
+                    status = compare(result, baseline, args.threshold)
+                    regressed += status == "REGRESSED"
+                    baseline_ms = f"{baseline['min'] * 1000:.2f}" if baseline else "-"
+                    change = f"{result['min'] / baseline['min'] - 1:+.0%}" if baseline else "-"
+                    print(f"{case.name:<44}{result['median'] * 1000:>12.2f}{result['min'] * 1000:>12.2f}"
+                          f"{baseline_ms:>13}{change:>9}  {status}")
+            except ImportError as e:
+                print(f"{group + '.*':<44}{'':>46}  skipped: {e}")
+    server.stop()
+
+    if args.save_baseline:
+        save_baselines(args.baseline, results)
+        print(f"Saved {len(results)} baselines to {args.baseline}")
+    if regressed or failed:
+        print(f"{regressed} regressed, {failed} failed (threshold {args.threshold:.0%})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
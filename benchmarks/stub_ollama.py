@@ -0,0 +1,101 @@
+"""A local stand-in for the Ollama server, so the chat path can be timed without a model."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # Otherwise small streamed chunks stall on delayed ACKs
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/api/version":
+            self.send_json({"version": "0.0.0-stub"})
+        elif self.path == "/api/tags":
+            self.send_json({"models": self.server.models})
+        elif self.path == "/api/ps":
+            self.send_json({"models": []})
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.path == "/api/chat":
+            self.chat(request)
+        elif self.path == "/api/show":
+            self.send_json({"modelfile": "", "parameters": "", "template": "", "details": {}})
+        else:
+            self.send_error(404)
+
+    def chat(self, request):
+        self.server.requests += 1
+        model = request.get("model", "")
+        tokens = self.server.tokens
+        num_predict = (request.get("options") or {}).get("num_predict")
+        if num_predict:
+            tokens = min(tokens, num_predict)
+        created_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        final = {"model": model, "created_at": created_at, "message": {"role": "assistant", "content": ""},
+                 "done": True, "done_reason": "stop", "prompt_eval_count": 1, "eval_count": tokens}
+
+        if not request.get("stream", True):
+            time.sleep(self.server.token_delay * tokens)
+            final["message"]["content"] = "token " * tokens
+            self.send_json(final)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for _ in range(tokens):
+            if self.server.token_delay:
+                time.sleep(self.server.token_delay)
+            self.write_chunk({"model": model, "created_at": created_at,
+                              "message": {"role": "assistant", "content": "token "}, "done": False})
+        self.write_chunk(final)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def write_chunk(self, payload):
+        line = json.dumps(payload).encode() + b"\n"
+        self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+        self.wfile.flush()
+
+
+class StubOllamaServer(ThreadingHTTPServer):
+    """Serves /api/version, /api/tags, /api/ps, /api/show and streaming /api/chat."""
+    daemon_threads = True
+
+    def __init__(self, models=(), tokens=64, token_delay=0.0, port=0):
+        super().__init__(("127.0.0.1", port), StubOllamaHandler)
+        self.models = list(models)
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.requests = 0
+        self.thread = None
+
+    @property
+    def host(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
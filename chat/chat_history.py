@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+from collections import OrderedDict
+from chat.transcript import TranscriptModel
+from database.models import DatabaseService
+
+DEFAULT_CAPACITY = 8
+WRITE_BATCH_SIZE = 200
+
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token) for budgeting context."""
+    return len(text) // 4 + 1
+
+
+class MessageRecord:
+    __slots__ = ("role", "content", "tokens")
+
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+        self.tokens = estimate_tokens(content)
+
+
+class ChatSession:
+    """A chat kept in memory: its messages, chatbot and rendered transcript."""
+    __slots__ = ("chat_id", "title", "messages", "token_count", "chatbot", "transcript", "scroll_value")
+
+    def __init__(self, chat_id, title, messages=(), transcript=None):
+        self.chat_id = chat_id
+        self.title = title
+        self.messages = [MessageRecord(role, content) for role, content in messages]
+        self.token_count = sum(message.tokens for message in self.messages)
+        self.chatbot = None
+        if transcript is None:
+            transcript = TranscriptModel()
+            transcript.set_messages(self.chat_messages())
+        self.transcript = transcript
+        self.scroll_value = None  # None means scrolled to the bottom
+
+    def chat_messages(self):
+        """Messages as the {"role", "content"} dicts chatbots keep their history in."""
+        return [{"role": message.role, "content": message.content} for message in self.messages]
+
+    def add(self, role, content):
+        message = MessageRecord(role, content)
+        self.messages.append(message)
+        self.token_count += message.tokens
+        return message
+
+
+class ChatWriter(threading.Thread):
+    """Saves messages on a background connection so sending never waits on disk."""
+
+    def __init__(self, db_path):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.queue = queue.Queue()
+
+    def save(self, chat_id, role, content):
+        self.queue.put((chat_id, role, content))
+
+    def flush(self):
+        """Block until every queued message has been written."""
+        self.queue.join()
+
+    def run(self):
+        db_service = DatabaseService(self.db_path)
+        try:
+            while True:
+                batch = [self.queue.get()]
+                while len(batch) < WRITE_BATCH_SIZE:
+                    try:
+                        batch.append(self.queue.get_nowait())
+                    except queue.Empty:
+                        break
+                rows = [item for item in batch if item is not None]
+                try:
+                    if rows:
+                        db_service.save_messages(rows)
+                except Exception as e:
+                    logging.error(f"Failed to save {len(rows)} messages: {e}")
+                finally:
+                    for _ in batch:
+                        self.queue.task_done()
+                if len(rows) < len(batch):
+                    break
+        finally:
+            db_service.close()
+
+    def close(self):
+        self.queue.put(None)
+        self.join()
+
+
+class ChatSessionManager:
+    """Keeps the most recently used chats in memory and loads the rest on demand."""
+
+    def __init__(self, db_path="chat_history.db", capacity=DEFAULT_CAPACITY):
+        self.db_path = db_path
+        self.capacity = capacity
+        self.db_service = DatabaseService(db_path)
+        self.sessions = OrderedDict()
+        self.writer = ChatWriter(db_path)
+        self.writer.start()
+
+    def list_chats(self):
+        """(chat_id, title) of every chat, newest first."""
+        return self.db_service.load_chat_history()
+
+    def get(self, chat_id):
+        session = self.sessions.get(chat_id)
+        if session is not None:
+            self.sessions.move_to_end(chat_id)
+            return session
+
+        session = ChatSession(chat_id, *self.load(chat_id))
+        self._insert(session)
+        return session
+
+    def load(self, chat_id):
+        """(title, messages) of a chat, read from the database without caching it."""
+        self.writer.flush()  # Messages of an evicted chat may still be queued
+        title = self.db_service.fetch_all("SELECT title FROM chats WHERE id = ?", (chat_id,))
+        if not title:
+            raise KeyError(f"Chat {chat_id} does not exist")
+        return title[0][0], self.db_service.load_chat_messages(chat_id)
+
+    def add_loaded(self, chat_id, title, messages, transcript=None):
+        """Cache a chat whose messages were read elsewhere, e.g. by the startup restore."""
+        session = self.sessions.get(chat_id)
+        if session is None:
+            session = ChatSession(chat_id, title, messages, transcript)
+            self._insert(session)
+        return session
+
+    def create(self, title):
+        chat_id = self.db_service.create_new_chat(title)
+        session = ChatSession(chat_id, title)
+        self._insert(session)
+        return session
+
+    def add_message(self, session, role, content):
+        """Record a message in memory now and in the database in the background."""
+        session.add(role, content)
+        self.writer.save(session.chat_id, role, content)
+
+    def _insert(self, session):
+        self.sessions[session.chat_id] = session
+        while len(self.sessions) > self.capacity:
+            _, evicted = self.sessions.popitem(last=False)
+            if evicted.chatbot is not None and hasattr(evicted.chatbot, "cancel_prefill"):
+                evicted.chatbot.cancel_prefill()
+
+    def clear(self):
+        self.writer.flush()
+        self.sessions.clear()
+        self.db_service.clear_conversations()
+
+    def close(self):
+        self.writer.close()
+        self.db_service.close()
@@ -1,11 +1,12 @@
-from PyQt5.QtCore import QThread, pyqtSignal
+from PyQt5.QtCore import QThread
 
 class ChatThread(QThread):
-    message_sent = pyqtSignal(str)
+    """Runs one chatbot turn off the UI thread; replies arrive on the chatbot's signals."""
 
-    def __init__(self):
+    def __init__(self, chatbot, user_input):
         super().__init__()
+        self.chatbot = chatbot
+        self.user_input = user_input
 
-    def send_message(self):
-        response = self.chatbot.process_input(self.user_input)
-        self.message_sent.emit(response)
\ No newline at end of file
+    def run(self):
+        self.chatbot.run_chatbot(self.user_input)
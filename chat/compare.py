@@ -0,0 +1,125 @@
+from PyQt5.QtWidgets import (
+    QWidget, QGroupBox, QVBoxLayout, QHBoxLayout, QTextEdit, QLabel,
+    QComboBox, QPushButton, QSpinBox
+)
+from PyQt5.QtCore import QRunnable, QThreadPool
+from PyQt5.QtGui import QTextCursor
+from utils.controllers import CHATBOT_CLASSES, LOCAL_PROVIDERS, create_chatbot, load_provider_models
+
+CLOUD_CONCURRENCY = 8
+
+
+class CompareTask(QRunnable):
+    def __init__(self, chatbot, prompt):
+        super().__init__()
+        self.chatbot = chatbot
+        self.prompt = prompt
+
+    def run(self):
+        self.chatbot.run_chatbot(self.prompt)
+
+
+class ComparePane(QGroupBox):
+    """One provider/model column of the comparison view."""
+
+    def __init__(self, provider, model, parent=None):
+        super().__init__(f"{provider} / {model}", parent)
+        self.provider = provider
+        self.model = model
+        self.chatbot = None
+
+        layout = QVBoxLayout(self)
+        self.output = QTextEdit(self)
+        self.output.setReadOnly(True)
+        layout.addWidget(self.output)
+        self.stats_label = QLabel("Idle", self)
+        layout.addWidget(self.stats_label)
+        self.remove_button = QPushButton("Remove", self)
+        self.remove_button.clicked.connect(self.deleteLater)
+        layout.addWidget(self.remove_button)
+
+    def create_task(self, prompt):
+        """Build a fresh single-turn chatbot for this pane and wrap it in a task."""
+        self.output.clear()
+        self.stats_label.setText("Queued...")
+        self.chatbot = create_chatbot(self.provider, self.model)
+        self.chatbot.chunk_signal.connect(self.append_chunk)
+        self.chatbot.response_signal.connect(self.show_response)
+        return CompareTask(self.chatbot, prompt)
+
+    def append_chunk(self, chunk):
+        self.stats_label.setText("Streaming...")
+        self.output.moveCursor(QTextCursor.End)
+        self.output.insertPlainText(chunk)
+
+    def show_response(self, response):
+        self.output.setPlainText(response)
+        stats = self.chatbot.last_stats
+        if stats is None:
+            self.stats_label.setText("No timing available")
+            return
+        self.stats_label.setText(
+            f"First token: {stats['first_token_latency']:.2f}s | "
+            f"Total: {stats['total_latency']:.2f}s | "
+            f"{stats['tokens']} tokens @ {stats['tokens_per_sec']:.1f} tok/s"
+        )
+
+
+class ComparePanel(QWidget):
+    """Fans one prompt out to several provider/model pairs at once.
+
+    Local models share a pool capped by the concurrency setting so several
+    quantizations don't all load into RAM together; cloud models run in a
+    separate, wider pool.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.local_pool = QThreadPool(self)
+        self.local_pool.setMaxThreadCount(1)
+        self.cloud_pool = QThreadPool(self)
+        self.cloud_pool.setMaxThreadCount(CLOUD_CONCURRENCY)
+
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.provider_box = QComboBox(self)
+        self.provider_box.addItems(list(CHATBOT_CLASSES))
+        self.provider_box.currentTextChanged.connect(self.refresh_models)
+        controls.addWidget(self.provider_box)
+        self.model_box = QComboBox(self)
+        self.model_box.setEditable(True)
+        controls.addWidget(self.model_box)
+        self.add_button = QPushButton("Add", self)
+        self.add_button.clicked.connect(self.add_pane)
+        controls.addWidget(self.add_button)
+        controls.addWidget(QLabel("Local concurrency:", self))
+        self.concurrency_box = QSpinBox(self)
+        self.concurrency_box.setRange(1, 8)
+        self.concurrency_box.setValue(1)
+        self.concurrency_box.valueChanged.connect(self.local_pool.setMaxThreadCount)
+        controls.addWidget(self.concurrency_box)
+        layout.addLayout(controls)
+
+        self.panes_layout = QHBoxLayout()
+        layout.addLayout(self.panes_layout)
+
+        self.refresh_models(self.provider_box.currentText())
+
+    def refresh_models(self, provider):
+        self.model_box.clear()
+        self.model_box.addItems(load_provider_models(provider))
+
+    def add_pane(self):
+        model = self.model_box.currentText().strip()
+        if model:
+            self.panes_layout.addWidget(ComparePane(self.provider_box.currentText(), model, self))
+
+    def panes(self):
+        return [self.panes_layout.itemAt(i).widget() for i in range(self.panes_layout.count())]
+
+    def run(self, prompt):
+        """Send the prompt to every pane's model, respecting the pool limits."""
+        for pane in self.panes():
+            pool = self.local_pool if pane.provider in LOCAL_PROVIDERS else self.cloud_pool
+            pool.start(pane.create_task(prompt))
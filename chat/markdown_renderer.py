@@ -0,0 +1,249 @@
+import hashlib
+import html
+import re
+import threading
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+try:
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import get_lexer_by_name, guess_lexer
+    from pygments.util import ClassNotFound
+except ImportError:
+    highlight = None
+
+CODE_STYLE = "background-color: #F6F8FA; font-family: monospace; white-space: pre-wrap;"
+
+INLINE_PATTERNS = [
+    (re.compile(r"`([^`]+)`"), r'<code style="background-color: #EEEEEE;">\1</code>'),
+    (re.compile(r"\*\*(.+?)\*\*"), r"<b>\1</b>"),
+    (re.compile(r"(?<![\*\w])\*(?!\s)(.+?)(?<!\s)\*(?![\*\w])"), r"<i>\1</i>"),
+    (re.compile(r"\[([^\]]+)\]\((https?://[^)\s]+)\)"), r'<a href="\2">\1</a>'),
+]
+HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+LIST_ITEM = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+(.*)$")
+FENCE = "```"
+
+
+class BlockCache:
+    """Thread-safe LRU of rendered block HTML keyed by content hash."""
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            html_text = self.entries.get(key)
+            if html_text is not None:
+                self.entries.move_to_end(key)
+            return html_text
+
+    def set(self, key, html_text):
+        with self.lock:
+            self.entries[key] = html_text
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+BLOCK_CACHE = BlockCache()
+
+
+def block_key(kind, lang, text):
+    return hashlib.sha1(f"{kind}\0{lang}\0{text}".encode("utf-8")).hexdigest()
+
+
+def render_inline(text):
+    text = html.escape(text, quote=False)
+    for pattern, replacement in INLINE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def render_markdown_block(lines):
+    """Render one blank-line separated Markdown block to HTML."""
+    parts = []
+    items = []
+    paragraph = []
+
+    def flush():
+        if items:
+            parts.append("<ul>" + "".join(f"<li>{item}</li>" for item in items) + "</ul>")
+            items.clear()
+        if paragraph:
+            parts.append("<p>" + "<br>".join(paragraph) + "</p>")
+            paragraph.clear()
+
+    for line in lines:
+        heading = HEADING.match(line)
+        item = LIST_ITEM.match(line)
+        if heading:
+            flush()
+            level = min(len(heading.group(1)) + 1, 6)
+            parts.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+        elif item:
+            if paragraph:
+                flush()
+            items.append(render_inline(item.group(1)))
+        elif line.startswith(">"):
+            flush()
+            parts.append(f"<blockquote>{render_inline(line.lstrip('> '))}</blockquote>")
+        else:
+            if items:
+                flush()
+            paragraph.append(render_inline(line))
+    flush()
+    return "".join(parts)
+
+
+def render_plain_code(code):
+    return f'<pre style="{CODE_STYLE}">{html.escape(code, quote=False)}</pre>'
+
+
+def highlight_code(lang, code):
+    """Syntax highlight a code block with inline styles; needs pygments."""
+    try:
+        lexer = get_lexer_by_name(lang) if lang else guess_lexer(code)
+    except ClassNotFound:
+        return render_plain_code(code)
+    body = highlight(code, lexer, HtmlFormatter(noclasses=True, nowrap=True))
+    return f'<pre style="{CODE_STYLE}">{body}</pre>'
+
+
+class _HighlightTask(QRunnable):
+    def __init__(self, highlighter, key, lang, code):
+        super().__init__()
+        self.highlighter = highlighter
+        self.key = key
+        self.lang = lang
+        self.code = code
+
+    def run(self):
+        BLOCK_CACHE.set(self.key, highlight_code(self.lang, self.code))
+        self.highlighter.highlighted.emit(self.key)
+
+
+class CodeHighlighter(QObject):
+    """Highlights finished code blocks on a worker thread.
+
+    Blocks are shown as plain monospace first; once highlighted HTML lands in
+    the block cache, `highlighted` fires with the block key so views can
+    refresh the messages that contain it.
+    """
+    highlighted = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.pending = set()
+
+    def request(self, key, lang, code):
+        if highlight is None or key in self.pending:
+            return
+        self.pending.add(key)
+        self.pool.start(_HighlightTask(self, key, lang, code))
+
+
+class IncrementalMarkdownRenderer:
+    """Renders a streamed reply block by block.
+
+    Text is consumed once, line by line. A Markdown block is final once a
+    blank line follows it and a code block once its closing fence arrives;
+    final blocks are rendered once (or fetched from BLOCK_CACHE) and never
+    touched again. Only the open trailing block is re-rendered per chunk.
+    """
+
+    def __init__(self, highlighter=None):
+        self.highlighter = highlighter
+        self.partial = ""  # Text after the last newline
+        self.blocks = []  # (key, html) of finalized blocks
+        self.lines = []
+        self.code_lang = None  # None outside a fenced block
+
+    def append(self, chunk):
+        """Feed a chunk; returns (HTML of newly finalized blocks, HTML of the open tail)."""
+        new_blocks = []
+        if "\n" in chunk:
+            *complete, self.partial = (self.partial + chunk).split("\n")
+            for line in complete:
+                finished = self._consume_line(line)
+                if finished is not None:
+                    new_blocks.append(finished)
+        else:
+            self.partial += chunk
+        return new_blocks, self.tail_html()
+
+    def finish(self):
+        """Close the open block at the end of the stream; returns the newly finalized HTML."""
+        new_blocks = []
+        if self.partial:
+            finished = self._consume_line(self.partial)
+            self.partial = ""
+            if finished is not None:
+                new_blocks.append(finished)
+        if self.code_lang is not None:
+            new_blocks.append(self._finalize("code"))
+        elif self.lines:
+            new_blocks.append(self._finalize("markdown"))
+        return new_blocks
+
+    def html(self):
+        """Full HTML of everything rendered so far, including the open tail."""
+        # Prefer the cache so code blocks pick up their highlighted version
+        return "".join(BLOCK_CACHE.get(key) or html_text for key, html_text in self.blocks) + self.tail_html()
+
+    def block_keys(self):
+        return {key for key, _ in self.blocks}
+
+    def tail_html(self):
+        lines = self.lines + [self.partial] if self.partial else self.lines
+        if not lines:
+            return ""
+        if self.code_lang is not None:
+            return render_plain_code("\n".join(lines))
+        return render_markdown_block(lines)
+
+    def _consume_line(self, line):
+        if self.code_lang is not None:
+            if line.strip().startswith(FENCE):
+                return self._finalize("code")
+            self.lines.append(line)
+            return None
+        if line.startswith(FENCE):
+            finished = self._finalize("markdown") if self.lines else None
+            self.code_lang = line[len(FENCE):].strip()
+            return finished
+        if not line.strip():
+            return self._finalize("markdown") if self.lines else None
+        self.lines.append(line)
+        return None
+
+    def _finalize(self, kind):
+        text = "\n".join(self.lines)
+        lang = self.code_lang or ""
+        key = block_key(kind, lang, text)
+        html_text = BLOCK_CACHE.get(key)
+        if html_text is None:
+            if kind == "code":
+                html_text = render_plain_code(text)
+                if self.highlighter is not None:
+                    self.highlighter.request(key, lang, text)
+            else:
+                html_text = render_markdown_block(self.lines)
+            BLOCK_CACHE.set(key, html_text)
+        self.blocks.append((key, html_text))
+        self.lines = []
+        self.code_lang = None
+        return html_text
+
+
+def render_markdown(text, highlighter=None):
+    """Render a complete message to HTML, reusing cached blocks."""
+    renderer = IncrementalMarkdownRenderer(highlighter)
+    renderer.append(text)
+    renderer.finish()
+    return renderer.html()
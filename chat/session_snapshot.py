@@ -0,0 +1,68 @@
+import json
+import logging
+import os
+import tempfile
+from PyQt5.QtCore import QThread, pyqtSignal
+from database.models import DatabaseService
+
+SNAPSHOT_FILE = "session_snapshot.json"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_MESSAGES = 50
+
+
+def save_snapshot(snapshot, path=SNAPSHOT_FILE):
+    """Write the snapshot atomically, so a crash mid-write leaves the previous one intact."""
+    directory = os.path.dirname(os.path.abspath(path))
+    handle, temp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(handle, 'w', encoding='utf-8') as file:
+            json.dump({"version": SNAPSHOT_VERSION, **snapshot}, file, ensure_ascii=False)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def load_snapshot(path=SNAPSHOT_FILE):
+    """Return the last session's snapshot, or None if there is no usable one."""
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            snapshot = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable session snapshot: {e}")
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+class RestoreWorker(QThread):
+    """Loads the chat list and the snapshot's chat from the database after the window is up."""
+    finished = pyqtSignal(list, object)  # [(chat_id, title)], (chat_id, title, messages) or None
+
+    def __init__(self, db_path, chat_id=None):
+        super().__init__()
+        self.db_path = db_path
+        self.chat_id = chat_id
+
+    def run(self):
+        try:
+            db_service = DatabaseService(self.db_path)  # SQLite connections stay on their own thread
+            try:
+                chats = db_service.load_chat_history()
+                restored = None
+                if self.chat_id is not None:
+                    title = db_service.fetch_all("SELECT title FROM chats WHERE id = ?", (self.chat_id,))
+                    if title:
+                        restored = (self.chat_id, title[0][0], db_service.load_chat_messages(self.chat_id))
+            finally:
+                db_service.close()
+        except Exception as e:
+            logging.error(f"Failed to restore chats: {e}")
+            chats, restored = [], None
+        self.finished.emit(chats, restored)
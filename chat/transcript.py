@@ -0,0 +1,342 @@
+from collections import OrderedDict
+from itertools import count
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF, QTimer
+from PyQt5.QtGui import QTextDocument, QTextCursor, QColor, QPainter, QFontMetrics, QTextBlockFormat, QTextCharFormat
+from chat.markdown_renderer import CodeHighlighter, IncrementalMarkdownRenderer
+
+MessageIdRole = Qt.UserRole + 1
+RoleRole = Qt.UserRole + 2
+RevisionRole = Qt.UserRole + 3
+StreamingRole = Qt.UserRole + 4
+
+BUBBLE_COLORS = {
+    "user": QColor("#E8F0FE"),
+    "assistant": QColor("#F5F5F5"),
+    "system": QColor("#FFF8E1"),
+    "tool": QColor("#EDF7ED"),
+}
+MARGIN = 6
+PADDING = 10
+
+
+class TranscriptMessage:
+    __slots__ = ("id", "role", "content", "revision", "streaming")
+
+    _ids = count()
+
+    def __init__(self, role, content, streaming=False):
+        self.id = next(self._ids)
+        self.role = role
+        self.content = content
+        self.revision = 0
+        self.streaming = streaming
+
+
+class TranscriptModel(QAbstractListModel):
+    """List model of chat messages backing the transcript view."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.messages = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == Qt.DisplayRole:
+            return message.content
+        if role == MessageIdRole:
+            return message.id
+        if role == RoleRole:
+            return message.role
+        if role == RevisionRole:
+            return message.revision
+        if role == StreamingRole:
+            return message.streaming
+        return None
+
+    def set_messages(self, messages):
+        """Replace the transcript with a list of {"role", "content"} dicts."""
+        self.beginResetModel()
+        self.messages = [TranscriptMessage(msg["role"], msg["content"]) for msg in messages]
+        self.endResetModel()
+
+    def append_message(self, role, content, streaming=False):
+        row = len(self.messages)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.messages.append(TranscriptMessage(role, content, streaming))
+        self.endInsertRows()
+
+    def insert_message(self, row, role, content):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.messages.insert(row, TranscriptMessage(role, content))
+        self.endInsertRows()
+
+    def append_chunk(self, text):
+        """Extend the last message in place; its cached layout only grows at the tail."""
+        if not self.messages:
+            return
+        self.messages[-1].content += text
+        index = self.index(len(self.messages) - 1)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole])
+
+    def replace_last(self, content):
+        """Set the last message's final text and end its streaming state."""
+        if not self.messages:
+            return
+        message = self.messages[-1]
+        if message.content == content and not message.streaming:
+            return
+        message.content = content
+        message.streaming = False
+        message.revision += 1
+        index = self.index(len(self.messages) - 1)
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, RevisionRole])
+
+    def clear(self):
+        self.beginResetModel()
+        self.messages = []
+        self.endResetModel()
+
+
+class _CachedLayout:
+    __slots__ = ("document", "width", "length", "revision", "renderer", "tail_start", "block_keys")
+
+    def __init__(self, document, width, length, revision):
+        self.document = document
+        self.width = width
+        self.length = length
+        self.revision = revision
+        self.renderer = None  # Only kept while the message is streaming
+        self.tail_start = 0
+        self.block_keys = set()
+
+
+class MessageDelegate(QStyledItemDelegate):
+    """Paints messages as bubbles from per-message cached text layouts.
+
+    Only rows that are actually painted get a QTextDocument, and those are
+    kept in a bounded LRU. Assistant replies are rendered as Markdown; while
+    one streams, its renderer is kept with the layout so each chunk only
+    replaces the open trailing block in the document. Off-screen rows answer sizeHint from the last
+    measured height, or an estimate from their length, so relayouts of a
+    long transcript never lay out text that isn't visible.
+    """
+
+    def __init__(self, parent=None, cache_size=200):
+        super().__init__(parent)
+        self.cache_size = cache_size
+        self.layouts = OrderedDict()
+        self.heights = {}
+        self.highlighter = CodeHighlighter(self)
+        self.highlighter.highlighted.connect(self.refresh_block)
+
+    def content_width(self, option):
+        return max(50, option.rect.width() - 2 * (MARGIN + PADDING))
+
+    def layout_for(self, index, width, font):
+        message_id = index.data(MessageIdRole)
+        content = index.data(Qt.DisplayRole)
+        revision = index.data(RevisionRole)
+        entry = self.layouts.get(message_id)
+
+        if entry is None or entry.revision != revision or len(content) < entry.length:
+            entry = self.build_layout(index, content, width, font)
+            self.layouts[message_id] = entry
+        else:
+            if len(content) > entry.length:
+                self.append_tail(entry, content[entry.length:])
+                entry.length = len(content)
+            if entry.width != width:
+                entry.document.setTextWidth(width)
+                entry.width = width
+            self.layouts.move_to_end(message_id)
+
+        while len(self.layouts) > self.cache_size:
+            self.layouts.popitem(last=False)
+        return entry.document
+
+    def build_layout(self, index, content, width, font):
+        document = QTextDocument()
+        document.setDefaultFont(font)
+        document.setDocumentMargin(0)
+        document.setTextWidth(width)
+        entry = _CachedLayout(document, width, len(content), index.data(RevisionRole))
+
+        if index.data(RoleRole) != "assistant":
+            document.setPlainText(content)
+            return entry
+
+        renderer = IncrementalMarkdownRenderer(self.highlighter)
+        if index.data(StreamingRole):
+            entry.renderer = renderer
+            self.insert_blocks(entry, *renderer.append(content))
+        else:
+            renderer.append(content)
+            renderer.finish()
+            document.setHtml(renderer.html())
+        entry.block_keys = renderer.block_keys()
+        return entry
+
+    def append_tail(self, entry, text):
+        """Streaming: feed only the new text and re-render only the open tail."""
+        if entry.renderer is None:
+            cursor = QTextCursor(entry.document)
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+            return
+        self.insert_blocks(entry, *entry.renderer.append(text))
+        entry.block_keys = entry.renderer.block_keys()
+
+    def insert_blocks(self, entry, new_blocks, tail_html):
+        cursor = QTextCursor(entry.document)
+        cursor.setPosition(entry.tail_start)
+        cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+        cursor.removeSelectedText()
+        if new_blocks:
+            if cursor.position() > 0:
+                cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+            cursor.insertHtml("".join(new_blocks))
+            entry.tail_start = cursor.position()
+        if tail_html:
+            if cursor.position() > 0:
+                cursor.insertBlock(QTextBlockFormat(), QTextCharFormat())
+            cursor.insertHtml(tail_html)
+
+    def refresh_block(self, key):
+        """Rebuild messages containing a block whose highlighted HTML just arrived."""
+        stale = [message_id for message_id, entry in self.layouts.items() if key in entry.block_keys]
+        for message_id in stale:
+            del self.layouts[message_id]
+        if stale and self.parent() is not None:
+            self.parent().viewport().update()
+
+    def estimate_height(self, content, width, font):
+        metrics = QFontMetrics(font)
+        chars_per_line = max(1, width // max(1, metrics.averageCharWidth()))
+        lines = len(content) // chars_per_line + content.count("\n") + 1
+        return lines * metrics.lineSpacing()
+
+    def sizeHint(self, option, index):
+        width = self.content_width(option)
+        message_id = index.data(MessageIdRole)
+        length = len(index.data(Qt.DisplayRole))
+        entry = self.layouts.get(message_id)
+        if entry is not None and entry.width == width and entry.length == length \
+                and entry.revision == index.data(RevisionRole):
+            height = entry.document.size().height()
+        else:
+            cached = self.heights.get(message_id)
+            if cached is not None and cached[:2] == (width, length):
+                height = cached[2]
+            else:
+                height = self.estimate_height(index.data(Qt.DisplayRole), width, option.font)
+        return QSize(option.rect.width(), int(height) + 2 * (MARGIN + PADDING))
+
+    def paint(self, painter, option, index):
+        width = self.content_width(option)
+        document = self.layout_for(index, width, option.font)
+        height = document.size().height()
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        bubble = option.rect.adjusted(MARGIN, MARGIN, -MARGIN, -MARGIN)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(BUBBLE_COLORS.get(index.data(RoleRole), BUBBLE_COLORS["assistant"]))
+        painter.drawRoundedRect(bubble, 8, 8)
+        painter.translate(bubble.left() + PADDING, bubble.top() + PADDING)
+        document.drawContents(painter, QRectF(0, 0, width, height))
+        painter.restore()
+
+        # Correct the estimate used before this row was first laid out
+        key = (width, len(index.data(Qt.DisplayRole)), height)
+        message_id = index.data(MessageIdRole)
+        if self.heights.get(message_id) != key:
+            self.heights[message_id] = key
+            if int(height) + 2 * (MARGIN + PADDING) != option.rect.height():
+                self.sizeHintChanged.emit(index)
+
+
+class TranscriptView(QListView):
+    """Virtualized replacement for the chatDisplay rich-text transcript."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.transcript = TranscriptModel(self)
+        self.setModel(self.transcript)
+        self.delegate = MessageDelegate(self)
+        self.setItemDelegate(self.delegate)
+
+        self.setUniformItemSizes(False)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(50)
+        self.setResizeMode(QListView.Adjust)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+
+    def is_at_bottom(self):
+        scroll_bar = self.verticalScrollBar()
+        return scroll_bar.value() >= scroll_bar.maximum() - 4
+
+    def _follow(self, was_at_bottom):
+        if was_at_bottom:
+            self.scrollToBottom()
+
+    def set_messages(self, messages):
+        self.transcript.set_messages(messages)
+        self.scrollToBottom()
+
+    def show_transcript(self, transcript, scroll_value=None):
+        """Swap in another chat's model; cached layouts are keyed by message id, so they survive."""
+        self.transcript = transcript
+        self.setModel(transcript)
+        # Item heights are laid out lazily, so restore the position once they are known
+        if scroll_value is None:
+            QTimer.singleShot(0, self.scrollToBottom)
+        else:
+            QTimer.singleShot(0, lambda: self.verticalScrollBar().setValue(scroll_value))
+
+    def replace_transcript(self, transcript):
+        """Swap in a fuller model of the chat on screen, keeping the same messages in view."""
+        bar = self.verticalScrollBar()
+        from_bottom = None if self.is_at_bottom() else bar.maximum() - bar.value()
+        self.transcript = transcript
+        self.setModel(transcript)
+        if from_bottom is None:
+            QTimer.singleShot(0, self.scrollToBottom)
+        else:
+            QTimer.singleShot(0, lambda: bar.setValue(bar.maximum() - from_bottom))
+
+    def scroll_state(self):
+        """The scroll position to restore later, or None when following the bottom."""
+        return None if self.is_at_bottom() else self.verticalScrollBar().value()
+
+    def append_message(self, role, content, streaming=False):
+        was_at_bottom = self.is_at_bottom()
+        self.transcript.append_message(role, content, streaming)
+        self._follow(was_at_bottom)
+
+    def insert_before_last(self, role, content):
+        """Add a message above the one being streamed, e.g. a tool result."""
+        was_at_bottom = self.is_at_bottom()
+        self.transcript.insert_message(max(self.transcript.rowCount() - 1, 0), role, content)
+        self._follow(was_at_bottom)
+
+    def append_chunk(self, text):
+        was_at_bottom = self.is_at_bottom()
+        self.transcript.append_chunk(text)
+        self._follow(was_at_bottom)
+
+    def finish_message(self, content):
+        was_at_bottom = self.is_at_bottom()
+        self.transcript.replace_last(content)
+        self._follow(was_at_bottom)
+
+    def clear(self):
+        self.transcript.clear()
@@ -0,0 +1,30 @@
+import logging
+from PyQt5.QtCore import QThread, pyqtSignal
+from database.models import DatabaseService
+
+COMPRESS_AFTER_DAYS = 30
+
+
+class CompactionWorker(QThread):
+    """Compresses old message bodies in the background on its own connection."""
+    finished = pyqtSignal(int)
+
+    def __init__(self, db_path="chat_history.db", older_than_days=COMPRESS_AFTER_DAYS, use_dictionary=False):
+        super().__init__()
+        self.db_path = db_path
+        self.older_than_days = older_than_days
+        self.use_dictionary = use_dictionary
+
+    def run(self):
+        try:
+            db_service = DatabaseService(self.db_path)
+            try:
+                saved = db_service.compact_messages(self.older_than_days, self.use_dictionary,
+                                                    should_stop=self.isInterruptionRequested)
+            finally:
+                db_service.close()
+            if saved:
+                logging.info(f"Compressed old messages, saving {saved / (1024 * 1024):.1f} MB")
+            self.finished.emit(saved)
+        except Exception as e:
+            logging.error(f"Message compaction failed: {e}")
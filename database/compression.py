@@ -0,0 +1,67 @@
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Values of messages.encoding: NULL is plain text, "zlib" or "zstd" a
+# compressed body, and "zstd:<id>" zstd with a shared dictionary from the
+# compression_dicts table.
+ZLIB = "zlib"
+ZSTD = "zstd"
+DICTIONARY_SIZE = 112640
+
+
+def dictionaries_supported():
+    return zstandard is not None
+
+
+def train_dictionary(samples, size=DICTIONARY_SIZE):
+    """Train a zstd dictionary from sample message bodies; needs zstandard."""
+    if zstandard is None:
+        raise RuntimeError("Shared dictionaries need the zstandard package")
+    return zstandard.train_dictionary(size, [sample.encode("utf-8") for sample in samples]).as_bytes()
+
+
+class MessageCodec:
+    """Compresses message bodies with zstd when available, zlib otherwise."""
+
+    def __init__(self, level=9):
+        self.level = level
+        self.dictionaries = {}  # id -> raw dictionary bytes
+        self._compressors = {}
+        self._decompressors = {}
+
+    def add_dictionary(self, dict_id, data):
+        self.dictionaries[dict_id] = data
+
+    def _zstd_dict(self, dict_id):
+        return zstandard.ZstdCompressionDict(self.dictionaries[dict_id]) if dict_id is not None else None
+
+    def compress(self, text, dict_id=None):
+        """Return (blob, encoding) for a message body."""
+        data = text.encode("utf-8")
+        if zstandard is None:
+            return zlib.compress(data, self.level), ZLIB
+        compressor = self._compressors.get(dict_id)
+        if compressor is None:
+            compressor = zstandard.ZstdCompressor(level=self.level, dict_data=self._zstd_dict(dict_id))
+            self._compressors[dict_id] = compressor
+        encoding = ZSTD if dict_id is None else f"{ZSTD}:{dict_id}"
+        return compressor.compress(data), encoding
+
+    def decompress(self, content, encoding):
+        """Return the text of a stored body, whatever its encoding."""
+        if encoding is None:
+            return content
+        if encoding == ZLIB:
+            return zlib.decompress(content).decode("utf-8")
+        if zstandard is None:
+            raise RuntimeError("This message was compressed with zstd; install the zstandard package")
+        dict_id = int(encoding.split(":", 1)[1]) if ":" in encoding else None
+        decompressor = self._decompressors.get(dict_id)
+        if decompressor is None:
+            decompressor = zstandard.ZstdDecompressor(dict_data=self._zstd_dict(dict_id))
+            self._decompressors[dict_id] = decompressor
+        return decompressor.decompress(content).decode("utf-8")
@@ -0,0 +1,182 @@
+"""Bulk import of conversation archives into the chat history database.
+
+Reads the JSONL written by dialogs/export_chats.py (one object per message,
+plain, gzipped or inside a zip) as well as one-object-per-chat JSONL from
+other tools ({"title", "created_at", "messages": [{"role", "content"}]}).
+
+    python -m database.importer conversations.jsonl.gz other_machine.jsonl
+"""
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import logging
+import sys
+import time
+import zipfile
+from database.models import DatabaseService
+
+BATCH_SIZE = 50000
+
+
+def _digest(*values):
+    key = "\0".join("" if value is None else str(value) for value in values)
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def chat_key(title, created_at, source_id, first_role, first_content):
+    """Identity of a chat across machines and re-imports: its title, start time and opening message.
+
+    Chats only ever grow at the end, so the opening message never changes. The
+    source's own chat id only tells apart chats that have no start time.
+    """
+    return _digest(title, created_at, None if created_at else source_id, first_role, first_content)
+
+
+def message_hash(chat_key, position, role, content):
+    """Identity of a message across machines, used to skip duplicates."""
+    return _digest(chat_key, position, role, content)
+
+
+def _iter_lines(path):
+    if path.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.endswith((".jsonl", ".jsonl.gz")):
+                    with archive.open(name) as member:
+                        stream = gzip.open(member) if name.endswith(".gz") else member
+                        yield from io.TextIOWrapper(stream, encoding="utf-8")
+    elif path.endswith(".gz"):
+        with gzip.open(path, 'rt', encoding='utf-8') as file:
+            yield from file
+    else:
+        with open(path, 'r', encoding='utf-8') as file:
+            yield from file
+
+
+def _per_message_chat(record):
+    return record.get("chat_id"), record.get("chat_title"), record.get("chat_created_at")
+
+
+def read_chats(path):
+    """Stream (title, created_at, source_id, messages) per chat from an archive.
+
+    messages yields (role, content, created_at) in order. The per-message
+    format is grouped by consecutive chat, which is how exports are written.
+    """
+    records = (json.loads(line) for line in _iter_lines(path) if line.strip())
+    for key, group in itertools.groupby(records, key=lambda record: None if "messages" in record
+                                        else _per_message_chat(record)):
+        if key is not None:
+            source_id, title, created_at = key
+            yield title, created_at, source_id, ((record["role"], record["content"], record.get("created_at"))
+                                                 for record in group)
+            continue
+        for record in group:
+            yield (record.get("title"), record.get("created_at"), record.get("id") or record.get("chat_id"),
+                   ((message["role"], message["content"], message.get("created_at"))
+                    for message in record["messages"]))
+
+
+class ChatImporter:
+    """Loads archives with large executemany batches and indexes rebuilt at the end."""
+
+    def __init__(self, db_service):
+        self.db_service = db_service
+        self.conn = db_service.conn
+
+    def backfill_hashes(self):
+        """Key chats and hash messages that the app saved, or an older importer hashed differently."""
+        decompress = self.db_service.codec.decompress
+        stale = [row[0] for row in self.db_service.iter_query(
+            """SELECT id FROM chats WHERE import_key IS NULL
+               UNION SELECT DISTINCT chat_id FROM messages WHERE content_hash IS NULL""")]
+        for start in range(0, len(stale), BATCH_SIZE // 50):
+            updates = []
+            chat_keys = []
+            for chat_id in stale[start:start + BATCH_SIZE // 50]:
+                title, created_at, key = self.db_service.fetch_all(
+                    "SELECT title, created_at, import_key FROM chats WHERE id = ?", (chat_id,))[0]
+                for position, (message_id, role, content, _, encoding) in enumerate(
+                        self.db_service.iter_query("""SELECT id, role, content, created_at, encoding
+                                                      FROM messages WHERE chat_id = ? ORDER BY id""", (chat_id,))):
+                    content = decompress(content, encoding)
+                    if key is None:
+                        key = chat_key(title, created_at, chat_id, role, content)
+                    updates.append((message_hash(key, position, role, content), message_id))
+                if key is not None:
+                    chat_keys.append((key, chat_id))  # Imported chats keep the key they came with
+            self.conn.executemany("UPDATE messages SET content_hash = ? WHERE id = ?", updates)
+            self.conn.executemany("UPDATE chats SET import_key = ? WHERE id = ?", chat_keys)
+            self.conn.commit()
+
+    def import_files(self, paths, progress_callback=None):
+        """Import archives; returns (imported, skipped_duplicates)."""
+        self.backfill_hashes()
+        seen = {row[0] for row in self.db_service.iter_query("SELECT content_hash FROM messages")}
+        chats = {key: chat_id for chat_id, key in
+                 self.db_service.iter_query("SELECT id, import_key FROM chats WHERE import_key IS NOT NULL")}
+
+        imported = skipped = 0
+        batch = []
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.db_service.drop_indexes()
+        try:
+            for path in paths:
+                for title, chat_created_at, source_id, messages in read_chats(path):
+                    first = next(messages, None)
+                    if first is None:
+                        continue
+                    key = chat_key(title, chat_created_at, source_id, first[0], first[1])
+                    for position, (role, content, created_at) in enumerate(itertools.chain([first], messages)):
+                        digest = message_hash(key, position, role, content)
+                        if digest in seen:
+                            skipped += 1
+                            continue
+                        seen.add(digest)
+
+                        chat_id = chats.get(key)
+                        if chat_id is None:
+                            chat_id = self.conn.execute(
+                                """INSERT INTO chats (title, created_at, import_key)
+                                   VALUES (?, COALESCE(?, CURRENT_TIMESTAMP), ?)""",
+                                (title, chat_created_at, key)).lastrowid
+                            chats[key] = chat_id
+
+                        batch.append((chat_id, role, content, created_at or chat_created_at, digest))
+                        if len(batch) >= BATCH_SIZE:
+                            imported += self._flush(batch)
+                            if progress_callback:
+                                progress_callback(imported, skipped)
+            imported += self._flush(batch)
+        finally:
+            self.conn.commit()
+            self.db_service.create_indexes()
+            self.conn.commit()
+            self.conn.execute("PRAGMA synchronous = FULL")
+        if progress_callback:
+            progress_callback(imported, skipped)
+        return imported, skipped
+
+    def _flush(self, batch):
+        count = len(batch)
+        if count:
+            self.conn.executemany('''INSERT INTO messages (chat_id, role, content, created_at, content_hash)
+                                     VALUES (?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?)''', batch)
+            self.conn.commit()
+            batch.clear()
+        return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    started = time.perf_counter()
+    db_service = DatabaseService()
+    try:
+        imported, skipped = ChatImporter(db_service).import_files(
+            sys.argv[1:], lambda done, dupes: logging.info(f"{done} messages imported, {dupes} duplicates skipped"))
+    finally:
+        db_service.close()
+    logging.info(f"Imported {imported} messages ({skipped} duplicates) in {time.perf_counter() - started:.1f}s")
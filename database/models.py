@@ -1,10 +1,14 @@
 import sqlite3
+from database.compression import MessageCodec, dictionaries_supported, train_dictionary
 
 class DatabaseService:
-    def __init__(self):
-        self.conn = sqlite3.connect("chat_history.db")
+    def __init__(self, db_path="chat_history.db"):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
         self.cursor = self.conn.cursor()
+        self.codec = MessageCodec()
         self._create_tables()
+        self._load_dictionaries()
 
     def _create_tables(self):
         """Create necessary tables."""
@@ -19,8 +23,38 @@ class DatabaseService:
                                 content TEXT,
                                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                                 FOREIGN KEY (chat_id) REFERENCES chats (id))''')
+        self._add_column("messages", "content_hash", "TEXT")
+        self._add_column("messages", "encoding", "TEXT")
+        self._add_column("chats", "import_key", "TEXT")
+        self.cursor.execute('''CREATE TABLE IF NOT EXISTS compression_dicts
+                               (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                                data BLOB,
+                                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+        self.create_indexes()
+        self.cursor.execute('''CREATE TABLE IF NOT EXISTS export_state
+                               (name TEXT PRIMARY KEY,
+                                last_message_id INTEGER)''')
         self.conn.commit()
 
+    def _add_column(self, table, column, column_type):
+        """Add a column to an existing table if an older database lacks it."""
+        columns = [row[1] for row in self.cursor.execute(f"PRAGMA table_info({table})")]
+        if column not in columns:
+            self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+    def _load_dictionaries(self):
+        for dict_id, data in self.fetch_all("SELECT id, data FROM compression_dicts"):
+            self.codec.add_dictionary(dict_id, data)
+
+    def create_indexes(self):
+        """Create secondary indexes; bulk loads drop them and call this afterwards."""
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_chat ON messages (chat_id, id)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_hash ON messages (content_hash)")
+
+    def drop_indexes(self):
+        self.cursor.execute("DROP INDEX IF EXISTS idx_messages_chat")
+        self.cursor.execute("DROP INDEX IF EXISTS idx_messages_hash")
+
     def execute_query(self, query, params=()):
         """Execute a query."""
         self.cursor.execute(query, params)
@@ -31,6 +65,19 @@ class DatabaseService:
         self.cursor.execute(query, params)
         return self.cursor.fetchall()
 
+    def iter_query(self, query, params=(), batch_size=1000):
+        """Stream rows from a query on a dedicated cursor instead of fetching them all."""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
     def create_new_chat(self, title):
         """Create a new chat session."""
         self.execute_query("INSERT INTO chats (title) VALUES (?)", (title,))
@@ -42,12 +89,95 @@ class DatabaseService:
 
     def load_chat_messages(self, chat_id):
         """Load messages for a specific chat."""
-        return self.fetch_all("SELECT role, content FROM messages WHERE chat_id = ? ORDER BY created_at ASC", (chat_id,))
+        rows = self.fetch_all("SELECT role, content, encoding FROM messages WHERE chat_id = ? ORDER BY created_at ASC, id ASC", (chat_id,))
+        return [(role, self.codec.decompress(content, encoding)) for role, content, encoding in rows]
+
+    def iter_chats(self, since_message_id=0):
+        """Stream chats, limited to those with messages newer than since_message_id if given."""
+        if since_message_id:
+            return self.iter_query("""SELECT id, title, created_at FROM chats
+                                      WHERE id IN (SELECT chat_id FROM messages WHERE id > ?)
+                                      ORDER BY id""", (since_message_id,))
+        return self.iter_query("SELECT id, title, created_at FROM chats ORDER BY id")
+
+    def count_chats(self, since_message_id=0):
+        if since_message_id:
+            return self.fetch_all("SELECT COUNT(DISTINCT chat_id) FROM messages WHERE id > ?", (since_message_id,))[0][0]
+        return self.fetch_all("SELECT COUNT(*) FROM chats")[0][0]
+
+    def iter_chat_messages(self, chat_id):
+        """Stream the messages of a chat in order."""
+        rows = self.iter_query("SELECT id, role, content, created_at, encoding FROM messages WHERE chat_id = ? ORDER BY id",
+                               (chat_id,))
+        for message_id, role, content, created_at, encoding in rows:
+            yield message_id, role, self.codec.decompress(content, encoding), created_at
+
+    def max_message_id(self):
+        return self.fetch_all("SELECT COALESCE(MAX(id), 0) FROM messages")[0][0]
+
+    def get_export_checkpoint(self, name):
+        rows = self.fetch_all("SELECT last_message_id FROM export_state WHERE name = ?", (name,))
+        return rows[0][0] if rows else 0
+
+    def set_export_checkpoint(self, name, message_id):
+        self.execute_query("INSERT OR REPLACE INTO export_state (name, last_message_id) VALUES (?, ?)",
+                           (name, message_id))
 
     def save_message(self, chat_id, role, content):
         """Save a message to the database."""
         self.execute_query("INSERT INTO messages (chat_id, role, content) VALUES (?, ?, ?)", (chat_id, role, content))
 
+    def save_messages(self, rows):
+        """Save (chat_id, role, content) rows in one transaction."""
+        self.conn.executemany("INSERT INTO messages (chat_id, role, content) VALUES (?, ?, ?)", rows)
+        self.conn.commit()
+
+    def train_compression_dictionary(self, older_than_days=30, sample_limit=2000):
+        """Train and store a shared zstd dictionary from old message bodies; returns its id."""
+        samples = [row[0] for row in self.fetch_all('''SELECT content FROM messages
+                                                      WHERE encoding IS NULL AND created_at < datetime('now', ?)
+                                                      ORDER BY RANDOM() LIMIT ?''',
+                                                   (f"-{older_than_days} days", sample_limit))]
+        if not samples:
+            return None
+        data = train_dictionary(samples)
+        self.execute_query("INSERT INTO compression_dicts (data) VALUES (?)", (data,))
+        dict_id = self.cursor.lastrowid
+        self.codec.add_dictionary(dict_id, data)
+        return dict_id
+
+    def compact_messages(self, older_than_days=30, use_dictionary=False, min_size=256, batch_size=500,
+                         should_stop=None):
+        """Compress plain message bodies older than the given age; returns the bytes saved.
+
+        should_stop is checked between batches, so a caller can end the job early.
+        """
+        dict_id = None
+        if use_dictionary and dictionaries_supported():
+            dict_id = max(self.codec.dictionaries, default=None) or self.train_compression_dictionary(older_than_days)
+
+        saved = 0
+        last_id = 0
+        while should_stop is None or not should_stop():
+            rows = self.fetch_all('''SELECT id, content FROM messages
+                                     WHERE id > ? AND encoding IS NULL AND length(content) >= ?
+                                       AND created_at < datetime('now', ?)
+                                     ORDER BY id LIMIT ?''',
+                                  (last_id, min_size, f"-{older_than_days} days", batch_size))
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = []
+            for message_id, content in rows:
+                blob, encoding = self.codec.compress(content, dict_id)
+                size = len(content.encode("utf-8"))
+                if len(blob) < size:
+                    updates.append((blob, encoding, message_id))
+                    saved += size - len(blob)
+            self.conn.executemany("UPDATE messages SET content = ?, encoding = ? WHERE id = ?", updates)
+            self.conn.commit()
+        return saved
+
     def clear_conversations(self):
         """Clear all conversations."""
         self.execute_query("DELETE FROM messages")
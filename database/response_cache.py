@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+CACHED_MARKER = "\n\n⚡ cached"
+
+
+def mark_cached(text):
+    """Append the visible marker shown on replies served from the cache."""
+    return f"{text}{CACHED_MARKER}"
+
+
+def open_response_cache(chat_db_path="chat_history.db"):
+    """The response cache kept in response_cache.db next to the chat history database."""
+    return ResponseCache(os.path.join(os.path.dirname(os.path.abspath(chat_db_path)), "response_cache.db"))
+
+
+class ResponseCache:
+    """Opt-in SQLite cache of replies to deterministic (temperature 0) prompts."""
+
+    def __init__(self, db_path="response_cache.db", ttl=7 * 24 * 3600, max_bytes=50 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._create_tables()
+
+    def _create_tables(self):
+        """Create necessary tables."""
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS responses
+                             (key TEXT PRIMARY KEY,
+                              response TEXT,
+                              size INTEGER,
+                              created_at REAL,
+                              last_used REAL)''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self.conn.commit()
+
+    @staticmethod
+    def is_cacheable(options):
+        """Only greedy decoding is deterministic enough to replay."""
+        return options.get("temperature") == 0
+
+    @staticmethod
+    def make_key(provider, model, options, messages):
+        """Hash the provider, model, options and normalized message list.
+
+        Tool-call turns have no content, so their calls and call ids are part of the key instead.
+        """
+        normalized = [(msg["role"], (msg.get("content") or "").strip(), msg.get("tool_calls"), msg.get("tool_call_id"))
+                      for msg in messages]
+        payload = json.dumps([provider, model, options, normalized], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Return the cached reply for a key, or None if missing or expired."""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT response FROM responses WHERE key = ? AND created_at > ?",
+                                    (key, now - self.ttl)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+            self.conn.commit()
+        return row[0]
+
+    def set(self, key, response):
+        """Store a reply and evict expired or least recently used entries."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO responses (key, response, size, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                              (key, response, len(response.encode("utf-8")), now, now))
+            self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        self.conn.execute("DELETE FROM responses WHERE created_at <= ?", (now - self.ttl,))
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        stale = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY last_used ASC"):
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def clear(self):
+        """Drop every cached reply."""
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
@@ -0,0 +1,237 @@
+import gzip
+import json
+import re
+import zipfile
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QCheckBox,
+    QLineEdit, QPushButton, QProgressBar, QFileDialog
+)
+from PyQt5.QtCore import QThread, pyqtSignal
+from database.models import DatabaseService
+
+EXPORT_FORMATS = {
+    "JSONL": ".jsonl",
+    "JSONL (gzip)": ".jsonl.gz",
+    "Markdown": ".md",
+    "Markdown (zip)": ".zip",
+}
+
+
+class JsonlWriter:
+    """One JSON object per message, so any history size streams in constant memory."""
+
+    def __init__(self, path, compress=False):
+        self.file = gzip.open(path, 'wt', encoding='utf-8') if compress else open(path, 'w', encoding='utf-8')
+        self.chat = None
+
+    def begin_chat(self, chat):
+        self.chat = chat
+
+    def write_message(self, message):
+        chat_id, title, chat_created_at = self.chat
+        _, role, content, created_at = message
+        self.file.write(json.dumps({
+            "chat_id": chat_id,
+            "chat_title": title,
+            "chat_created_at": chat_created_at,
+            "role": role,
+            "content": content,
+            "created_at": created_at,
+        }, ensure_ascii=False) + "\n")
+
+    def end_chat(self):
+        pass
+
+    def close(self):
+        self.file.close()
+
+
+class MarkdownWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def begin_chat(self, chat):
+        chat_id, title, created_at = chat
+        self.file.write(f"# {title or f'Chat {chat_id}'}\n\n_{created_at}_\n\n")
+
+    def write_message(self, message):
+        _, role, content, _ = message
+        self.file.write(f"**{role}:**\n\n{content}\n\n")
+
+    def end_chat(self):
+        self.file.write("---\n\n")
+
+    def close(self):
+        self.file.close()
+
+
+class MarkdownZipWriter(MarkdownWriter):
+    """A zip archive with one Markdown file per chat, each streamed into the archive."""
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.file = None
+        self.entry = None
+
+    def begin_chat(self, chat):
+        chat_id, title, _ = chat
+        slug = re.sub(r"[^\w\- ]", "", title or "")[:50].strip() or "chat"
+        self.entry = self.archive.open(f"{chat_id:06d} {slug}.md", 'w')
+        self.file = _TextSink(self.entry)
+        super().begin_chat(chat)
+
+    def end_chat(self):
+        self.entry.close()
+
+    def close(self):
+        self.archive.close()
+
+
+class _TextSink:
+    def __init__(self, binary):
+        self.binary = binary
+
+    def write(self, text):
+        self.binary.write(text.encode('utf-8'))
+
+
+def create_writer(export_format, path):
+    if export_format == "JSONL":
+        return JsonlWriter(path)
+    if export_format == "JSONL (gzip)":
+        return JsonlWriter(path, compress=True)
+    if export_format == "Markdown":
+        return MarkdownWriter(path)
+    if export_format == "Markdown (zip)":
+        return MarkdownZipWriter(path)
+    raise ValueError(f"Unknown export format: {export_format}")
+
+
+class ChatExporter:
+    """Streams chats out of the database one row at a time, never with fetchall."""
+
+    def __init__(self, db_service):
+        self.db_service = db_service
+
+    def export(self, export_format, path, incremental=False, progress_callback=None):
+        # Incremental exports write a delta file with every chat touched since
+        # the previous export in the same format
+        since = self.db_service.get_export_checkpoint(export_format) if incremental else 0
+        # Anything written after this point is picked up by the next incremental export
+        high_water_mark = self.db_service.max_message_id()
+        total = self.db_service.count_chats(since)
+
+        writer = create_writer(export_format, path)
+        exported = 0
+        try:
+            for chat in self.db_service.iter_chats(since):
+                writer.begin_chat(chat)
+                for message in self.db_service.iter_chat_messages(chat[0]):
+                    writer.write_message(message)
+                writer.end_chat()
+                exported += 1
+                if progress_callback:
+                    progress_callback(exported, total)
+        finally:
+            writer.close()
+
+        self.db_service.set_export_checkpoint(export_format, high_water_mark)
+        return exported
+
+
+class ExportWorker(QThread):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(int)
+    error = pyqtSignal(str)
+
+    def __init__(self, db_path, export_format, path, incremental):
+        super().__init__()
+        self.db_path = db_path
+        self.export_format = export_format
+        self.path = path
+        self.incremental = incremental
+
+    def run(self):
+        try:
+            db_service = DatabaseService(self.db_path)  # SQLite connections stay on their own thread
+            try:
+                exported = ChatExporter(db_service).export(self.export_format, self.path,
+                                                           self.incremental, self.progress.emit)
+            finally:
+                db_service.close()
+            self.finished.emit(exported)
+        except Exception as e:
+            self.error.emit(f"Export failed: {e}")
+
+
+class ExportChatsDialog(QDialog):
+    def __init__(self, parent=None, db_path="chat_history.db"):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.worker = None
+        self.setWindowTitle("Export Conversations")
+
+        layout = QVBoxLayout()
+        self.format_box = QComboBox(self)
+        self.format_box.addItems(list(EXPORT_FORMATS))
+        layout.addWidget(self.format_box)
+
+        path_layout = QHBoxLayout()
+        self.path_edit = QLineEdit(self)
+        self.path_edit.setPlaceholderText("Export file...")
+        path_layout.addWidget(self.path_edit)
+        browse_button = QPushButton("Browse", self)
+        browse_button.clicked.connect(self.choose_path)
+        path_layout.addWidget(browse_button)
+        layout.addLayout(path_layout)
+
+        self.incremental_box = QCheckBox("Only chats changed since the last export in this format", self)
+        layout.addWidget(self.incremental_box)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.hide()
+        layout.addWidget(self.progress_bar)
+        self.status_label = QLabel(self)
+        layout.addWidget(self.status_label)
+
+        self.export_button = QPushButton("Export", self)
+        self.export_button.clicked.connect(self.start_export)
+        layout.addWidget(self.export_button)
+        self.setLayout(layout)
+
+    def choose_path(self):
+        suffix = EXPORT_FORMATS[self.format_box.currentText()]
+        path, _ = QFileDialog.getSaveFileName(self, "Export Conversations", f"conversations{suffix}")
+        if path:
+            self.path_edit.setText(path)
+
+    def start_export(self):
+        path = self.path_edit.text().strip()
+        if not path:
+            self.status_label.setText("Choose a file to export to.")
+            return
+        self.export_button.setEnabled(False)
+        self.progress_bar.setRange(0, 0)
+        self.progress_bar.show()
+        self.status_label.setText("Exporting...")
+
+        self.worker = ExportWorker(self.db_path, self.format_box.currentText(), path,
+                                   self.incremental_box.isChecked())
+        self.worker.progress.connect(self.update_progress)
+        self.worker.finished.connect(self.export_finished)
+        self.worker.error.connect(self.export_failed)
+        self.worker.start()
+
+    def update_progress(self, done, total):
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+
+    def export_finished(self, exported):
+        self.export_button.setEnabled(True)
+        self.progress_bar.hide()
+        self.status_label.setText(f"Exported {exported} chats.")
+
+    def export_failed(self, message):
+        self.export_button.setEnabled(True)
+        self.progress_bar.hide()
+        self.status_label.setText(message)
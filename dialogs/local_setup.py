@@ -1,9 +1,65 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel
+import threading
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QLabel, QSpinBox, QLineEdit, QCheckBox, QDialogButtonBox
+)
+from local.ollama_supervisor import OllamaServerSettings, supervisor
+
 
 class SettingsDialog(QDialog):
+    """Local Ollama server settings; saving restarts a server the app started."""
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setWindowTitle("Settings")
+        self.setWindowTitle("Local Setup")
+        settings = supervisor.settings
         layout = QVBoxLayout()
-        layout.addWidget(QLabel("Settings Dialog (To be implemented)"))
+        form = QFormLayout()
+
+        self.num_parallel = self.count_editor(settings.num_parallel, 64,
+                                              "Requests each loaded model serves at once")
+        form.addRow("Parallel Requests", self.num_parallel)
+        self.max_loaded_models = self.count_editor(settings.max_loaded_models, 16,
+                                                   "Models kept in memory at the same time")
+        form.addRow("Max Loaded Models", self.max_loaded_models)
+        self.num_thread = self.count_editor(settings.num_thread, 512, "CPU threads per request")
+        form.addRow("CPU Threads", self.num_thread)
+        self.keep_alive = QLineEdit(settings.keep_alive or "", self)
+        self.keep_alive.setPlaceholderText("Default")
+        self.keep_alive.setToolTip('How long an idle model stays loaded, e.g. "5m", "1h" or "-1" for always')
+        form.addRow("Keep Alive", self.keep_alive)
+        self.use_gpu = QCheckBox("Use GPU", self)
+        self.use_gpu.setChecked(settings.use_gpu)
+        form.addRow(self.use_gpu)
+        layout.addLayout(form)
+
+        note = "Saving restarts the Ollama server." if supervisor.owned else \
+            "Parallel requests and loaded models apply the next time the Ollama server starts."
+        layout.addWidget(QLabel(note, self))
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
         self.setLayout(layout)
+
+    def count_editor(self, value, maximum, tooltip):
+        editor = QSpinBox(self)
+        editor.setRange(0, maximum)
+        editor.setSpecialValueText("Automatic")
+        editor.setValue(value or 0)
+        editor.setToolTip(tooltip)
+        return editor
+
+    def settings(self):
+        return OllamaServerSettings(
+            num_parallel=self.num_parallel.value() or None,
+            max_loaded_models=self.max_loaded_models.value() or None,
+            keep_alive=self.keep_alive.text().strip() or None,
+            num_thread=self.num_thread.value() or None,
+            use_gpu=self.use_gpu.isChecked(),
+        )
+
+    def accept(self):
+        # Restarting waits for the old server to exit, so keep it off the UI thread
+        threading.Thread(target=supervisor.apply_settings, args=(self.settings(),), daemon=True).start()
+        super().accept()
@@ -0,0 +1,129 @@
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QFormLayout, QLabel, QSpinBox, QDoubleSpinBox, QPushButton, QDialogButtonBox, QCheckBox
+)
+from utils.controllers import LOCAL_PROVIDERS
+from local.model_tuner import AutoTuneWorker
+
+# name -> (label, minimum, maximum, step, decimals); the minimum shows as "Default"
+COMMON_OPTIONS = {
+    "temperature": ("Temperature", -0.1, 2.0, 0.1, 2),
+    "top_p": ("Top P", -0.01, 1.0, 0.05, 2),
+}
+OLLAMA_OPTIONS = {
+    "num_ctx": ("Context Size", 0, 131072, 1024, 0),
+    "num_predict": ("Max Tokens", 0, 32768, 256, 0),
+    "num_thread": ("CPU Threads", 0, 512, 1, 0),
+    "num_batch": ("Batch Size", 0, 8192, 64, 0),
+}
+CLOUD_OPTIONS = {
+    "max_tokens": ("Max Tokens", 0, 131072, 256, 0),
+}
+
+
+class ModelSettingsDialog(QDialog):
+    """Edit the generation options stored for one model, or auto-tune them."""
+
+    def __init__(self, provider, model, options_store, parent=None):
+        super().__init__(parent)
+        self.provider = provider
+        self.model = model
+        self.options_store = options_store
+        self.worker = None
+        self.setWindowTitle(f"Model Settings - {model}")
+
+        local = provider in LOCAL_PROVIDERS
+        self.fields = {**COMMON_OPTIONS, **(OLLAMA_OPTIONS if local else CLOUD_OPTIONS)}
+        options = options_store.get(provider, model)
+
+        layout = QVBoxLayout()
+        form = QFormLayout()
+        self.editors = {}
+        for name, (label, minimum, maximum, step, decimals) in self.fields.items():
+            editor = QDoubleSpinBox(self) if decimals else QSpinBox(self)
+            if decimals:
+                editor.setDecimals(decimals)
+            editor.setRange(minimum, maximum)
+            editor.setSingleStep(step)
+            editor.setSpecialValueText("Default")
+            editor.setValue(options.get(name, minimum))
+            form.addRow(label, editor)
+            self.editors[name] = editor
+        layout.addLayout(form)
+
+        self.cache_checkbox = QCheckBox("Cache replies", self)
+        self.cache_checkbox.setToolTip("Reuse earlier replies to identical conversations run at temperature 0")
+        self.cache_checkbox.setChecked(options_store.cache_enabled(provider, model))
+        layout.addWidget(self.cache_checkbox)
+
+        self.status_label = QLabel(self)
+        speed = options_store.tuned_speed(provider, model)
+        if speed:
+            self.status_label.setText(f"Tuned: {speed:.1f} tokens/sec")
+        layout.addWidget(self.status_label)
+
+        if local:
+            self.tune_button = QPushButton("Auto-tune", self)
+            self.tune_button.setToolTip("Benchmark thread, batch and context sizes on this machine")
+            self.tune_button.clicked.connect(self.toggle_auto_tune)
+            layout.addWidget(self.tune_button)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Save | QDialogButtonBox.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        self.setLayout(layout)
+
+    def current_options(self):
+        """Options that differ from the model's defaults."""
+        options = {}
+        for name, editor in self.editors.items():
+            if editor.value() != editor.minimum():
+                options[name] = editor.value()
+        return options
+
+    def set_options(self, options):
+        for name, value in options.items():
+            if name in self.editors:
+                self.editors[name].setValue(value)
+
+    def toggle_auto_tune(self):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.stop()
+            self.tune_button.setEnabled(False)
+            self.status_label.setText("Stopping after the current run...")
+            return
+        self.worker = AutoTuneWorker(self.model, self.current_options())
+        self.worker.progress.connect(self.status_label.setText)
+        self.worker.finished.connect(self.auto_tune_finished)
+        self.worker.error.connect(self.auto_tune_failed)
+        self.tune_button.setText("Stop")
+        self.worker.start()
+
+    def auto_tune_finished(self, options, tokens_per_sec):
+        self.tune_button.setText("Auto-tune")
+        self.tune_button.setEnabled(True)
+        self.set_options(options)
+        options = {**self.current_options(), **options}
+        self.options_store.set(self.provider, self.model, options, tokens_per_sec or None)
+        self.status_label.setText(f"Saved best settings: {tokens_per_sec:.1f} tokens/sec")
+
+    def auto_tune_failed(self, message):
+        self.tune_button.setText("Auto-tune")
+        self.tune_button.setEnabled(True)
+        self.status_label.setText(message)
+
+    def stop_worker(self):
+        if self.worker is not None and self.worker.isRunning():
+            self.worker.stop()
+            self.worker.wait()
+
+    def accept(self):
+        self.stop_worker()
+        self.options_store.set(self.provider, self.model, self.current_options(),
+                               self.options_store.tuned_speed(self.provider, self.model),
+                               self.cache_checkbox.isChecked())
+        super().accept()
+
+    def reject(self):
+        self.stop_worker()
+        super().reject()
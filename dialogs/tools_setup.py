@@ -1,9 +1,58 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QLabel
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QTableWidget, QTableWidgetItem, QDoubleSpinBox, QSpinBox,
+    QHeaderView, QDialogButtonBox, QPushButton
+)
+from PyQt5.QtCore import Qt
+
 
 class ToolChoiceDialog(QDialog):
-    def __init__(self, parent=None):
+    """Enable tools and tune their timeouts and cache lifetimes."""
+
+    COLUMNS = ["Tool", "Description", "Timeout (s)", "Cache TTL (s)"]
+
+    def __init__(self, tool_engine, parent=None):
         super().__init__(parent)
+        self.tool_engine = tool_engine
         self.setWindowTitle("Tool Choice")
+        self.resize(700, 400)
         layout = QVBoxLayout()
-        layout.addWidget(QLabel("Tool Choice Dialog (To be implemented)"))
+
+        self.table = QTableWidget(len(tool_engine.tools), len(self.COLUMNS), self)
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
+        self.table.verticalHeader().hide()
+        for row, tool in enumerate(tool_engine.tools.values()):
+            name_item = QTableWidgetItem(tool.name)
+            name_item.setFlags(Qt.ItemIsUserCheckable | Qt.ItemIsEnabled)
+            name_item.setCheckState(Qt.Checked if tool.name in tool_engine.enabled else Qt.Unchecked)
+            self.table.setItem(row, 0, name_item)
+            description_item = QTableWidgetItem(tool.description)
+            description_item.setFlags(Qt.ItemIsEnabled)
+            self.table.setItem(row, 1, description_item)
+
+            timeout_box = QDoubleSpinBox(self.table)
+            timeout_box.setRange(0.5, 300)
+            timeout_box.setValue(tool.timeout)
+            self.table.setCellWidget(row, 2, timeout_box)
+            ttl_box = QSpinBox(self.table)
+            ttl_box.setRange(0, 7 * 24 * 3600)
+            ttl_box.setValue(int(tool.ttl))
+            self.table.setCellWidget(row, 3, ttl_box)
+        layout.addWidget(self.table)
+
+        clear_button = QPushButton("Clear Cached Results", self)
+        clear_button.clicked.connect(tool_engine.cache.clear)
+        layout.addWidget(clear_button)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
         self.setLayout(layout)
+
+    def accept(self):
+        for row, tool in enumerate(self.tool_engine.tools.values()):
+            self.tool_engine.set_enabled(tool.name, self.table.item(row, 0).checkState() == Qt.Checked)
+            tool.timeout = self.table.cellWidget(row, 2).value()
+            tool.ttl = self.table.cellWidget(row, 3).value()
+        super().accept()
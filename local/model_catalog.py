@@ -0,0 +1,270 @@
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+import urllib.request
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QTableView, QVBoxLayout, QHBoxLayout, QWidget,
+    QLineEdit, QLabel, QHeaderView, QCheckBox, QPushButton
+)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
+from local.ollama_model_list import format_size
+
+# The catalog source is a URL or a local JSON file in the format read by
+# load_catalog(); tests and offline installs point it at a fixture.
+CATALOG_SOURCE = os.environ.get("SUPERNOVA_CATALOG_SOURCE", "")
+SYNC_INTERVAL = 24 * 3600
+GB = 1024 ** 3
+
+
+def load_catalog(source, timeout=15):
+    """Read the catalog and flatten it to one entry per model tag.
+
+    The source is a JSON list of models, each with a "name" and a list of
+    "tags" holding "tag", "size" (bytes), "quantization", "parameter_size",
+    "digest" and "updated_at".
+    """
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source, timeout=timeout) as response:
+            models = json.load(response)
+    else:
+        with open(source, 'r', encoding='utf-8') as file:
+            models = json.load(file)
+
+    entries = []
+    for model in models:
+        for tag in model.get("tags", []):
+            entries.append((
+                model["name"],
+                tag.get("tag", "latest"),
+                int(tag.get("size") or 0),
+                tag.get("quantization", ""),
+                tag.get("parameter_size", ""),
+                tag.get("digest", ""),
+                tag.get("updated_at", ""),
+            ))
+    return entries
+
+
+def escape_like(text):
+    """Escape LIKE wildcards so the text matches literally (with ESCAPE '\\')."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class CatalogIndex:
+    """Local SQLite index of the model catalog, searched without the network."""
+
+    def __init__(self, db_path="model_catalog.db"):
+        self.conn = sqlite3.connect(db_path)
+        self._create_tables()
+
+    def _create_tables(self):
+        """Create necessary tables."""
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS catalog
+                             (name TEXT,
+                              tag TEXT,
+                              size INTEGER,
+                              quantization TEXT,
+                              parameter_size TEXT,
+                              digest TEXT,
+                              updated_at TEXT,
+                              search_name TEXT,
+                              PRIMARY KEY (name, tag))''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_search ON catalog (search_name)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_size ON catalog (size)")
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS sync_state
+                             (key TEXT PRIMARY KEY, value TEXT)''')
+        self.conn.commit()
+
+    def last_sync(self):
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = 'last_sync'").fetchone()
+        return float(row[0]) if row else 0.0
+
+    def needs_sync(self):
+        return time.time() - self.last_sync() > SYNC_INTERVAL
+
+    def sync(self, entries):
+        """Apply a fresh catalog as a diff: upsert changed tags, drop vanished ones."""
+        existing = {(name, tag): (digest, updated_at) for name, tag, digest, updated_at in
+                    self.conn.execute("SELECT name, tag, digest, updated_at FROM catalog")}
+        changed = []
+        seen = set()
+        for entry in entries:
+            key = entry[:2]
+            seen.add(key)
+            if existing.get(key) != (entry[5], entry[6]):
+                changed.append(entry + (f"{entry[0]}:{entry[1]}".lower(),))
+        removed = [key for key in existing if key not in seen]
+
+        with self.conn:
+            self.conn.executemany('''INSERT OR REPLACE INTO catalog
+                                     (name, tag, size, quantization, parameter_size, digest, updated_at, search_name)
+                                     VALUES (?, ?, ?, ?, ?, ?, ?, ?)''', changed)
+            self.conn.executemany("DELETE FROM catalog WHERE name = ? AND tag = ?", removed)
+            self.conn.execute("INSERT OR REPLACE INTO sync_state (key, value) VALUES ('last_sync', ?)",
+                              (str(time.time()),))
+        return len(changed), len(removed)
+
+    def search(self, query="", max_size=None, limit=500):
+        """Prefix matches first, then substring, then fuzzy (subsequence) matches."""
+        query = query.strip().lower()
+        needle = escape_like(query)
+        # Escape character by character so an escape sequence is never split by a wildcard
+        fuzzy = "%" + "%".join(escape_like(char) for char in query) + "%" if query else "%"
+        return self.conn.execute('''SELECT name, tag, size, quantization, parameter_size
+                                    FROM catalog
+                                    WHERE search_name LIKE :fuzzy ESCAPE '\\'
+                                      AND (:max_size IS NULL OR size <= :max_size)
+                                    ORDER BY CASE WHEN search_name LIKE :prefix ESCAPE '\\' THEN 0
+                                                  WHEN search_name LIKE :substring ESCAPE '\\' THEN 1
+                                                  ELSE 2 END,
+                                             search_name
+                                    LIMIT :limit''',
+                                 {"fuzzy": fuzzy, "prefix": needle + "%", "substring": "%" + needle + "%",
+                                  "max_size": max_size, "limit": limit}).fetchall()
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+class CatalogSyncWorker(QThread):
+    finished = pyqtSignal(int, int)
+    error = pyqtSignal(str)
+
+    def __init__(self, source, db_path):
+        super().__init__()
+        self.source = source
+        self.db_path = db_path
+
+    def run(self):
+        try:
+            entries = load_catalog(self.source)
+            index = CatalogIndex(self.db_path)  # SQLite connections stay on their own thread
+            try:
+                changed, removed = index.sync(entries)
+            finally:
+                index.close()
+            self.finished.emit(changed, removed)
+        except Exception as e:
+            logging.error(f"Catalog sync failed: {e}")
+            self.error.emit(str(e))
+
+
+class CatalogTableModel(QAbstractTableModel):
+    COLUMNS = ["Name", "Tag", "Size", "Quantization", "Parameter Size"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            value = self.rows[index.row()][index.column()]
+            return format_size(value) if index.column() == 2 else value
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+
+class ModelCatalogWindow(QMainWindow):
+    def __init__(self, source=CATALOG_SOURCE, db_path="model_catalog.db"):
+        super().__init__()
+        self.source = source
+        self.db_path = db_path
+        self.index = CatalogIndex(db_path)
+        from local.system_info import SystemInformation  # Needs psutil, which CatalogIndex doesn't
+        self.available_ram = SystemInformation().get_memory_details()['Available Memory (GB)']
+        self.worker = None
+        self.initUI()
+
+    def initUI(self):
+        self.setWindowTitle("Model Catalog")
+        self.setGeometry(100, 100, 900, 600)
+
+        main_layout = QVBoxLayout()
+
+        search_layout = QHBoxLayout()
+        self.search_bar = QLineEdit(self)
+        self.search_bar.setPlaceholderText("Search the catalog...")
+        search_layout.addWidget(self.search_bar)
+        self.fits_ram_box = QCheckBox(f"Fits in RAM ({self.available_ram} GB free)", self)
+        search_layout.addWidget(self.fits_ram_box)
+        self.sync_button = QPushButton("Sync", self)
+        self.sync_button.clicked.connect(self.sync_catalog)
+        search_layout.addWidget(self.sync_button)
+        main_layout.addLayout(search_layout)
+
+        self.status_label = QLabel(self)
+        main_layout.addWidget(self.status_label)
+
+        self.table_model = CatalogTableModel(self)
+        self.table_view = QTableView(self)
+        self.table_view.setModel(self.table_model)
+        self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table_view.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.table_view)
+
+        container = QWidget()
+        container.setLayout(main_layout)
+        self.setCentralWidget(container)
+
+        self.search_bar.textChanged.connect(self.run_search)
+        self.fits_ram_box.toggled.connect(self.run_search)
+
+        self.run_search()
+        if self.index.needs_sync():
+            self.sync_catalog()
+
+    def run_search(self):
+        max_size = int(self.available_ram * GB) if self.fits_ram_box.isChecked() else None
+        rows = self.index.search(self.search_bar.text(), max_size)
+        self.table_model.set_rows(rows)
+        if not (self.worker and self.worker.isRunning()):
+            self.status_label.setText(f"{len(rows)} models")
+
+    def sync_catalog(self):
+        if not self.source:
+            self.status_label.setText("No catalog source configured (set SUPERNOVA_CATALOG_SOURCE)")
+            return
+        if self.worker is not None and self.worker.isRunning():
+            return
+        self.status_label.setText("Syncing catalog in the background...")
+        self.worker = CatalogSyncWorker(self.source, self.db_path)
+        self.worker.finished.connect(self.sync_finished)
+        self.worker.error.connect(lambda message: self.status_label.setText(f"Catalog sync failed: {message}"))
+        self.worker.start()
+
+    def sync_finished(self, changed, removed):
+        self.run_search()
+        self.status_label.setText(f"Catalog synced: {changed} updated, {removed} removed")
+
+    def closeEvent(self, event):
+        self.index.close()
+        super().closeEvent(event)
+
+if __name__ == "__main__":
+    app = QApplication(sys.argv)
+    window = ModelCatalogWindow(sys.argv[1] if len(sys.argv) > 1 else CATALOG_SOURCE)
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,68 @@
+import threading
+import time
+import ollama
+
+
+def as_dict(value):
+    """ollama>=0.4 returns pydantic models; older clients return plain dicts."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return dict(value)
+
+
+class ModelRegistry:
+    """Process-wide cache of the installed Ollama models.
+
+    Every window and chatbot asks the registry instead of calling
+    `ollama list`, so the server is queried at most once per TTL.
+    """
+
+    def __init__(self, ttl=30):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self._models = None
+        self._fetched_at = 0.0
+
+    def list_models(self, refresh=False):
+        """Return installed models as dicts, fetching only when stale or forced."""
+        with self.lock:
+            if refresh or self._models is None or time.monotonic() - self._fetched_at > self.ttl:
+                response = ollama.list()
+                models = []
+                for model in response['models']:
+                    model = as_dict(model)
+                    model['name'] = model.get('name') or model.get('model', '')
+                    model['details'] = as_dict(model.get('details') or {})
+                    models.append(model)
+                self._models = models
+                self._fetched_at = time.monotonic()
+            return list(self._models)
+
+    def names(self, refresh=False):
+        return [model['name'] for model in self.list_models(refresh)]
+
+    @staticmethod
+    def candidates(name):
+        """Names a model may be listed under; `ollama list` tags untagged names as :latest."""
+        return {name, f"{name}:latest"}
+
+    def has_model(self, name):
+        """Check for a model, refreshing once before reporting it missing."""
+        candidates = self.candidates(name)
+        if candidates.intersection(self.names()):
+            return True
+        return bool(candidates.intersection(self.names(refresh=True)))
+
+    def digest(self, name):
+        candidates = self.candidates(name)
+        for model in self.list_models():
+            if model['name'] in candidates:
+                return model.get('digest')
+        return None
+
+    def invalidate(self):
+        with self.lock:
+            self._models = None
+
+
+registry = ModelRegistry()
@@ -0,0 +1,175 @@
+import json
+import logging
+import os
+import sqlite3
+import psutil
+import ollama
+from PyQt5.QtCore import QThread, pyqtSignal
+from local.model_registry import as_dict
+
+BENCHMARK_PROMPT = (
+    "Summarize the following notes in three bullet points.\n\n"
+    + "The quarterly report covers revenue, hiring, infrastructure costs, customer churn and the product "
+      "roadmap, with detailed commentary from each team lead on risks and next steps. " * 12
+)
+BENCHMARK_TOKENS = 64
+RUNS_PER_CONFIG = 2
+RAM_HEADROOM = 0.9
+CONTEXT_TOLERANCE = 0.05  # A larger context is kept if it costs less than this much throughput
+BATCH_SIZES = (128, 256, 512, 1024)
+CONTEXT_SIZES = (2048, 4096, 8192, 16384)
+
+
+class ModelOptionsStore:
+    """Generation options saved per provider and model."""
+
+    def __init__(self, db_path="model_options.db"):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS model_options
+                             (provider TEXT,
+                              model TEXT,
+                              options TEXT,
+                              tokens_per_sec REAL,
+                              updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                              PRIMARY KEY (provider, model))''')
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(model_options)")]
+        if "cache_responses" not in columns:
+            self.conn.execute("ALTER TABLE model_options ADD COLUMN cache_responses INTEGER DEFAULT 0")
+        self.conn.commit()
+
+    def get(self, provider, model):
+        row = self.conn.execute("SELECT options FROM model_options WHERE provider = ? AND model = ?",
+                                (provider, model)).fetchone()
+        return json.loads(row[0]) if row else {}
+
+    def tuned_speed(self, provider, model):
+        row = self.conn.execute("SELECT tokens_per_sec FROM model_options WHERE provider = ? AND model = ?",
+                                (provider, model)).fetchone()
+        return row[0] if row else None
+
+    def cache_enabled(self, provider, model):
+        """Whether replies to this model's temperature 0 prompts go through the response cache."""
+        row = self.conn.execute("SELECT cache_responses FROM model_options WHERE provider = ? AND model = ?",
+                                (provider, model)).fetchone()
+        return bool(row and row[0])
+
+    def set(self, provider, model, options, tokens_per_sec=None, cache_responses=None):
+        self.conn.execute('''INSERT INTO model_options (provider, model, options, tokens_per_sec, cache_responses)
+                             VALUES (?, ?, ?, ?, COALESCE(?, 0))
+                             ON CONFLICT (provider, model) DO UPDATE SET
+                                 options = excluded.options,
+                                 tokens_per_sec = excluded.tokens_per_sec,
+                                 cache_responses = COALESCE(?, cache_responses),
+                                 updated_at = CURRENT_TIMESTAMP''',
+                          (provider, model, json.dumps(options), tokens_per_sec, cache_responses, cache_responses))
+        self.conn.commit()
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+def thread_counts():
+    """Thread counts worth trying: around the physical core count, plus all logical cores."""
+    physical = psutil.cpu_count(logical=False) or os.cpu_count() or 1
+    logical = psutil.cpu_count(logical=True) or physical
+    candidates = {max(1, physical // 2), max(1, physical * 3 // 4), physical, logical}
+    return sorted(candidates)
+
+
+class AutoTuner:
+    """Sweeps num_thread, num_batch and num_ctx with short generations on this machine."""
+
+    def __init__(self, model, base_options=None, progress_callback=None):
+        self.model = model
+        self.base_options = dict(base_options or {})
+        self.progress_callback = progress_callback
+        self.stopped = False
+
+    def report(self, message):
+        logging.info(message)
+        if self.progress_callback:
+            self.progress_callback(message)
+
+    def loaded_size(self):
+        """Memory used by the model as loaded by the server, in bytes."""
+        for model in as_dict(ollama.ps()).get("models", []):
+            model = as_dict(model)
+            if model.get("name") == self.model or model.get("model") == self.model:
+                return model.get("size") or 0
+        return 0
+
+    def ram_budget(self):
+        # The model under test is already resident, so its memory counts as available
+        return (psutil.virtual_memory().available + self.loaded_size()) * RAM_HEADROOM
+
+    def measure(self, options):
+        """Prompt plus generation tokens per second, or None if it does not fit in RAM."""
+        run_options = {**options, "temperature": 0, "seed": 42, "num_predict": BENCHMARK_TOKENS}
+        ollama.generate(model=self.model, prompt="Hi", options={**run_options, "num_predict": 1})  # Load/reload
+        if self.loaded_size() > self.ram_budget():
+            return None
+        rates = []
+        for _ in range(RUNS_PER_CONFIG):
+            result = as_dict(ollama.generate(model=self.model, prompt=BENCHMARK_PROMPT, options=run_options))
+            tokens = (result.get("prompt_eval_count") or 0) + (result.get("eval_count") or 0)
+            duration = (result.get("prompt_eval_duration") or 0) + (result.get("eval_duration") or 0)
+            if duration:
+                rates.append(tokens / (duration / 1e9))
+        return sum(rates) / len(rates) if rates else None
+
+    def sweep(self, options, knob, values, prefer_larger=False):
+        results = {}
+        for value in values:
+            if self.stopped:
+                break
+            candidate = {**options, knob: value}
+            rate = self.measure(candidate)
+            results[value] = rate
+            self.report(f"{knob}={value}: " + (f"{rate:.1f} tok/s" if rate else "exceeds the RAM budget"))
+        fitting = {value: rate for value, rate in results.items() if rate}
+        if not fitting:
+            return options, None
+        best_rate = max(fitting.values())
+        if prefer_larger:
+            value = max(value for value, rate in fitting.items() if rate >= best_rate * (1 - CONTEXT_TOLERANCE))
+        else:
+            value = max(fitting, key=fitting.get)
+        return {**options, knob: value}, fitting[value]
+
+    def run(self):
+        """Return (best options, tokens per second)."""
+        options = dict(self.base_options)
+        rate = None
+        for knob, values, prefer_larger in (("num_thread", thread_counts(), False),
+                                            ("num_batch", BATCH_SIZES, False),
+                                            ("num_ctx", CONTEXT_SIZES, True)):
+            options, knob_rate = self.sweep(options, knob, values, prefer_larger)
+            rate = knob_rate or rate
+            if self.stopped:
+                break
+        return options, rate
+
+    def stop(self):
+        self.stopped = True
+
+
+class AutoTuneWorker(QThread):
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(dict, float)
+    error = pyqtSignal(str)
+
+    def __init__(self, model, base_options=None):
+        super().__init__()
+        self.tuner = AutoTuner(model, base_options, self.progress.emit)
+
+    def run(self):
+        try:
+            options, rate = self.tuner.run()
+            self.finished.emit(options, rate or 0.0)
+        except Exception as e:
+            logging.error(f"Auto-tune failed: {e}")
+            self.error.emit(f"Auto-tune failed: {e}")
+
+    def stop(self):
+        self.tuner.stop()
@@ -1,6 +1,12 @@
-from langchain_ollama import ChatOllama
+import json
+import ollama
 from PyQt5.QtCore import QObject, pyqtSignal
-from local.ollama_manager import show_ollama_list, pull_ollama_model
+from local.ollama_manager import pull_ollama_model
+from local.model_registry import registry
+from local.ollama_supervisor import supervisor
+from local.prefill import PromptPrefiller
+from database.response_cache import mark_cached
+from utils.helpers import StreamStats
 
 class BaseChatbot(QObject):
     response_signal = pyqtSignal(str)
@@ -15,25 +21,65 @@ class BaseChatbot(QObject):
         raise NotImplementedError("Subclasses must implement run_chatbot method")
 
 class OllamaChatbot(BaseChatbot):
+    chunk_signal = pyqtSignal(str)
+
+    provider = "Ollama"
+
+    def __init__(self, model, system_prompt="You are a helpful assistant", chat_history=None,
+                 options=None, response_cache=None):
+        super().__init__(model, system_prompt, chat_history)
+        self.options = options or {}
+        self.response_cache = response_cache
+        self.last_stats = None
+        self.last_error = None  # Set when the last turn failed; the reply is then an error message
+        self.prefiller = PromptPrefiller(supervisor.host)
+        self._prefilled_key = None
+        self._cancelled = False
+
     def run_chatbot(self, user_input):
         assistant_message = None
+        self.last_error = None
+        self._cancelled = False
+        cache_key = self.cache_key(user_input)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                self.messages.append({"role": "user", "content": user_input})
+                self.messages.append({"role": "assistant", "content": cached})
+                self.response_signal.emit(mark_cached(cached))
+                return
+
+        if not supervisor.wait_until_ready():
+            self.handle_generic_error(TimeoutError(f"The Ollama server at {supervisor.host} did not start in time."))
+            return
+
         try:
-            models = show_ollama_list()
-            if self.model not in models:
+            if not registry.has_model(self.model):
                 raise ValueError(f"Model {self.model} not found.")
 
-            chatbot = ChatOllama(model=self.model)
-            
-            if not any(msg["role"] == "system" for msg in self.messages):
-                self.messages.insert(0, {"role": "system", "content": self.system_prompt})
+            # Talk to the server directly: ChatOllama can't pass runtime options such as num_batch
+            options, keep_alive = self.request_options()
+            self.ensure_system_prompt()
             
             self.messages.append({"role": "user", "content": user_input})
-            ollama_messages = [(msg["role"], msg["content"]) for msg in self.messages]
             
-            response = chatbot.invoke(ollama_messages)
-            assistant_message = response.content
+            stats = StreamStats()
+            parts = []
+            for chunk in ollama.chat(model=self.model, messages=self.messages, stream=True,
+                                     options=options, keep_alive=keep_alive):
+                if self._cancelled:
+                    break  # Keep what has arrived; closing the stream stops generation
+                content = chunk["message"]["content"]
+                if content:
+                    stats.on_token()
+                    parts.append(content)
+                    self.chunk_signal.emit(content)
+            assistant_message = "".join(parts)
+            self.last_stats = stats.finish()
             
             self.messages.append({"role": "assistant", "content": assistant_message})
+            if cache_key is not None:
+                self.response_cache.set(cache_key, assistant_message)
         except ValueError as e:
             self.handle_model_not_found(e, user_input)
         except Exception as e:
@@ -42,9 +88,47 @@ class OllamaChatbot(BaseChatbot):
         if assistant_message is not None:
             self.response_signal.emit(assistant_message)
 
+    def cancel(self):
+        """Stop the streaming reply after the current chunk."""
+        self._cancelled = True
+
+    def request_options(self):
+        """Return (options, keep_alive); prefill must use the same ones to hit the KV cache."""
+        options = {**supervisor.settings.request_options(), **self.options}
+        keep_alive = options.pop("keep_alive", None)
+        return options, keep_alive
+
+    def ensure_system_prompt(self):
+        if not any(msg["role"] == "system" for msg in self.messages):
+            self.messages.insert(0, {"role": "system", "content": self.system_prompt})
+
+    def prefill(self):
+        """Evaluate the conversation so far in the background, ahead of the next turn."""
+        if not supervisor.ready.is_set():
+            return
+        self.ensure_system_prompt()
+        options, keep_alive = self.request_options()
+        key = json.dumps([self.model, self.messages, options], sort_keys=True)
+        if key == self._prefilled_key:
+            return  # Already in the cache, e.g. the user paused typing twice
+        self._prefilled_key = key
+        self.prefiller.start(self.model, list(self.messages), options, keep_alive)
+
+    def cancel_prefill(self):
+        self._prefilled_key = None
+        self.prefiller.cancel()
+
+    def cache_key(self, user_input):
+        """Return the response cache key for this turn, or None if caching is off."""
+        if self.response_cache is None or not self.response_cache.is_cacheable(self.options):
+            return None
+        messages = self.messages + [{"role": "user", "content": user_input}]
+        return self.response_cache.make_key(self.provider, self.model, self.options, messages)
+
     def handle_model_not_found(self, error, user_input):
         try:
             pull_ollama_model_output = pull_ollama_model(self.model)
+            registry.invalidate()
             if pull_ollama_model_output:
                 model_name, total_size, progress = pull_ollama_model_output
                 progress_message = f"Downloading model {model_name} with {total_size} MB size ... {progress}%"
@@ -53,10 +137,14 @@ class OllamaChatbot(BaseChatbot):
                 
                 self.run_chatbot(user_input)
             else:
-                self.response_signal.emit(f"Failed to download model {self.model}")
+                self.report_error(f"Failed to download model {self.model}")
         except Exception as e:
             self.handle_generic_error(e)
 
     def handle_generic_error(self, error):
-        self.response_signal.emit(f"Sorry, there was an error: {str(error)}")
+        self.report_error(f"Sorry, there was an error: {str(error)}")
+
+    def report_error(self, message):
+        self.last_error = message
+        self.response_signal.emit(message)
 
@@ -4,6 +4,7 @@ import subprocess
 import os
 import re
 import json
+from local.ollama_supervisor import supervisor
 
 def pull_ollama_model(model_name, progress_callback=None):
     command = ["ollama", "pull", model_name]
@@ -34,47 +35,48 @@ def pull_ollama_model(model_name, progress_callback=None):
     else:
         return None
 
-def start_ollama_server(port=8080):
-    global server_process
-    command = ["ollama", "serve", f"--port={port}"]
-    server_process = subprocess.Popen(command, creationflags=subprocess.CREATE_NEW_CONSOLE)
-    return "Server started."
+def start_ollama_server(port=None):
+    if port is not None:
+        supervisor.host = f"http://127.0.0.1:{port}"  # `ollama serve` takes its address from OLLAMA_HOST
+    return supervisor.start()
 
 def close_ollama_server():
-    server_process.terminate()
-    server_process.wait()
-    return "Server closed."
+    return supervisor.stop()
 
 def use_gpu(use_gpu: bool):
-    if use_gpu:
-        os.environ['OLLAMA_DEVICE'] = 'gpu'
-    else:
-        os.environ['OLLAMA_DEVICE'] = 'cpu'
+    settings = supervisor.settings
+    settings.use_gpu = use_gpu
+    settings.save()  # Applied per request as num_gpu, no restart needed
     return "GPU setting updated."
 
+MODELS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "providers", "models.json")
+
+def parse_ollama_list(ollama_output):
+    """Extract model names from `ollama list` output."""
+    models = []
+    for line in ollama_output.split('\n'):
+        # Skip the header and any error lines
+        if "failed" in line or "NAME" in line:
+            continue
+        parts = line.split()
+        if parts:
+            models.append(parts[0])
+    return models
+
 def show_ollama_list():
     command = ["ollama", "list"]
     result = subprocess.run(command, capture_output=True, text=True)
     ollama_output = result.stdout
 
-    # Filter out lines containing "failed" or "NAME"
-    filtered_output = "\n".join([line for line in ollama_output.split('\n') if "failed" not in line and "NAME" not in line])
-
-    # Extract models from the filtered output
-    models = []
-    lines = filtered_output.strip().split('\n')
-    for line in lines:
-        parts = line.split()
-        if len(parts) > 0:
-            models.append(parts[0])
+    models = parse_ollama_list(ollama_output)
 
     # Update the models.json file
-    with open('configs\\models.json', 'r') as file:
+    with open(MODELS_FILE, 'r') as file:
         data = json.load(file)
     
     data["Ollama"] = models
     
-    with open('configs\\models.json', 'w') as file:
+    with open(MODELS_FILE, 'w') as file:
         json.dump(data, file, indent=4)
 
     return ollama_output
@@ -1,9 +1,101 @@
 import sys
+import json
+import sqlite3
 import ollama
-from PyQt5.QtWidgets import QApplication, QMainWindow, QTableView, QVBoxLayout, QWidget, QTabWidget, QLabel
+from PyQt5.QtWidgets import QApplication, QMainWindow, QTableView, QVBoxLayout, QWidget, QTabWidget, QLabel, QPlainTextEdit
 from PyQt5.QtGui import QStandardItemModel, QStandardItem
-from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QHeaderView  
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from PyQt5.QtWidgets import QHeaderView
+from local.model_registry import registry, as_dict
+
+LARGE_TEXT_THRESHOLD = 2000
+PAGE_SIZE = 20000
+LIST_PREVIEW_ITEMS = 20
+
+
+class ModelDetailsCache:
+    """Persisted `ollama.show` results, reused until the model's digest changes."""
+
+    def __init__(self, db_path="model_details.db"):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS model_details
+                             (name TEXT PRIMARY KEY,
+                              digest TEXT,
+                              details TEXT)''')
+        self.conn.commit()
+
+    def get(self, name):
+        """Return details for a model, calling `ollama.show` only on a miss."""
+        digest = registry.digest(name)
+        row = self.conn.execute("SELECT digest, details FROM model_details WHERE name = ?", (name,)).fetchone()
+        if row is not None and digest is not None and row[0] == digest:
+            return json.loads(row[1])
+
+        details = as_dict(ollama.show(name))
+        details = json.loads(json.dumps(details, default=str))  # Normalize datetimes etc. to what we store
+        self.conn.execute("INSERT OR REPLACE INTO model_details (name, digest, details) VALUES (?, ?, ?)",
+                          (name, digest, json.dumps(details)))
+        self.conn.commit()
+        return details
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+
+class ModelDetailsWorker(QThread):
+    finished = pyqtSignal(dict)
+    error = pyqtSignal(str)
+
+    def __init__(self, model_name):
+        super().__init__()
+        self.model_name = model_name
+
+    def run(self):
+        try:
+            cache = ModelDetailsCache()
+            try:
+                self.finished.emit(cache.get(self.model_name))
+            finally:
+                cache.close()
+        except Exception as e:
+            self.error.emit(f"Failed to load details for {self.model_name}: {e}")
+
+
+class PagedTextViewer(QPlainTextEdit):
+    """Read-only viewer that appends long text a page at a time as you scroll."""
+
+    def __init__(self, text, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.text = text
+        self.loaded = 0
+        self.load_next_page()
+        self.verticalScrollBar().valueChanged.connect(self.maybe_load_more)
+
+    def load_next_page(self):
+        if self.loaded >= len(self.text):
+            return
+        page = self.text[self.loaded:self.loaded + PAGE_SIZE]
+        self.loaded += len(page)
+        cursor = self.textCursor()
+        cursor.movePosition(cursor.End)
+        cursor.insertText(page)
+
+    def maybe_load_more(self, value):
+        scroll_bar = self.verticalScrollBar()
+        if value >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self.load_next_page()
+
+
+def format_value(value):
+    """Stringify a detail value, summarizing long lists such as tokenizer vocabularies."""
+    if isinstance(value, list) and len(value) > LIST_PREVIEW_ITEMS:
+        preview = ", ".join(str(item) for item in value[:LIST_PREVIEW_ITEMS])
+        return f"[{preview}, ...] ({len(value)} items)"
+    return str(value)
+
+
 class ModelDetailsWindow(QMainWindow):
     def __init__(self, model_details):
         super().__init__()
@@ -12,27 +104,50 @@ class ModelDetailsWindow(QMainWindow):
 
         self.tab_widget = QTabWidget(self)
         self.setCentralWidget(self.tab_widget)
+        self.tab_values = []
+        self.built_tabs = set()
+        self.tab_widget.currentChanged.connect(self.build_tab)
 
         self.populate_tabs(model_details)
 
+    @classmethod
+    def for_model(cls, model_name):
+        """Open an empty window and fill it from the details cache in the background."""
+        window = cls({})
+        window.worker = ModelDetailsWorker(model_name)
+        window.worker.finished.connect(window.populate_tabs)
+        window.worker.error.connect(lambda message: window.setWindowTitle(message))
+        window.worker.start()
+        return window
+
     def populate_tabs(self, model_details):
+        # Tabs start empty and are only built when first selected
         for key, value in model_details.items():
-            if isinstance(value, dict):
-                tab = QWidget()
-                layout = QVBoxLayout()
-                table_view = QTableView()
-                table_view.setModel(self.create_table_model(value))
-                table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-                layout.addWidget(table_view)
-                tab.setLayout(layout)
-                self.tab_widget.addTab(tab, key)
+            tab = QWidget()
+            tab.setLayout(QVBoxLayout())
+            self.tab_values.append(value)
+            self.tab_widget.addTab(tab, key)
+        self.build_tab(self.tab_widget.currentIndex())
+
+    def build_tab(self, index):
+        if index < 0 or index in self.built_tabs or index >= len(self.tab_values):
+            return
+        self.built_tabs.add(index)
+        key = self.tab_widget.tabText(index)
+        value = self.tab_values[index]
+        layout = self.tab_widget.widget(index).layout()
+        if isinstance(value, dict):
+            table_view = QTableView()
+            table_view.setModel(self.create_table_model(value))
+            table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+            layout.addWidget(table_view)
+        else:
+            text = format_value(value)
+            if len(text) > LARGE_TEXT_THRESHOLD or "\n" in text:
+                layout.addWidget(PagedTextViewer(text))
             else:
-                tab = QWidget()
-                layout = QVBoxLayout()
-                label = QLabel(f"{key}: {value}")
+                label = QLabel(f"{key}: {text}")
                 layout.addWidget(label)
-                tab.setLayout(layout)
-                self.tab_widget.addTab(tab, key)
 
     def create_table_model(self, details):
         model = QStandardItemModel(0, 2)
@@ -40,15 +155,14 @@ class ModelDetailsWindow(QMainWindow):
         for key, value in details.items():
             key_item = QStandardItem(str(key))
             key_item.setTextAlignment(Qt.AlignCenter)
-            value_item = QStandardItem(str(value))
+            value_item = QStandardItem(format_value(value))
             value_item.setTextAlignment(Qt.AlignCenter)
             model.appendRow([key_item, value_item])
         return model
 
 if __name__ == "__main__":
-    model_name = 'mapler/gpt2'
-    model_details = ollama.show(model_name) 
+    model_name = sys.argv[1] if len(sys.argv) > 1 else 'mapler/gpt2'
     app = QApplication(sys.argv)
-    window = ModelDetailsWindow(model_details)
+    window = ModelDetailsWindow.for_model(model_name)
     window.show()
-    sys.exit(app.exec_())
\ No newline at end of file
+    sys.exit(app.exec_())
@@ -1,14 +1,12 @@
-import ollama
-from local.ollama_manager import show_models_list
+from local.model_registry import registry
 import sys
 import logging
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QTableView, QVBoxLayout, QWidget,
+    QApplication, QMainWindow, QTableView, QVBoxLayout, QHBoxLayout, QWidget,
     QLineEdit, QLabel, QHeaderView, QProgressBar, QStyleFactory,
-    QMessageBox
+    QMessageBox, QPushButton
 )
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QSortFilterProxyModel
-from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QAbstractTableModel, QModelIndex
 
 # Configure logging
 logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,16 +15,15 @@ class OllamaListWorker(QThread):
     finished = pyqtSignal(list)
     error = pyqtSignal(str)
 
-    def __init__(self, retries=3):
+    def __init__(self, retries=3, refresh=False):
         super().__init__()
         self.retries = retries
+        self.refresh = refresh
 
     def run(self):
         for attempt in range(self.retries):
             try:
-                show_models_list()
-                model_list = ollama.list()
-                models = model_list['models']
+                models = registry.list_models(refresh=self.refresh or attempt > 0)
                 self.finished.emit(models)
                 return  # Success, exit the loop
             except Exception as e:
@@ -35,6 +32,154 @@ class OllamaListWorker(QThread):
                     self.error.emit(f"Failed to fetch models after {self.retries} attempts: {e}")
                     return
 
+COLUMNS = [
+    "Name", "Model", "Modified At", "Size",
+    "Family", "Parameter Size", "Quantization Level",
+    "Format", "Parent Model"
+]
+SIZE_COLUMN = 3
+
+
+def format_size(size):
+    if size < 1024:
+        return f"{size} B"
+    elif size < 1024 * 1024:
+        return f"{size / 1024:.2f} KB"
+    elif size < 1024 * 1024 * 1024:
+        return f"{size / (1024 * 1024):.2f} MB"
+    else:
+        return f"{size / (1024 * 1024 * 1024):.2f} GB"
+
+
+class ModelRecord:
+    """One table row: display strings plus precomputed sort and search keys."""
+    __slots__ = ("name", "values", "keys", "search_text")
+
+    def __init__(self, model):
+        details = model.get('details') or {}
+        size = model.get('size') or 0
+        self.name = model.get('name', '')
+        self.values = (
+            self.name,
+            model.get('model') or '',
+            str(model.get('modified_at') or ''),
+            format_size(size),
+            details.get('family') or '',
+            details.get('parameter_size') or '',
+            details.get('quantization_level') or '',
+            details.get('format') or '',
+            details.get('parent_model') or '',
+        )
+        self.keys = tuple(size if column == SIZE_COLUMN else value.casefold()
+                          for column, value in enumerate(self.values))
+        self.search_text = "\0".join(self.keys[column] for column in range(len(COLUMNS)) if column != SIZE_COLUMN)
+
+
+class OllamaModelTableModel(QAbstractTableModel):
+    """Installed models, sorted and filtered in place.
+
+    Refreshes are applied as diffs so only inserted, removed or changed rows
+    are touched, and sorting/filtering use the keys precomputed per record.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = {}
+        self.rows = []  # Visible records in display order
+        self.sort_column = 0
+        self.sort_order = Qt.AscendingOrder
+        self.filter_text = ""
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.rows[index.row()].values[index.column()]
+        if role == Qt.TextAlignmentRole:
+            return Qt.AlignCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def matches(self, record):
+        return not self.filter_text or self.filter_text in record.search_text
+
+    def sort_key(self, record):
+        return record.keys[self.sort_column]
+
+    def insert_position(self, record):
+        key = self.sort_key(record)
+        descending = self.sort_order == Qt.DescendingOrder
+        for row, other in enumerate(self.rows):
+            other_key = self.sort_key(other)
+            if (key > other_key) if descending else (key < other_key):
+                return row
+        return len(self.rows)
+
+    def apply_models(self, models):
+        """Diff a fresh model list against the table and apply only the changes."""
+        incoming = {}
+        for model in models:
+            record = ModelRecord(model)
+            incoming[record.name] = record
+
+        for row in range(len(self.rows) - 1, -1, -1):
+            if self.rows[row].name not in incoming:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+        for name in set(self.records) - set(incoming):
+            del self.records[name]
+
+        for name, record in incoming.items():
+            current = self.records.get(name)
+            if current is not None and current.values == record.values:
+                continue
+            self.records[name] = record
+            if current is not None and current in self.rows:
+                row = self.rows.index(current)
+                if current.keys[self.sort_column] == record.keys[self.sort_column] and self.matches(record):
+                    self.rows[row] = record
+                    self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+                    continue
+                self.beginRemoveRows(QModelIndex(), row, row)
+                del self.rows[row]
+                self.endRemoveRows()
+            if self.matches(record):
+                row = self.insert_position(record)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.rows.insert(row, record)
+                self.endInsertRows()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        old_rows = list(self.rows)
+        self.sort_column = column
+        self.sort_order = order
+        self.rows.sort(key=self.sort_key, reverse=order == Qt.DescendingOrder)
+        new_positions = {id(record): row for row, record in enumerate(self.rows)}
+        old_indexes = self.persistentIndexList()
+        new_indexes = [self.index(new_positions[id(old_rows[index.row()])], index.column()) for index in old_indexes]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
+
+    def set_filter(self, text):
+        self.beginResetModel()
+        self.filter_text = text.casefold()
+        self.rows = sorted((record for record in self.records.values() if self.matches(record)),
+                           key=self.sort_key, reverse=self.sort_order == Qt.DescendingOrder)
+        self.endResetModel()
+
+
 class OllamaModelList(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -48,9 +193,14 @@ class OllamaModelList(QMainWindow):
 
         main_layout = QVBoxLayout()
 
+        search_layout = QHBoxLayout()
         self.search_bar = QLineEdit(self)
         self.search_bar.setPlaceholderText("Search models...")
-        main_layout.addWidget(self.search_bar)
+        search_layout.addWidget(self.search_bar)
+        self.refresh_button = QPushButton("Refresh", self)
+        self.refresh_button.clicked.connect(lambda: self.populate_table(refresh=True))
+        search_layout.addWidget(self.refresh_button)
+        main_layout.addLayout(search_layout)
 
         self.loading_label = QLabel("Loading models...", self)
         self.loading_label.setAlignment(Qt.AlignCenter)
@@ -69,80 +219,34 @@ class OllamaModelList(QMainWindow):
         container.setLayout(main_layout)
         self.setCentralWidget(container)
 
-        self.model = QStandardItemModel(0, 9, self)  # Reduced columns by 1 to exclude "Digest"
-        self.model.setHorizontalHeaderLabels([
-            "Name", "Model", "Modified At", "Size",
-            "Family", "Parameter Size", "Quantization Level",
-            "Format", "Parent Model"
-        ])
-        self.proxy_model = QSortFilterProxyModel(self)
-        self.proxy_model.setSourceModel(self.model)
-        self.proxy_model.setFilterCaseSensitivity(Qt.CaseInsensitive)
-        self.proxy_model.setFilterKeyColumn(-1)  # Search all columns
-
-        self.table_view.setModel(self.proxy_model)
+        self.model = OllamaModelTableModel(self)
+
+        self.table_view.setModel(self.model)
         self.table_view.setSortingEnabled(True)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
 
         # Center align the header text
         self.table_view.horizontalHeader().setDefaultAlignment(Qt.AlignCenter)
 
-        self.search_bar.textChanged.connect(self.proxy_model.setFilterFixedString)
+        self.search_bar.textChanged.connect(self.model.set_filter)
 
         self.populate_table()
 
-    def populate_table(self):
+    def populate_table(self, refresh=False):
         self.loading_label.show()
         self.progress_bar.show()
 
-        self.worker = OllamaListWorker(retries=3)
+        self.worker = OllamaListWorker(retries=3, refresh=refresh)
         self.worker.finished.connect(self.process_output)
         self.worker.error.connect(self.show_error)
         self.worker.start()
 
     def process_output(self, models):
-        self.model.clear()
-        self.model.setHorizontalHeaderLabels([
-            "Name", "Model", "Modified At", "Size",
-            "Family", "Parameter Size", "Quantization Level",
-            "Format", "Parent Model"
-        ])
-
-        for model in models:
-            details = model.get('details', {})
-            size = model.get('size', 0)
-            formatted_size = self.format_size(size)
-            row = [
-                self.create_centered_item(model.get('name', '')),
-                self.create_centered_item(model.get('model', '')),
-                self.create_centered_item(model.get('modified_at', '')),
-                self.create_centered_item(formatted_size),
-                self.create_centered_item(details.get('family', '')),
-                self.create_centered_item(details.get('parameter_size', '')),
-                self.create_centered_item(details.get('quantization_level', '')),
-                self.create_centered_item(details.get('format', '')),
-                self.create_centered_item(details.get('parent_model', ''))
-            ]
-            self.model.appendRow(row)
+        self.model.apply_models(models)
 
         self.loading_label.hide()
         self.progress_bar.hide()
 
-    def format_size(self, size):
-        if size < 1024:
-            return f"{size} B"
-        elif size < 1024 * 1024:
-            return f"{size / 1024:.2f} KB"
-        elif size < 1024 * 1024 * 1024:
-            return f"{size / (1024 * 1024):.2f} MB"
-        else:
-            return f"{size / (1024 * 1024 * 1024):.2f} GB"
-
-    def create_centered_item(self, text):
-        item = QStandardItem(text)
-        item.setTextAlignment(Qt.AlignCenter)
-        return item
-
     def show_error(self, message):
         self.loading_label.hide()
         self.progress_bar.hide()
@@ -0,0 +1,196 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+SETTINGS_FILE = "ollama_settings.json"
+HEALTH_INTERVAL = 2.0
+HEALTH_TIMEOUT = 1.0
+FAILURES_BEFORE_RESTART = 3
+MAX_BACKOFF = 60.0
+STABLE_AFTER = 60.0
+READY_TIMEOUT = 30.0
+
+
+class OllamaServerSettings:
+    """Throughput-related server settings, passed as environment or request options."""
+
+    FIELDS = ("num_parallel", "max_loaded_models", "keep_alive", "num_thread", "use_gpu")
+
+    def __init__(self, num_parallel=None, max_loaded_models=None, keep_alive="5m", num_thread=None, use_gpu=True):
+        self.num_parallel = num_parallel  # Request slots per loaded model; None lets Ollama decide
+        self.max_loaded_models = max_loaded_models
+        self.keep_alive = keep_alive  # How long an idle model stays in memory, e.g. "5m" or "-1"
+        self.num_thread = num_thread  # CPU threads per request; None uses the physical core count
+        self.use_gpu = use_gpu
+
+    @classmethod
+    def load(cls, path=SETTINGS_FILE):
+        try:
+            with open(path, 'r') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return cls()
+        return cls(**{key: value for key, value in data.items() if key in cls.FIELDS})
+
+    def save(self, path=SETTINGS_FILE):
+        with open(path, 'w') as file:
+            json.dump({field: getattr(self, field) for field in self.FIELDS}, file, indent=4)
+
+    def server_env(self):
+        """Environment for `ollama serve`; these only take effect when the server starts."""
+        env = {}
+        if self.num_parallel:
+            env["OLLAMA_NUM_PARALLEL"] = str(self.num_parallel)
+        if self.max_loaded_models:
+            env["OLLAMA_MAX_LOADED_MODELS"] = str(self.max_loaded_models)
+        if self.keep_alive:
+            env["OLLAMA_KEEP_ALIVE"] = str(self.keep_alive)
+        return env
+
+    def request_options(self):
+        """Per-request model options, applied to servers we did not start too."""
+        options = {}
+        if self.num_thread:
+            options["num_thread"] = int(self.num_thread)
+        if not self.use_gpu:
+            options["num_gpu"] = 0
+        if self.keep_alive:
+            options["keep_alive"] = self.keep_alive
+        return options
+
+
+class OllamaSupervisor:
+    """Starts or adopts the local Ollama server, watches its health and restarts it on crashes."""
+
+    def __init__(self, host=None, settings=None):
+        host = host or os.environ.get("OLLAMA_HOST") or "127.0.0.1:11434"
+        self.host = host if host.startswith("http") else f"http://{host}"
+        self.settings = settings or OllamaServerSettings.load()
+        self.process = None
+        self.owned = False
+        self.ready = threading.Event()
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.monitor = None
+        self.backoff = 1.0
+        self.restarts = 0
+
+    def is_healthy(self):
+        try:
+            with urllib.request.urlopen(f"{self.host}/api/version", timeout=HEALTH_TIMEOUT) as response:
+                return response.status == 200
+        except Exception:
+            return False
+
+    def start(self):
+        """Adopt a running server or launch one, then keep watching it."""
+        with self.lock:
+            self.stopping.clear()
+            if self.is_healthy():
+                if self.process is None:
+                    logging.info(f"Using the Ollama server already running at {self.host}")
+                self.ready.set()
+            elif self.process is None or self.process.poll() is not None:
+                self._launch()
+            if self.monitor is None or not self.monitor.is_alive():
+                self.monitor = threading.Thread(target=self._watch, daemon=True)
+                self.monitor.start()
+        return "Server started."
+
+    def _launch(self):
+        env = dict(os.environ)
+        env.update(self.settings.server_env())
+        env["OLLAMA_HOST"] = self.host.split("://", 1)[1]
+        kwargs = {}
+        if sys.platform == "win32":
+            kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+        else:
+            kwargs["start_new_session"] = True  # Don't forward the terminal's Ctrl+C
+        self.ready.clear()
+        try:
+            self.process = subprocess.Popen(["ollama", "serve"], env=env, stdout=subprocess.DEVNULL,
+                                            stderr=subprocess.DEVNULL, **kwargs)
+        except OSError as e:
+            logging.error(f"Could not start the Ollama server: {e}")
+            self.process = None
+            return
+        self.owned = True
+        logging.info(f"Started Ollama server (pid {self.process.pid}) at {self.host}")
+
+    def _watch(self):
+        failures = 0
+        healthy_since = None
+        while not self.stopping.wait(HEALTH_INTERVAL):
+            if self.is_healthy():
+                failures = 0
+                self.ready.set()
+                healthy_since = healthy_since or time.monotonic()
+                if time.monotonic() - healthy_since > STABLE_AFTER:
+                    self.backoff = 1.0
+                continue
+
+            healthy_since = None
+            self.ready.clear()
+            failures += 1
+            crashed = self.owned and self.process is not None and self.process.poll() is not None
+            if not crashed and failures < FAILURES_BEFORE_RESTART:
+                continue
+            if self.stopping.wait(self.backoff):
+                break
+            with self.lock:
+                if self.stopping.is_set():
+                    break
+                logging.warning(f"Ollama server is down, restarting (waited {self.backoff:.0f}s)")
+                self._terminate()
+                self._launch()
+            self.restarts += 1
+            self.backoff = min(self.backoff * 2, MAX_BACKOFF)
+            failures = 0
+
+    def wait_until_ready(self, timeout=READY_TIMEOUT):
+        """Start the server if needed and block until it answers, up to the timeout."""
+        if self.ready.is_set() or self.is_healthy():
+            self.ready.set()
+            return True
+        self.start()
+        return self.ready.wait(timeout)
+
+    def apply_settings(self, settings):
+        """Save new settings; a server we started is restarted so they take effect."""
+        self.settings = settings
+        settings.save()
+        with self.lock:
+            if self.owned and self.process is not None:
+                self._terminate()
+                self._launch()
+            elif settings.server_env():
+                logging.info("Restart the running Ollama server to apply parallelism settings")
+
+    def _terminate(self):
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+    def stop(self):
+        """Stop watching and shut down the server if we started it."""
+        self.stopping.set()
+        with self.lock:
+            if self.owned:
+                self._terminate()
+            self.process = None
+            self.owned = False
+            self.ready.clear()
+        return "Server closed."
+
+
+supervisor = OllamaSupervisor()
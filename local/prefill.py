@@ -0,0 +1,78 @@
+import http.client
+import json
+import logging
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+PREFILL_TIMEOUT = 120
+
+
+class PromptPrefiller:
+    """Sends a conversation prefix to the Ollama server ahead of the next turn.
+
+    Ollama reuses the KV cache for the longest common token prefix of
+    consecutive requests, so once the history and system prompt have been
+    evaluated here, the real request only evaluates the new user message.
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.lock = threading.Lock()
+        self.connection = None
+        self.thread = None
+        self.generation = 0  # Bumped by every start() and cancel(); a run only lives while it matches
+
+    def start(self, model, messages, options, keep_alive=None):
+        generation = self.cancel()
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": False,
+            "options": {**options, "num_predict": 1},
+        }
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        self.thread = threading.Thread(target=self._run, args=(json.dumps(payload), generation), daemon=True)
+        self.thread.start()
+
+    def _run(self, body, generation):
+        url = urlsplit(self.host)
+        connection = http.client.HTTPConnection(url.hostname, url.port or 11434, timeout=PREFILL_TIMEOUT)
+        started = time.perf_counter()
+        try:
+            connection.connect()  # Connect first so cancel() always has a socket to shut down
+            with self.lock:
+                if generation != self.generation:
+                    return  # Superseded or cancelled before it got going
+                self.connection = connection
+            connection.request("POST", "/api/chat", body=body, headers={"Content-Type": "application/json"})
+            result = json.loads(connection.getresponse().read() or b"{}")
+            logging.info(f"Prefilled {result.get('prompt_eval_count', 0)} prompt tokens "
+                         f"in {time.perf_counter() - started:.2f}s")
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            if generation == self.generation:
+                logging.warning(f"Prompt prefill failed: {e}")
+        finally:
+            with self.lock:
+                if self.connection is connection:
+                    self.connection = None
+            connection.close()
+
+    def cancel(self):
+        """Drop the in-flight prefill; closing the socket makes the server abandon it.
+
+        Returns the new generation, which a prefill started afterwards runs under.
+        """
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            connection = self.connection
+            self.connection = None
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        return generation
@@ -1,7 +1,35 @@
 import sys
 import logging
-from PyQt5.QtWidgets import QApplication, QMainWindow
+import threading
+from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QCheckBox, QListWidget, QListWidgetItem, QVBoxLayout
+from PyQt5.QtCore import Qt, QTimer, QEvent
 from ui.main_window_ui import Ui_MainWindow
+from chat.compare import ComparePanel
+from chat.chat_thread import ChatThread
+from chat.transcript import TranscriptView, TranscriptModel
+from chat.chat_history import ChatSessionManager
+from chat.session_snapshot import SNAPSHOT_MESSAGES, RestoreWorker, load_snapshot, save_snapshot
+from utils.controllers import create_chatbot, load_provider_models, LOCAL_PROVIDERS
+from dialogs.export_chats import ExportChatsDialog
+from database.compaction import CompactionWorker
+from voice_handler.voice_input import VoiceInput
+from dialogs.tools_setup import ToolChoiceDialog
+from tools.builtin import create_tool_engine
+from local.ollama_supervisor import supervisor
+from local.model_tuner import ModelOptionsStore
+from database.response_cache import open_response_cache
+from dialogs.model_settings import ModelSettingsDialog
+from dialogs.local_setup import SettingsDialog
+
+PREFILL_DELAY_MS = 600
+
+# Tools panel checkbox -> tool name; checkboxes without a backend are disabled
+TOOL_CHECKBOXES = {
+    "dateTimeCheckBox": "get_date_time",
+    "webSearchCheckBox": "web_search",
+    "weatherInfoCheckBox": "get_weather",
+    "stockPriceInfoCheckBox": "get_stock_price",
+}
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
@@ -10,6 +38,410 @@ class MainApp(QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
         self.setupUi(self)
+        self.chatbot = None
+        self.chat_thread = None
+        self.session = None
+        self.streaming_session = None
+        self.saved_replies = 0  # Assistant messages in the streaming chatbot's history already saved
+        self.pending_restore = None
+
+        # Put the last conversation on screen before anything touches the database or network
+        snapshot = load_snapshot()
+        self.setup_transcript()
+        self.providerDropdown.currentTextChanged.connect(self.refresh_models)
+        self.modelDropdown.currentTextChanged.connect(self.reset_chatbot)
+        self.refresh_models(self.providerDropdown.currentText())
+        if snapshot is not None:
+            self.restore_snapshot(snapshot)
+
+        self.sessions = ChatSessionManager()
+        self.setup_chat_list()
+        self.setup_compare_mode()
+        self.setup_voice_input()
+        self.setup_tools()
+        self.setup_prefill()
+
+        self.sendButton.clicked.connect(self.send_message)
+        self.inputBox.returnPressed.connect(self.send_message)
+        self.exportConversationButton.clicked.connect(self.open_export_dialog)
+        self.model_options = ModelOptionsStore()
+        self.response_cache = None  # Opened the first time a model opts in
+        self.modelSettingButton.clicked.connect(self.open_model_settings)
+        self.newChatButton.clicked.connect(self.new_chat)
+        self.localSetupButton.clicked.connect(self.open_local_setup)
+
+        # Start or adopt the local Ollama server without blocking the window
+        threading.Thread(target=supervisor.start, daemon=True).start()
+
+        # Compress old message bodies once the window is up and idle
+        self.compaction_worker = CompactionWorker()
+        self.compaction_timer = QTimer(self)
+        self.compaction_timer.setSingleShot(True)
+        self.compaction_timer.timeout.connect(self.compaction_worker.start)
+        self.compaction_timer.start(30000)
+
+    def setup_transcript(self):
+        # chatDisplay re-lays out the whole rich-text document on every append,
+        # so the transcript is shown in a virtualized list view instead.
+        self.transcriptView = TranscriptView(self.mainContent)
+        self.transcriptView.setSizePolicy(self.chatDisplay.sizePolicy())
+        index = self.mainContentLayout.indexOf(self.chatDisplay)
+        self.mainContentLayout.insertWidget(index, self.transcriptView)
+        self.chatDisplay.hide()
+
+    def setup_chat_list(self):
+        self.chatList = QListWidget(self.scrollAreaWidgetContents_2)
+        layout = QVBoxLayout(self.scrollAreaWidgetContents_2)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.chatList)
+        # The chat list and the restored chat's full history load on a background connection
+        chat_id = self.pending_restore[0] if self.pending_restore else None
+        self.restore_worker = RestoreWorker(self.sessions.db_path, chat_id)
+        self.restore_worker.finished.connect(self.finish_restore)
+        self.restore_worker.start()
+        self.chatList.itemClicked.connect(lambda item: self.switch_chat(item.data(Qt.UserRole)))
+        self.clearConversationsButton.clicked.connect(self.clear_conversations)
+
+    def restore_snapshot(self, snapshot):
+        """Show the chat and model from the last run until the database catches up."""
+        if snapshot.get("provider"):
+            self.providerDropdown.setCurrentText(snapshot["provider"])
+        if snapshot.get("model"):
+            self.modelDropdown.setCurrentText(snapshot["model"])
+        messages = snapshot.get("messages") or []
+        if snapshot.get("chat_id") is None or not messages:
+            return
+        transcript = TranscriptModel(self.transcriptView)
+        transcript.set_messages(messages)
+        self.transcriptView.show_transcript(transcript, snapshot.get("scroll_value"))
+        # Reuse this model once loaded if it already holds the whole chat
+        complete = snapshot.get("complete", False)
+        self.pending_restore = (snapshot["chat_id"], transcript if complete else None,
+                                snapshot.get("message_count"))
+
+    def finish_restore(self, chats, restored):
+        known = {self.chatList.item(row).data(Qt.UserRole) for row in range(self.chatList.count())}
+        for chat_id, title in chats:
+            if chat_id not in known:
+                self.add_chat_item(chat_id, title)
+        if self.pending_restore is None:
+            return
+        if restored is None:
+            self.restore_now()  # Retry on this connection; drops the chat if it no longer exists
+        else:
+            self.adopt_restored(*restored)
+
+    def adopt_restored(self, chat_id, title, messages):
+        _, transcript, message_count = self.pending_restore
+        self.pending_restore = None
+        if message_count != len(messages):
+            transcript = None
+        self.session = self.sessions.add_loaded(chat_id, title, messages, transcript)
+        if transcript is None:
+            self.transcriptView.replace_transcript(self.session.transcript)
+        for row in range(self.chatList.count()):
+            if self.chatList.item(row).data(Qt.UserRole) == chat_id:
+                self.chatList.setCurrentRow(row)
+                break
+
+    def restore_now(self):
+        """Load the snapshot's chat right away when it is needed before the background load ends."""
+        if self.pending_restore is None:
+            return
+        chat_id = self.pending_restore[0]
+        try:
+            title, messages = self.sessions.load(chat_id)
+        except KeyError:
+            self.new_chat()  # The chat was deleted since the snapshot
+            return
+        self.adopt_restored(chat_id, title, messages)
+
+    def add_chat_item(self, chat_id, title, row=None):
+        item = QListWidgetItem(title or f"Chat {chat_id}")
+        item.setData(Qt.UserRole, chat_id)
+        if row is None:
+            self.chatList.addItem(item)
+        else:
+            self.chatList.insertItem(row, item)
+
+    def save_session_state(self):
+        if self.chatbot is not None and hasattr(self.chatbot, "cancel_prefill"):
+            self.chatbot.cancel_prefill()
+        if self.session is not None:
+            self.session.scroll_value = self.transcriptView.scroll_state()
+            self.session.chatbot = self.chatbot
+
+    def switch_chat(self, chat_id):
+        """Show another chat; recently used chats come from memory, others from the database."""
+        if self.session is not None and self.session.chat_id == chat_id:
+            return
+        self.pending_restore = None
+        self.save_session_state()
+        self.session = self.sessions.get(chat_id)
+        chatbot = self.session.chatbot
+        if chatbot is not None and (chatbot.provider, chatbot.model) != (self.providerDropdown.currentText(),
+                                                                        self.modelDropdown.currentText()):
+            chatbot = None
+        self.chatbot = self.session.chatbot = chatbot
+        self.transcriptView.show_transcript(self.session.transcript, self.session.scroll_value)
+
+    def clear_conversations(self):
+        if self.chat_thread is not None and self.chat_thread.isRunning():
+            return
+        self.new_chat()
+        self.sessions.clear()
+        self.chatList.clear()
+
+    def setup_compare_mode(self):
+        self.compareButton = QPushButton("Compare", self.topBar)
+        self.compareButton.setCheckable(True)
+        self.topBarLayout.addWidget(self.compareButton)
+
+        self.comparePanel = ComparePanel(self.mainContent)
+        self.comparePanel.hide()
+        index = self.mainContentLayout.indexOf(self.transcriptView)
+        self.mainContentLayout.insertWidget(index + 1, self.comparePanel)
+        self.compareButton.toggled.connect(self.toggle_compare_mode)
+
+    def toggle_compare_mode(self, enabled):
+        self.transcriptView.setVisible(not enabled)
+        self.comparePanel.setVisible(enabled)
+
+    def setup_voice_input(self):
+        self.voice_input = VoiceInput(self)
+        self.voice_prefix = ""
+        self.voiceInputButton.setCheckable(True)
+        self.voiceInputButton.toggled.connect(self.toggle_voice_input)
+        self.voice_input.partial_text.connect(self.show_voice_text)
+        self.voice_input.final_text.connect(self.commit_voice_text)
+        self.voice_input.error.connect(lambda message: self.transcriptView.append_message("system", message))
+        self.voice_input.stopped.connect(lambda: self.voiceInputButton.setChecked(False))
+
+    def toggle_voice_input(self, listening):
+        if listening:
+            self.voice_prefix = self.inputBox.text()
+            self.voice_input.start()
+        else:
+            self.voice_input.stop()
+
+    def show_voice_text(self, text):
+        self.inputBox.setText(" ".join(part for part in (self.voice_prefix.strip(), text) if part))
+
+    def commit_voice_text(self, text):
+        self.show_voice_text(text)
+        self.voice_prefix = self.inputBox.text()
+
+    def setup_tools(self):
+        self.tool_engine = create_tool_engine()
+        for checkbox in self.scrollAreaWidgetContents.findChildren(QCheckBox):
+            tool_name = TOOL_CHECKBOXES.get(checkbox.objectName())
+            if tool_name is None:
+                checkbox.setEnabled(False)
+                checkbox.setToolTip("Not available yet")
+                continue
+            self.tool_engine.set_enabled(tool_name, checkbox.isChecked())
+            checkbox.toggled.connect(lambda checked, name=tool_name: self.tool_engine.set_enabled(name, checked))
+        self.toolsSetupButton.clicked.connect(self.open_tools_dialog)
+
+    def open_tools_dialog(self):
+        if ToolChoiceDialog(self.tool_engine, self).exec_():
+            for object_name, tool_name in TOOL_CHECKBOXES.items():
+                checkbox = getattr(self, object_name)
+                checkbox.blockSignals(True)
+                checkbox.setChecked(tool_name in self.tool_engine.enabled)
+                checkbox.blockSignals(False)
+
+    def show_tool_result(self, name, result):
+        preview = result if len(result) <= 500 else result[:500] + "..."
+        if self.streaming_session is self.session:
+            self.transcriptView.insert_before_last("tool", f"**{name}**\n\n{preview}")
+        else:
+            transcript = self.streaming_session.transcript
+            transcript.insert_message(max(transcript.rowCount() - 1, 0), "tool", f"**{name}**\n\n{preview}")
+
+    def show_chunk(self, text):
+        # The reply keeps streaming into its own chat after the user switches away
+        if self.streaming_session is self.session:
+            self.transcriptView.append_chunk(text)
+        else:
+            self.streaming_session.transcript.append_chunk(text)
+
+    def finish_response(self, text):
+        session = self.streaming_session
+        self.save_reply(self.sender())
+        if session is self.session:
+            self.transcriptView.finish_message(text)
+        else:
+            session.transcript.replace_last(text)
+
+    def save_reply(self, chatbot):
+        # Error and download-progress replies are emitted without adding to the history,
+        # so only save an assistant message the chatbot appended during this turn
+        replies = [message for message in chatbot.messages if message["role"] == "assistant"]
+        if len(replies) > self.saved_replies:
+            self.sessions.add_message(self.streaming_session, "assistant", replies[-1]["content"])
+            self.saved_replies = len(replies)
+
+    def send_message(self):
+        user_input = self.inputBox.text().strip()
+        if not user_input:
+            return
+        if self.compareButton.isChecked():
+            self.comparePanel.run(user_input)
+            self.inputBox.clear()
+            return
+        if self.chat_thread is not None and self.chat_thread.isRunning():
+            return
+
+        self.restore_now()
+        if not self.ensure_chatbot():
+            return
+        if self.session is None:
+            self.session = self.sessions.create(user_input[:50])
+            self.add_chat_item(self.session.chat_id, self.session.title, 0)
+            self.transcriptView.show_transcript(self.session.transcript)
+        self.session.chatbot = self.chatbot
+        self.streaming_session = self.session
+        self.saved_replies = sum(message["role"] == "assistant" for message in self.chatbot.messages)
+        self.sessions.add_message(self.session, "user", user_input)
+
+        self.inputBox.clear()
+        self.transcriptView.append_message("user", user_input)
+        self.transcriptView.append_message("assistant", "", streaming=True)
+        self.sendButton.setEnabled(False)
+        self.chat_thread = ChatThread(self.chatbot, user_input)
+        self.chat_thread.finished.connect(lambda: self.sendButton.setEnabled(True))
+        self.chat_thread.start()
+
+    def ensure_chatbot(self):
+        """Create the chatbot for the selected provider/model if there isn't one yet."""
+        if self.chatbot is not None:
+            return True
+        try:
+            provider = self.providerDropdown.currentText()
+            model = self.modelDropdown.currentText()
+            kwargs = {} if provider in LOCAL_PROVIDERS else {"tool_engine": self.tool_engine}
+            if self.model_options.cache_enabled(provider, model):
+                if self.response_cache is None:
+                    self.response_cache = open_response_cache(self.sessions.db_path)
+                kwargs["response_cache"] = self.response_cache
+            self.chatbot = create_chatbot(provider, model, options=self.model_options.get(provider, model),
+                                          **kwargs)
+            if self.session is not None:
+                self.chatbot.messages.extend(self.session.chat_messages())
+        except Exception as e:
+            self.transcriptView.append_message("system", f"Could not start chat: {e}")
+            return False
+        self.chatbot.chunk_signal.connect(self.show_chunk)
+        self.chatbot.response_signal.connect(self.finish_response)
+        if hasattr(self.chatbot, "tool_signal"):
+            self.chatbot.tool_signal.connect(self.show_tool_result)
+        return True
+
+    def setup_prefill(self):
+        # Warm the local model's KV cache with the conversation while the user types
+        self.prefill_timer = QTimer(self)
+        self.prefill_timer.setSingleShot(True)
+        self.prefill_timer.setInterval(PREFILL_DELAY_MS)
+        self.prefill_timer.timeout.connect(self.prefill_prompt)
+        self.inputBox.textEdited.connect(lambda _: self.prefill_timer.start())
+        self.inputBox.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if obj is self.inputBox and event.type() == QEvent.FocusIn:
+            self.prefill_timer.start()
+        return super().eventFilter(obj, event)
+
+    def prefill_prompt(self):
+        if self.compareButton.isChecked() or self.providerDropdown.currentText() not in LOCAL_PROVIDERS:
+            return
+        if self.chat_thread is not None and self.chat_thread.isRunning():
+            return
+        self.restore_now()
+        if self.modelDropdown.currentText() and self.ensure_chatbot():
+            self.chatbot.prefill()
+
+    def new_chat(self):
+        self.save_session_state()
+        self.pending_restore = None
+        self.session = None
+        self.chatbot = None
+        self.chatList.clearSelection()
+        self.transcriptView.show_transcript(TranscriptModel(self.transcriptView))
+
+    def open_export_dialog(self):
+        ExportChatsDialog(self).exec_()
+
+    def open_model_settings(self):
+        provider, model = self.providerDropdown.currentText(), self.modelDropdown.currentText()
+        if not model:
+            return
+        if ModelSettingsDialog(provider, model, self.model_options, self).exec_():
+            self.reset_chatbot()
+
+    def open_local_setup(self):
+        if SettingsDialog(self).exec_():
+            self.reset_chatbot()  # Per-request options such as num_thread changed
+
+    def refresh_models(self, provider):
+        self.modelDropdown.clear()
+        self.modelDropdown.addItems(load_provider_models(provider))
+        self.reset_chatbot()
+
+    def reset_chatbot(self):
+        """Drop the current chatbot so the next message uses the selected provider/model."""
+        if self.chatbot is not None and hasattr(self.chatbot, "cancel_prefill"):
+            self.chatbot.cancel_prefill()
+        self.chatbot = None
+        if self.session is not None:
+            self.session.chatbot = None
+
+    def write_snapshot(self):
+        """Record what is on screen so the next start can show it before loading anything."""
+        snapshot = {
+            "provider": self.providerDropdown.currentText(),
+            "model": self.modelDropdown.currentText(),
+            "chat_id": None,
+        }
+        if self.session is not None:
+            transcript = self.session.transcript
+            messages = [{"role": message.role, "content": message.content}
+                        for message in transcript.messages[-SNAPSHOT_MESSAGES:]]
+            snapshot.update({
+                "chat_id": self.session.chat_id,
+                "title": self.session.title,
+                "scroll_value": self.transcriptView.scroll_state(),
+                "messages": messages,
+                "complete": len(messages) == len(transcript.messages),
+                "message_count": len(self.session.messages),
+            })
+        try:
+            save_snapshot(snapshot)
+        except OSError as e:
+            logging.error(f"Failed to save session snapshot: {e}")
+
+    def stop_workers(self):
+        """Finish background threads before the objects they write to go away."""
+        if self.chat_thread is not None and self.chat_thread.isRunning():
+            chatbot = self.chat_thread.chatbot
+            if hasattr(chatbot, "cancel"):
+                chatbot.cancel()
+            self.chat_thread.wait()
+            self.save_reply(chatbot)  # Its finish_response would arrive after the writer has closed
+        self.restore_worker.wait()
+        self.compaction_timer.stop()
+        self.compaction_worker.requestInterruption()
+        self.compaction_worker.wait()
+
+    def closeEvent(self, event):
+        self.stop_workers()
+        self.write_snapshot()
+        self.sessions.close()
+        if self.response_cache is not None:
+            self.response_cache.close()
+        self.voice_input.shutdown()
+        supervisor.stop()
+        super().closeEvent(event)
 
 
 if __name__ == "__main__":
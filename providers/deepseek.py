@@ -1,16 +1,9 @@
-from PyQt5.QtCore import QObject, pyqtSignal
+from providers.openai import OpenAIChatbot
 
-class BaseChatbot(QObject):
-    response_signal = pyqtSignal(str)
+class DeepSeekChatbot(OpenAIChatbot):
+    provider = "DeepSeek"
+    default_base_url = "https://api.deepseek.com/v1"
+    api_key_env = "DEEPSEEK_API_KEY"
 
-    def __init__(self, model, system_prompt="You are a helpful assistant", chat_history=None):
-        super().__init__()
-        self.model = model
-        self.system_prompt = system_prompt
-        self.messages = chat_history if chat_history else [{"role": "system", "content": self.system_prompt}]
-
-    def run_chatbot(self, user_input):
-        raise NotImplementedError("Subclasses must implement run_chatbot method")
-
-class DeepSeekChatbot(BaseChatbot):
-    pass
+    def __init__(self, model="deepseek-chat", **kwargs):
+        super().__init__(model, **kwargs)
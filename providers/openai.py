@@ -1,6 +1,36 @@
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import CancelledError
+import httpx
+from openai import AsyncOpenAI, RateLimitError
 from PyQt5.QtCore import QObject, pyqtSignal
-from local.ollama_manager import show_ollama_list, pull_ollama_model
-import openai
+from utils.helpers import run_coroutine, StreamStats
+from database.response_cache import mark_cached
+from providers.rate_limiter import (INTERACTIVE, MAX_RETRIES, backoff_delay, estimate_tokens, get_scheduler,
+                                    parse_duration)
+
+DEFAULT_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+POOL_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+MAX_TOOL_ROUNDS = 5
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_async_client(base_url=None, api_key=""):
+    """Return a pooled AsyncOpenAI client for an endpoint, shared by all chatbots."""
+    key = (base_url, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            http_client = httpx.AsyncClient(limits=POOL_LIMITS, timeout=DEFAULT_TIMEOUT)
+            # Retries on 429 go through the provider scheduler instead of the SDK
+            client = AsyncOpenAI(base_url=base_url, api_key=api_key, http_client=http_client, max_retries=0)
+            _clients[key] = client
+    return client
+
 
 class BaseChatbot(QObject):
     response_signal = pyqtSignal(str)
@@ -15,26 +45,159 @@ class BaseChatbot(QObject):
         raise NotImplementedError("Subclasses must implement run_chatbot method")
 
 class OpenAIChatbot(BaseChatbot):
-    def __init__(self, model="gpt-4", system_prompt="You are a helpful assistant", chat_history=None):
+    """Streaming chatbot for OpenAI and any OpenAI-compatible endpoint."""
+    chunk_signal = pyqtSignal(str)
+    tool_signal = pyqtSignal(str, str)  # tool name, result
+
+    provider = "OpenAI"
+    default_base_url = None  # The SDK default, api.openai.com
+    api_key_env = "OPENAI_API_KEY"
+
+    def __init__(self, model="gpt-4", system_prompt="You are a helpful assistant", chat_history=None,
+                 base_url=None, api_key=None, timeout=None, options=None, response_cache=None,
+                 tool_engine=None, priority=INTERACTIVE):
         super().__init__(model, system_prompt, chat_history)
-        openai.api_key = 'your-openai-api-key-here'  # Ensure your OpenAI API key is set
+        self.base_url = base_url or self.default_base_url
+        self.api_key = api_key if api_key is not None else os.environ.get(self.api_key_env, "")
+        self.timeout = timeout if timeout is not None else DEFAULT_TIMEOUT
+        self.options = options or {}
+        self.response_cache = response_cache
+        self.tool_engine = tool_engine
+        self.priority = priority  # Batch jobs pass BACKGROUND so chat goes first
+        self.last_stats = None
+        self.last_error = None  # Set when the last turn failed; the reply is then an error message
+        self._future = None
 
     def run_chatbot(self, user_input):
+        self.last_error = None
         if user_input:
             self.messages.append({"role": "user", "content": user_input})
 
         try:
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=self.messages
-            )
-            assistant_message = response.choices[0].message['content']
-            
+            cache_key = self.cache_key()
+            if cache_key is not None:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    self.messages.append({"role": "assistant", "content": cached})
+                    self.response_signal.emit(mark_cached(cached))
+                    return
+
+            self._future = run_coroutine(self.stream_response())
+            assistant_message = self._future.result()
+
             self.messages.append({"role": "assistant", "content": assistant_message})
+            if cache_key is not None:
+                self.response_cache.set(cache_key, assistant_message)
             self.response_signal.emit(assistant_message)
+        except CancelledError:
+            self.last_error = "Cancelled"
+            logging.info(f"Request to {self.model} was cancelled")
         except Exception as e:
             self.handle_generic_error(e)
+        finally:
+            self._future = None
 
-    def handle_generic_error(self, error):
-        self.response_signal.emit(f"Sorry, there was an error: {str(error)}")
+    async def stream_response(self):
+        """Stream the completion, emitting each content delta as it arrives.
+
+        When the model asks for tools, all calls of the turn run concurrently
+        and the conversation continues with their results.
+        """
+        client = get_async_client(self.base_url, self.api_key)
+        scheduler = get_scheduler(self.provider)
+        stats = StreamStats()
+        parts = []
+        for round_number in range(MAX_TOOL_ROUNDS + 1):
+            tools = self.tool_engine.tool_specs() if self.tool_engine and round_number < MAX_TOOL_ROUNDS else []
+            reserved = estimate_tokens(self.messages, self.options)
+            stream = await self.open_stream(
+                client, scheduler, reserved,
+                model=self.model,
+                messages=self.messages,
+                stream=True,
+                timeout=self.timeout,
+                **({"tools": tools} if tools else {}),
+                **self.options
+            )
+            round_parts = []
+            tool_calls = {}
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if delta.content:
+                        stats.on_token()
+                        round_parts.append(delta.content)
+                        self.chunk_signal.emit(delta.content)
+                    for call in delta.tool_calls or []:
+                        # Tool calls arrive in fragments keyed by index
+                        entry = tool_calls.setdefault(call.index, {"id": "", "name": "", "arguments": ""})
+                        entry["id"] = call.id or entry["id"]
+                        if call.function is not None:
+                            entry["name"] += call.function.name or ""
+                            entry["arguments"] += call.function.arguments or ""
+            finally:
+                used = estimate_tokens(self.messages, {"max_tokens": len(round_parts) + 1})
+                await scheduler.release(reserved, used)
+            parts.extend(round_parts)
+            if not tool_calls:
+                break
+
+            calls = [tool_calls[index] for index in sorted(tool_calls)]
+            self.messages.append({
+                "role": "assistant",
+                "content": "".join(round_parts) or None,
+                "tool_calls": [{"id": call["id"], "type": "function",
+                                "function": {"name": call["name"], "arguments": call["arguments"]}}
+                               for call in calls],
+            })
+            self.messages.extend(await self.tool_engine.run_calls(
+                [(call["id"], call["name"], call["arguments"]) for call in calls],
+                lambda call_id, name, result: self.tool_signal.emit(name, result)))
+        self.last_stats = stats.finish()
+        return "".join(parts)
 
+    async def open_stream(self, client, scheduler, reserved_tokens, **request):
+        """Start a completion within the provider's rate limits, retrying 429s with backoff.
+
+        On success the scheduler slot stays held until the caller releases it
+        after reading the stream.
+        """
+        for attempt in range(MAX_RETRIES + 1):
+            await scheduler.acquire(reserved_tokens, self.priority)
+            try:
+                response = await client.chat.completions.with_raw_response.create(**request)
+            except RateLimitError as e:
+                headers = e.response.headers
+                retry_after = parse_duration(headers.get("retry-after")) or backoff_delay(attempt)
+                await scheduler.release(headers=headers, retry_after=retry_after)
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = backoff_delay(attempt, retry_after)
+                logging.warning(f"{self.provider} rate limited {self.model}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                await scheduler.release()
+                raise
+            scheduler.update_from_headers(response.headers)
+            return response.parse()
+
+    def cache_key(self):
+        """Return the response cache key for the current turn, or None if caching is off."""
+        if self.response_cache is None or not self.response_cache.is_cacheable(self.options):
+            return None
+        if self.tool_engine is not None and self.tool_engine.enabled:
+            return None  # Tool results go stale, so neither do answers built on them
+        return self.response_cache.make_key(self.provider, self.model, self.options, self.messages)
+
+    def cancel(self):
+        """Cancel the in-flight request, if any."""
+        future = self._future
+        if future is not None:
+            future.cancel()
+
+    def handle_generic_error(self, error):
+        self.last_error = f"Sorry, there was an error: {str(error)}"
+        self.response_signal.emit(self.last_error)
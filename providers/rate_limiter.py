@@ -0,0 +1,189 @@
+"""Per-provider request scheduling that stays under cloud rate limits.
+
+Each provider gets token buckets for requests and tokens per minute, learned
+from the x-ratelimit-* response headers, plus a concurrency cap. Requests wait
+in a priority queue so interactive chat goes ahead of batch jobs, and a 429
+pauses the whole provider for its Retry-After before the request is retried.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import re
+import threading
+import time
+
+INTERACTIVE = 0
+BACKGROUND = 1
+
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 30.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_COMPLETION_TOKENS = 512
+
+_DURATION_PART = re.compile(r"([\d.]+)(ms|s|m|h)")
+_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value):
+    """Seconds from a reset header such as "1s", "6m0s", "20ms" or a plain number."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    return sum(float(number) * _UNITS[unit] for number, unit in parts) if parts else None
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Exponential backoff with jitter, never shorter than the server's Retry-After."""
+    delay = min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt)
+    delay = delay / 2 + random.uniform(0, delay / 2)
+    return max(delay, retry_after or 0)
+
+
+def estimate_tokens(messages, options=None):
+    """Prompt plus expected completion tokens, for reserving the token budget up front."""
+    prompt = sum(len(str(message.get("content") or "")) for message in messages) // 4
+    options = options or {}
+    return prompt + int(options.get("max_tokens") or DEFAULT_COMPLETION_TOKENS)
+
+
+class TokenBucket:
+    """A per-minute budget that refills continuously."""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.available = float(limit)
+        self.rate = limit / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.limit, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        self._refill()
+        amount = min(amount, self.limit)  # Oversized requests wait for a full bucket, not forever
+        return 0.0 if self.available >= amount else (amount - self.available) / self.rate
+
+    def consume(self, amount):
+        self._refill()
+        self.available -= min(amount, self.limit)
+
+    def refund(self, amount):
+        self._refill()
+        self.available = min(self.limit, self.available + amount)
+
+    def sync(self, limit, remaining, reset_seconds=None):
+        """Adopt the server's view of the budget from rate-limit headers."""
+        self._refill()
+        if limit:
+            self.limit = limit
+            self.rate = limit / 60.0
+        if remaining is not None:
+            self.available = min(self.available, remaining)
+            if reset_seconds and remaining < self.limit:
+                # Refill at the pace the server reports, if that is slower than limit/minute
+                self.rate = min(self.rate, max(self.limit - remaining, 1) / reset_seconds)
+
+
+class ProviderScheduler:
+    """Admits requests to one provider within its rate limits, highest priority first."""
+
+    def __init__(self, provider, requests_per_minute=None, tokens_per_minute=None,
+                 max_concurrency=DEFAULT_CONCURRENCY):
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_concurrency = max_concurrency
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.waiting = []
+        self.sequence = itertools.count()
+        self.condition = None
+        self.rate_limited = 0
+
+    def _wait_time(self, tokens):
+        delay = self.paused_until - time.monotonic()
+        if self.requests is not None:
+            delay = max(delay, self.requests.wait_time(1))
+        if self.tokens is not None:
+            delay = max(delay, self.tokens.wait_time(tokens))
+        return delay
+
+    async def acquire(self, tokens=1, priority=INTERACTIVE):
+        """Wait for this request's turn and budget; pair every call with release()."""
+        if self.condition is None:
+            self.condition = asyncio.Condition()
+        entry = (priority, next(self.sequence))
+        async with self.condition:
+            heapq.heappush(self.waiting, entry)
+            try:
+                while True:
+                    timeout = None
+                    if self.waiting[0] == entry and self.in_flight < self.max_concurrency:
+                        timeout = self._wait_time(tokens)
+                        if timeout <= 0:
+                            heapq.heappop(self.waiting)
+                            self.in_flight += 1
+                            if self.requests is not None:
+                                self.requests.consume(1)
+                            if self.tokens is not None:
+                                self.tokens.consume(tokens)
+                            self.condition.notify_all()  # The next in line may fit too
+                            return
+                    try:
+                        await asyncio.wait_for(self.condition.wait(), timeout)
+                    except asyncio.TimeoutError:
+                        pass
+            except BaseException:
+                if entry in self.waiting:
+                    self.waiting.remove(entry)
+                    heapq.heapify(self.waiting)
+                    self.condition.notify_all()
+                raise
+
+    async def release(self, reserved_tokens=0, used_tokens=None, headers=None, retry_after=None):
+        """Free the request's slot and correct the budgets from what the server reported."""
+        async with self.condition:
+            self.in_flight -= 1
+            if self.tokens is not None and used_tokens is not None and used_tokens < reserved_tokens:
+                self.tokens.refund(reserved_tokens - used_tokens)
+            if headers is not None:
+                self.update_from_headers(headers)
+            if retry_after is not None:
+                self.rate_limited += 1
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+            self.condition.notify_all()
+
+    def update_from_headers(self, headers):
+        for kind in ("requests", "tokens"):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            if limit is None:
+                continue
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            bucket = getattr(self, kind)
+            if bucket is None:
+                bucket = TokenBucket(int(float(limit)))
+                setattr(self, kind, bucket)
+            bucket.sync(int(float(limit)), None if remaining is None else int(float(remaining)), reset)
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def get_scheduler(provider):
+    """The shared scheduler for a provider; limits are learned from its responses."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(provider)
+        if scheduler is None:
+            scheduler = _schedulers[provider] = ProviderScheduler(provider)
+    return scheduler
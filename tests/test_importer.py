@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from database.importer import ChatImporter
+from database.models import DatabaseService
+
+
+@pytest.fixture
+def db_service(tmp_path):
+    db_service = DatabaseService(str(tmp_path / "chat_history.db"))
+    yield db_service
+    db_service.close()
+
+
+def write_jsonl(path, records):
+    with open(path, 'w', encoding='utf-8') as file:
+        for record in records:
+            file.write(json.dumps(record) + "\n")
+    return str(path)
+
+
+def messages(db_service):
+    return db_service.fetch_all('''SELECT c.title, m.role, m.content FROM messages m
+                                   JOIN chats c ON c.id = m.chat_id ORDER BY m.id''')
+
+
+def test_repeated_messages_within_a_chat_are_kept(db_service, tmp_path):
+    path = write_jsonl(tmp_path / "chats.jsonl", [{"title": "Story", "messages": [
+        {"role": "user", "content": "continue"}, {"role": "assistant", "content": "One"},
+        {"role": "user", "content": "continue"}, {"role": "assistant", "content": "Two"},
+    ]}])
+    assert ChatImporter(db_service).import_files([path]) == (4, 0)
+
+
+def test_chats_without_created_at_stay_separate(db_service, tmp_path):
+    path = write_jsonl(tmp_path / "chats.jsonl", [
+        {"title": "New chat", "messages": [{"role": "user", "content": "Hello"}]},
+        {"title": "New chat", "messages": [{"role": "user", "content": "Translate this"}]},
+    ])
+    ChatImporter(db_service).import_files([path])
+    assert db_service.fetch_all("SELECT COUNT(*) FROM chats")[0][0] == 2
+
+
+def test_reimport_adds_nothing(db_service, tmp_path):
+    path = write_jsonl(tmp_path / "chats.jsonl", [
+        {"title": "New chat", "messages": [{"role": "user", "content": "Hello"},
+                                           {"role": "assistant", "content": "Hi"}]},
+    ])
+    importer = ChatImporter(db_service)
+    assert importer.import_files([path]) == (2, 0)
+    assert importer.import_files([path]) == (0, 2)
+    assert len(messages(db_service)) == 2
+
+
+def test_export_of_app_chat_is_recognized(db_service, tmp_path):
+    chat_id = db_service.create_new_chat("Saved in the app")
+    db_service.save_messages([(chat_id, "user", "Question"), (chat_id, "assistant", "Answer")])
+    title, created_at = db_service.fetch_all("SELECT title, created_at FROM chats")[0]
+    path = write_jsonl(tmp_path / "export.jsonl", [
+        {"chat_id": chat_id, "chat_title": title, "chat_created_at": created_at,
+         "role": role, "content": content, "created_at": created_at}
+        for role, content in (("user", "Question"), ("assistant", "Answer"), ("user", "Follow-up"))
+    ])
+    assert ChatImporter(db_service).import_files([path]) == (1, 2)
+    assert messages(db_service)[-1] == ("Saved in the app", "user", "Follow-up")
@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from local.model_catalog import CatalogIndex
+
+
+@pytest.fixture
+def index():
+    index = CatalogIndex(":memory:")
+    index.sync([
+        ("qwen2.5", "7b-instruct-q4_K_M", 4_700_000_000, "Q4_K_M", "7B", "a", "2024-09-01"),
+        ("nomic_embed", "latest", 270_000_000, "F16", "137M", "b", "2024-02-01"),
+        ("nomicembed", "latest", 270_000_000, "F16", "137M", "c", "2024-02-01"),
+        ("llama3", "8b-100%", 4_700_000_000, "Q4_0", "8B", "d", "2024-04-01"),
+        ("llama3", "8b-100x", 4_700_000_000, "Q4_0", "8B", "e", "2024-04-01"),
+    ])
+    yield index
+    index.close()
+
+
+def names(rows):
+    return [f"{name}:{tag}" for name, tag, *_ in rows]
+
+
+def test_underscore_queries_match_literally(index):
+    assert names(index.search("q4_k")) == ["qwen2.5:7b-instruct-q4_K_M"]
+    assert names(index.search("nomic_embed")) == ["nomic_embed:latest"]
+    assert names(index.search("qwen2.5:7b-instruct-q4_k_m")) == ["qwen2.5:7b-instruct-q4_K_M"]
+
+
+def test_percent_queries_match_literally(index):
+    assert names(index.search("100%")) == ["llama3:8b-100%"]
+
+
+def test_prefix_matches_rank_before_fuzzy_matches(index):
+    assert names(index.search("nomic"))[:2] == ["nomic_embed:latest", "nomicembed:latest"]
+    assert "qwen2.5:7b-instruct-q4_K_M" in names(index.search("qwn"))
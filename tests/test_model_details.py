@@ -0,0 +1,56 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+
+from local import model_registry, ollama_model_details
+from local.model_registry import ModelRegistry
+from local.ollama_model_details import ModelDetailsCache
+
+MODELS = {"models": [
+    {"name": "mapler/gpt2:latest", "digest": "a" * 64, "details": {}},
+    {"name": "qwen2.5:7b", "digest": "b" * 64, "details": {}},
+]}
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = ModelRegistry()
+    monkeypatch.setattr(model_registry.ollama, "list", lambda: MODELS)
+    monkeypatch.setattr(ollama_model_details, "registry", registry)
+    return registry
+
+
+@pytest.fixture
+def shown(monkeypatch):
+    shown = []
+
+    def show(name):
+        shown.append(name)
+        return {"modelfile": f"FROM {name}", "parameters": "", "template": "", "details": {}}
+
+    monkeypatch.setattr(ollama_model_details.ollama, "show", show)
+    return shown
+
+
+def test_digest_matches_untagged_names(registry):
+    assert registry.digest("mapler/gpt2") == "a" * 64
+    assert registry.digest("mapler/gpt2:latest") == "a" * 64
+    assert registry.digest("qwen2.5:7b") == "b" * 64
+    assert registry.digest("qwen2.5") is None
+
+
+@pytest.mark.parametrize("name", ["mapler/gpt2", "qwen2.5:7b"])
+def test_details_are_shown_once_per_digest(registry, shown, tmp_path, name):
+    cache = ModelDetailsCache(str(tmp_path / "model_details.db"))
+    first = cache.get(name)
+    assert cache.get(name) == first
+    assert shown == [name]
+
+    MODELS["models"][0]["digest"] = MODELS["models"][1]["digest"] = "c" * 64
+    try:
+        registry.invalidate()
+        cache.get(name)
+        assert shown == [name, name]
+    finally:
+        MODELS["models"][0]["digest"], MODELS["models"][1]["digest"] = "a" * 64, "b" * 64
+        cache.close()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from providers import rate_limiter
+from providers.rate_limiter import BACKGROUND, INTERACTIVE, ProviderScheduler
+
+
+def test_background_waits_behind_interactive():
+    async def scenario():
+        scheduler = ProviderScheduler("stub", max_concurrency=1)
+        order = []
+        await scheduler.acquire()  # Hold the only slot while both requests queue up
+
+        async def request(name, priority):
+            await scheduler.acquire(priority=priority)
+            order.append(name)
+            await scheduler.release()
+
+        background = asyncio.create_task(request("background", BACKGROUND))
+        await asyncio.sleep(0.01)
+        interactive = asyncio.create_task(request("interactive", INTERACTIVE))
+        await asyncio.sleep(0.01)
+        assert order == []
+        await scheduler.release()
+        await asyncio.gather(background, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "background"]
+
+
+def test_release_refunds_unused_tokens():
+    async def scenario():
+        scheduler = ProviderScheduler("stub", tokens_per_minute=1000)
+        await scheduler.acquire(600)
+        after_acquire = scheduler.tokens.available
+        await scheduler.release(600, used_tokens=100)
+        return after_acquire, scheduler.tokens.available, scheduler.in_flight
+
+    after_acquire, after_release, in_flight = asyncio.run(scenario())
+    assert after_acquire == pytest.approx(400, abs=1)
+    assert after_release == pytest.approx(900, abs=1)
+    assert in_flight == 0
+
+
+def test_token_budget_delays_requests():
+    async def scenario():
+        scheduler = ProviderScheduler("stub", tokens_per_minute=600)  # Refills 10 tokens a second
+        await scheduler.acquire(600)
+        await scheduler.release(600, used_tokens=600)
+        started = time.monotonic()
+        await scheduler.acquire(2)
+        return time.monotonic() - started
+
+    assert 0.15 <= asyncio.run(scenario()) < 1
+
+
+class RateLimitedHandler(BaseHTTPRequestHandler):
+    """Answers the first completion with a 429 and Retry-After, then streams a reply."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.server.request_times.append(time.monotonic())
+        if len(self.server.request_times) == 1:
+            body = json.dumps({"error": {"message": "Rate limit reached", "type": "rate_limit_exceeded"}}).encode()
+            self.send_response(429)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("retry-after", "0.3")
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        chunk = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": 0, "model": "stub-model",
+                 "choices": [{"index": 0, "delta": {"role": "assistant", "content": "Hello"},
+                              "finish_reason": None}]}
+        body = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("x-ratelimit-limit-requests", "60")
+        self.send_header("x-ratelimit-remaining-requests", "59")
+        self.send_header("x-ratelimit-reset-requests", "1s")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RateLimitedHandler)
+    server.daemon_threads = True
+    server.request_times = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_open_stream_retries_after_429(stub_server, monkeypatch):
+    pytest.importorskip("PyQt5")
+    pytest.importorskip("openai")
+    from providers.openai import OpenAIChatbot
+
+    class StubChatbot(OpenAIChatbot):
+        provider = "Stub"
+
+    monkeypatch.setattr(rate_limiter, "BACKOFF_BASE", 0.01)
+    chatbot = StubChatbot("stub-model", base_url=f"http://127.0.0.1:{stub_server.server_address[1]}/v1",
+                          api_key="test")
+    chatbot.run_chatbot("Hi")
+
+    assert chatbot.last_error is None
+    assert chatbot.messages[-1] == {"role": "assistant", "content": "Hello"}
+    first, second = stub_server.request_times
+    assert second - first >= 0.3  # Waited out Retry-After
+    scheduler = rate_limiter.get_scheduler("Stub")
+    assert scheduler.rate_limited == 1
+    assert scheduler.in_flight == 0
+    assert scheduler.requests.limit == 60
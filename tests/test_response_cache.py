@@ -0,0 +1,33 @@
+from database.response_cache import ResponseCache
+
+TOOL_TURN = [
+    {"role": "user", "content": "Weather in Oslo?"},
+    {"role": "assistant", "content": None,
+     "tool_calls": [{"id": "call_1", "type": "function",
+                     "function": {"name": "weather", "arguments": '{"city": "Oslo"}'}}]},
+    {"role": "tool", "tool_call_id": "call_1", "content": "4°C, rain"},
+    {"role": "assistant", "content": "It's 4°C and raining."},
+    {"role": "user", "content": "And tomorrow?"},
+]
+
+
+def test_key_accepts_tool_call_messages_without_content():
+    key = ResponseCache.make_key("OpenAI", "gpt-4", {"temperature": 0}, TOOL_TURN)
+    assert len(key) == 64
+
+
+def test_key_depends_on_tool_calls():
+    other = [dict(message) for message in TOOL_TURN]
+    other[1]["tool_calls"] = [{"id": "call_1", "type": "function",
+                               "function": {"name": "weather", "arguments": '{"city": "Bergen"}'}}]
+    options = {"temperature": 0}
+    assert ResponseCache.make_key("OpenAI", "gpt-4", options, TOOL_TURN) != \
+        ResponseCache.make_key("OpenAI", "gpt-4", options, other)
+
+
+def test_get_returns_stored_reply(tmp_path):
+    cache = ResponseCache(str(tmp_path / "response_cache.db"))
+    key = ResponseCache.make_key("OpenAI", "gpt-4", {"temperature": 0}, TOOL_TURN)
+    cache.set(key, "Sunny.")
+    assert cache.get(key) == "Sunny."
+    cache.close()
@@ -0,0 +1,93 @@
+import asyncio
+import time
+
+from tools.engine import Tool, ToolEngine
+
+PARAMETERS = {"type": "object", "properties": {"delay": {"type": "number"}}}
+
+
+def sleeping_tool(name, calls, ttl=60, timeout=5):
+    async def handler(delay):
+        calls.append(name)
+        await asyncio.sleep(delay)
+        return {"tool": name, "delay": delay}
+    return Tool(name, f"Sleeps, then answers as {name}.", PARAMETERS, handler, timeout=timeout, ttl=ttl)
+
+
+def engine_with(*tools):
+    engine = ToolEngine()
+    for tool in tools:
+        engine.register(tool, enabled=True)
+    return engine
+
+
+def test_calls_run_concurrently():
+    calls = []
+    engine = engine_with(*(sleeping_tool(name, calls, ttl=0) for name in ("a", "b", "c")))
+    finished = []
+
+    started = time.perf_counter()
+    messages = asyncio.run(engine.run_calls(
+        [("1", "a", '{"delay": 0.1}'), ("2", "b", '{"delay": 0.3}'), ("3", "c", '{"delay": 0.2}')],
+        lambda call_id, name, result: finished.append(call_id)))
+    elapsed = time.perf_counter() - started
+
+    assert 0.3 <= elapsed < 0.5  # About the slowest call, not the 0.6s sum
+    assert finished == ["1", "3", "2"]
+    assert [message["tool_call_id"] for message in messages] == ["1", "2", "3"]
+    assert all(message["role"] == "tool" for message in messages)
+
+
+def test_results_are_cached_per_arguments():
+    calls = []
+    engine = engine_with(sleeping_tool("slow", calls))
+
+    first = asyncio.run(engine.execute("slow", '{"delay": 0.2}'))
+    started = time.perf_counter()
+    second = asyncio.run(engine.execute("slow", {"delay": 0.2}))
+    assert time.perf_counter() - started < 0.1
+    assert second == first
+    assert calls == ["slow"]
+
+    asyncio.run(engine.execute("slow", {"delay": 0.01}))
+    assert calls == ["slow", "slow"]
+
+
+def test_uncached_tools_run_every_time():
+    calls = []
+    engine = engine_with(sleeping_tool("fresh", calls, ttl=0))
+    asyncio.run(engine.execute("fresh", {"delay": 0}))
+    asyncio.run(engine.execute("fresh", {"delay": 0}))
+    assert calls == ["fresh", "fresh"]
+
+
+def test_failures_become_error_results():
+    def broken(**arguments):
+        raise RuntimeError("backend down")
+
+    calls = []
+    engine = engine_with(Tool("broken", "Always fails.", PARAMETERS, broken),
+                         sleeping_tool("slow", calls, timeout=0.05), sleeping_tool("fine", calls))
+
+    messages = asyncio.run(engine.run_calls([
+        ("1", "broken", "{}"), ("2", "slow", '{"delay": 1}'), ("3", "fine", '{"delay": 0}'),
+        ("4", "missing", "{}"), ("5", "fine", "{not json"),
+    ]))
+    results = [message["content"] for message in messages]
+
+    assert results[0] == "Error: broken failed: backend down"
+    assert results[1] == "Error: slow timed out after 0.05 seconds"
+    assert '"tool": "fine"' in results[2]
+    assert results[3] == "Error: tool missing is not available"
+    assert results[4].startswith("Error: invalid arguments for fine")
+    assert engine.cache.get(engine.cache.make_key("broken", {})) is None
+
+
+def test_builtin_tools_start_disabled():
+    from tools.builtin import create_tool_engine
+
+    engine = create_tool_engine()
+    assert {"get_date_time", "get_weather", "get_stock_price", "web_search"} <= set(engine.tools)
+    assert engine.tool_specs() == []
+    engine.set_enabled("get_date_time", True)
+    assert [spec["function"]["name"] for spec in engine.tool_specs()] == ["get_date_time"]
@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("PyQt5")
+np = pytest.importorskip("numpy")
+
+from PyQt5.QtCore import QCoreApplication
+from voice_handler.voice_input import FRAME_SIZE, VoiceCaptureThread
+
+
+class FailingTranscriber:
+    """Answers every job with the error the worker process sends when transcription fails."""
+
+    def __init__(self):
+        self.jobs = []
+        self.results = []
+
+    def submit(self, utterance_id, audio, final):
+        self.jobs.append((utterance_id, final))
+        kind = "final" if final else "partial"
+        self.results.append(("error", (kind, utterance_id, "Transcription failed: boom")))
+
+    def poll(self, timeout=None):
+        return self.results.pop(0) if self.results else None
+
+
+class FrameSource:
+    def __init__(self, frames):
+        self.frame_list = frames
+
+    def frames(self):
+        return iter(self.frame_list)
+
+    def stop(self):
+        pass
+
+
+def speech(seconds):
+    return [np.full(FRAME_SIZE, 0.3, dtype=np.float32)] * int(seconds / 0.03)
+
+
+def silence(seconds):
+    return [np.zeros(FRAME_SIZE, dtype=np.float32)] * int(seconds / 0.03)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def qt_application():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+def test_failed_jobs_release_partials_and_finals():
+    transcriber = FailingTranscriber()
+    thread = VoiceCaptureThread(transcriber, FrameSource(silence(1) + speech(2) + silence(1) + speech(2)))
+    errors = []
+    thread.error.connect(errors.append)
+
+    thread.run()
+
+    partials = [utterance_id for utterance_id, final in transcriber.jobs if not final]
+    finals = [utterance_id for utterance_id, final in transcriber.jobs if final]
+    assert len(partials) > 2  # Partials kept coming after the first one failed
+    assert set(partials) == {1, 2}
+    assert finals == [1, 2]
+    assert thread.in_flight == 0
+    assert thread.pending_finals == set()
+    assert errors and set(errors) == {"Transcription failed: boom"}
@@ -0,0 +1,125 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from tools.http_client import get_http_client
+from tools.web_search import PAGE_TEXT_LIMIT, WebSearch
+from utils.helpers import run_coroutine
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the routes in server.routes: path -> (status, html) or a callable returning one."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        self.server.requests.append((parts.path, parse_qs(parts.query), self.client_address[1]))
+        route = self.server.routes.get(parts.path)
+        status, html = route() if callable(route) else route or (404, "Not found")
+        body = html.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except ConnectionError:
+            pass  # The client gave up, e.g. on the slow engine
+
+
+def start_server(routes):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.routes = routes
+    server.requests = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return server
+
+
+def slow_results():
+    time.sleep(1)
+    return 200, "<a href='http://example.com/late'>Too late</a>"
+
+
+@pytest.fixture
+def servers():
+    pages = start_server({
+        "/page/1": (200, "<html><head><script>var tracking = 1;</script></head>"
+                         "<body><nav>Menu</nav><p>First page</p></body></html>"),
+        "/page/2": (200, "<p>" + "long text " * 1000 + "</p>"),
+    })
+    engines = start_server({})
+    engines.routes.update({
+        "/a": (200, f"""<a href="/about">About</a>
+                        <a href="{pages.url}/page/1?utm_source=search">First</a>
+                        <a href="/url?q={pages.url}/page/2">Second</a>
+                        <a href="{pages.url}/page/1">First again</a>"""),
+        "/b": (200, f"""<a href="{pages.url}/page/2">Second</a>
+                        <a href="{pages.url}/page/missing">Missing</a>"""),
+        "/slow": slow_results,
+        "/broken": (500, "Internal error"),
+    })
+    yield engines, pages
+    for server in (engines, pages):
+        server.shutdown()
+        server.server_close()
+
+
+def search_engines(engines):
+    return {name: f"{engines.url}/{name.lower()}?q={{query}}" for name in ("A", "B", "Slow", "Broken")}
+
+
+def test_results_are_merged_and_pages_truncated(servers):
+    engines, pages = servers
+    search = WebSearch(search_engines(engines), engine_timeout=0.3)
+
+    started = time.perf_counter()
+    result = run_coroutine(search.search_and_read("Rust  async")).result(timeout=10)
+    assert time.perf_counter() - started < 0.9  # The slow engine is dropped at its timeout
+
+    assert [(entry["url"], entry["engines"]) for entry in result["results"]] == [
+        (f"{pages.url}/page/2", ["A", "B"]),
+        (f"{pages.url}/page/1?utm_source=search", ["A"]),
+        (f"{pages.url}/page/missing", ["B"]),
+    ]
+    texts = {page["url"]: page["text"] for page in result["pages"]}
+    assert set(texts) == {f"{pages.url}/page/2", f"{pages.url}/page/1?utm_source=search"}
+    assert texts[f"{pages.url}/page/1?utm_source=search"] == "First page"
+    assert len(texts[f"{pages.url}/page/2"]) == PAGE_TEXT_LIMIT
+    assert {query["q"][0] for path, query, _ in engines.requests} == {"Rust  async"}
+
+
+def test_failed_engines_are_skipped(servers, caplog):
+    engines, _ = servers
+    search = WebSearch({name: url for name, url in search_engines(engines).items() if name in ("Slow", "Broken")},
+                       engine_timeout=0.3)
+    with caplog.at_level("WARNING"):
+        assert run_coroutine(search.search("anything")).result(timeout=10) == []
+    assert "Search engine Slow failed: TimeoutError" in caplog.text
+    assert "Search engine Broken failed: HTTPStatusError" in caplog.text
+
+
+def test_repeated_queries_are_cached_and_reuse_connections(servers):
+    engines, _ = servers
+    search = WebSearch({"A": search_engines(engines)["A"]})
+
+    first = run_coroutine(search.search("Python")).result(timeout=10)
+    assert run_coroutine(search.search("  python ")).result(timeout=10) == first
+    assert len(engines.requests) == 1
+
+    other = WebSearch({"A": search_engines(engines)["A"]})
+    for query in ("one", "two", "three"):
+        run_coroutine(other.search(query)).result(timeout=10)
+    assert get_http_client() is get_http_client()
+    ports = {port for _, _, port in engines.requests}
+    assert len(engines.requests) == 4
+    assert len(ports) == 1  # Sequential requests share one pooled keep-alive connection
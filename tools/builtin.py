@@ -0,0 +1,60 @@
+import datetime
+from tools.engine import Tool, ToolEngine
+from tools.http_client import get_http_client
+from tools.web_search import WebSearch
+
+
+def get_date_time(timezone=None):
+    now = datetime.datetime.now().astimezone()
+    return {"date": now.strftime("%Y-%m-%d"), "time": now.strftime("%H:%M:%S"),
+            "weekday": now.strftime("%A"), "timezone": str(now.tzinfo)}
+
+
+async def get_weather(location):
+    client = get_http_client()
+    response = await client.get("https://geocoding-api.open-meteo.com/v1/search",
+                                params={"name": location, "count": 1})
+    response.raise_for_status()
+    places = response.json().get("results") or []
+    if not places:
+        return f"No location found for {location}"
+    place = places[0]
+    response = await client.get("https://api.open-meteo.com/v1/forecast",
+                                params={"latitude": place["latitude"], "longitude": place["longitude"],
+                                        "current_weather": "true"})
+    response.raise_for_status()
+    return {"location": f"{place['name']}, {place.get('country', '')}".strip(", "),
+            **response.json().get("current_weather", {})}
+
+
+async def get_stock_price(symbol):
+    response = await get_http_client().get(f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}",
+                                           params={"range": "1d", "interval": "1d"})
+    response.raise_for_status()
+    meta = response.json()["chart"]["result"][0]["meta"]
+    return {"symbol": meta.get("symbol", symbol), "price": meta.get("regularMarketPrice"),
+            "previous_close": meta.get("chartPreviousClose"), "currency": meta.get("currency")}
+
+
+BUILTIN_TOOLS = [
+    Tool("get_date_time", "Get the current local date, time and weekday.",
+         {"type": "object", "properties": {}}, get_date_time, timeout=2, ttl=0),
+    Tool("get_weather", "Get the current weather for a city or place.",
+         {"type": "object", "properties": {"location": {"type": "string", "description": "City or place name"}},
+          "required": ["location"]},
+         get_weather, timeout=10, ttl=600),
+    Tool("get_stock_price", "Get the latest market price for a stock ticker symbol.",
+         {"type": "object", "properties": {"symbol": {"type": "string", "description": "Ticker, e.g. AAPL"}},
+          "required": ["symbol"]},
+         get_stock_price, timeout=10, ttl=60),
+]
+
+
+def create_tool_engine():
+    web_search = WebSearch()
+    return ToolEngine(BUILTIN_TOOLS + [
+        Tool("web_search", "Search the web with several engines at once and read the top pages.",
+             {"type": "object", "properties": {"query": {"type": "string", "description": "Search query"}},
+              "required": ["query"]},
+             web_search.search_and_read, timeout=20, ttl=0),  # WebSearch caches by normalized query
+    ])
@@ -0,0 +1,148 @@
+import asyncio
+import inspect
+import json
+import logging
+import threading
+import time
+
+DEFAULT_TIMEOUT = 15.0
+DEFAULT_TTL = 300
+
+
+class Tool:
+    """A function the model can call, with its own timeout and result TTL."""
+
+    def __init__(self, name, description, parameters, handler, timeout=DEFAULT_TIMEOUT, ttl=DEFAULT_TTL):
+        self.name = name
+        self.description = description
+        self.parameters = parameters
+        self.handler = handler  # async or plain callable taking the call's arguments
+        self.timeout = timeout
+        self.ttl = ttl  # 0 disables caching, e.g. for tools with side effects
+
+    def spec(self):
+        """The OpenAI function-calling schema for this tool."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters,
+            },
+        }
+
+    async def call(self, arguments):
+        if inspect.iscoroutinefunction(self.handler):
+            return await self.handler(**arguments)
+        return await asyncio.to_thread(self.handler, **arguments)
+
+
+class ToolResultCache:
+    """In-memory tool results keyed by tool name and arguments."""
+
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(name, arguments):
+        return name, json.dumps(arguments, sort_keys=True)
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            return result
+
+    def set(self, key, result, ttl):
+        with self.lock:
+            if len(self.entries) >= self.max_entries:
+                now = time.monotonic()
+                self.entries = {k: v for k, v in self.entries.items() if v[0] >= now}
+                if len(self.entries) >= self.max_entries:
+                    self.entries.pop(next(iter(self.entries)))
+            self.entries[key] = (time.monotonic() + ttl, result)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class ToolEngine:
+    """Runs the tool calls of one model turn concurrently on the shared event loop."""
+
+    def __init__(self, tools=None):
+        self.tools = {}
+        self.enabled = set()
+        self.cache = ToolResultCache()
+        for tool in tools or []:
+            self.register(tool)
+
+    def register(self, tool, enabled=False):
+        self.tools[tool.name] = tool
+        if enabled:
+            self.enabled.add(tool.name)
+
+    def set_enabled(self, name, enabled):
+        if name not in self.tools:
+            return
+        if enabled:
+            self.enabled.add(name)
+        else:
+            self.enabled.discard(name)
+
+    def tool_specs(self):
+        """Schemas of the enabled tools, for the `tools` request parameter."""
+        return [self.tools[name].spec() for name in sorted(self.enabled)]
+
+    async def execute(self, name, arguments):
+        """Run one tool call and return its result as text; errors become the result."""
+        tool = self.tools.get(name)
+        if tool is None or name not in self.enabled:
+            return f"Error: tool {name} is not available"
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except json.JSONDecodeError as e:
+                return f"Error: invalid arguments for {name}: {e}"
+
+        key = self.cache.make_key(name, arguments)
+        if tool.ttl:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            result = await asyncio.wait_for(tool.call(arguments), tool.timeout)
+        except asyncio.TimeoutError:
+            logging.warning(f"Tool {name} timed out after {tool.timeout}s")
+            return f"Error: {name} timed out after {tool.timeout:g} seconds"
+        except Exception as e:
+            logging.error(f"Tool {name} failed: {e}")
+            return f"Error: {name} failed: {e}"
+
+        if not isinstance(result, str):
+            result = json.dumps(result, ensure_ascii=False, default=str)
+        if tool.ttl:
+            self.cache.set(key, result, tool.ttl)
+        return result
+
+    async def run_calls(self, calls, on_result=None):
+        """Run (call_id, name, arguments) tuples concurrently.
+
+        on_result(call_id, name, result) is called as each call finishes, so
+        fast tools are shown without waiting for slow ones. Returns the tool
+        messages in the order of the calls.
+        """
+        async def run(call_id, name, arguments):
+            result = await self.execute(name, arguments)
+            if on_result:
+                on_result(call_id, name, result)
+            return {"role": "tool", "tool_call_id": call_id, "content": result}
+
+        return await asyncio.gather(*(run(*call) for call in calls))
@@ -0,0 +1,16 @@
+import httpx
+
+HTTP_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+POOL_LIMITS = httpx.Limits(max_connections=40, max_keepalive_connections=20)
+USER_AGENT = "Mozilla/5.0 (compatible; SuperNova-Desktop)"
+
+_http_client = None
+
+
+def get_http_client():
+    """A pooled client for tool backends, used from the shared event loop."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT, limits=POOL_LIMITS,
+                                         headers={"User-Agent": USER_AGENT}, follow_redirects=True)
+    return _http_client
@@ -0,0 +1,251 @@
+"""Web search across the engines in tools/search_engines.json.
+
+Each entry maps an engine name to its domain, or to {"url": "...{query}..."}
+for engines without a built-in search URL (including local stub servers).
+All engines are queried at once; their links are deduplicated and ranked by
+reciprocal rank fusion, then the top pages are fetched in parallel.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from html.parser import HTMLParser
+from urllib.parse import quote_plus, urlsplit, urlunsplit, parse_qsl, urlencode
+from tools.engine import ToolResultCache
+from tools.http_client import get_http_client
+
+ENGINES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_engines.json")
+
+SEARCH_URLS = {
+    "Google": "https://www.google.com/search?q={query}",
+    "Bing": "https://www.bing.com/search?q={query}",
+    "Yahoo": "https://search.yahoo.com/search?p={query}",
+    "DuckDuckGo": "https://html.duckduckgo.com/html/?q={query}",
+    "Ask": "https://www.ask.com/web?q={query}",
+    "AOL": "https://search.aol.com/aol/search?q={query}",
+    "Baidu": "https://www.baidu.com/s?wd={query}",
+    "Ecosia": "https://www.ecosia.org/search?q={query}",
+    "Yandex": "https://yandex.com/search/?text={query}",
+    "StartPage": "https://www.startpage.com/do/search?q={query}",
+}
+
+ENGINE_TIMEOUT = 5.0
+PAGE_TIMEOUT = 5.0
+RESULTS_PER_ENGINE = 10
+MAX_RESULTS = 10
+PAGES_TO_READ = 3
+PAGE_TEXT_LIMIT = 4000
+CACHE_TTL = 900
+RRF_K = 60
+
+# Query parameters that carry the real target of an engine's redirect link
+REDIRECT_PARAMS = ("uddg", "q", "u", "url", "RU")
+TRACKING_PARAMS = re.compile(r"^(utm_|fbclid$|gclid$|ref$)")
+
+
+def load_engines(path=ENGINES_FILE):
+    """Return {engine name: search URL template} for the usable engines."""
+    with open(path, 'r', encoding='utf-8') as file:
+        config = json.load(file)
+    engines = {}
+    for name, value in config.items():
+        template = value.get("url") if isinstance(value, dict) else SEARCH_URLS.get(name)
+        if template:
+            engines[name] = template
+    return engines
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def normalize_url(url):
+    """Canonical form used to spot the same page found by different engines."""
+    parts = urlsplit(url)
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    params = [(key, value) for key, value in parse_qsl(parts.query) if not TRACKING_PARAMS.match(key)]
+    return urlunsplit(("https" if parts.scheme in ("http", "https") else parts.scheme,
+                       host, parts.path.rstrip("/"), urlencode(params), ""))
+
+
+def unwrap_link(href, engine_host):
+    """Resolve an engine's redirect link to the target, or None for the engine's own pages."""
+    if href.startswith("//"):
+        href = "https:" + href
+    parts = urlsplit(href)
+    if not parts.scheme:
+        # Relative links are the engine's own; some carry the target in a parameter
+        params = dict(parse_qsl(parts.query))
+        target = next((params[key] for key in REDIRECT_PARAMS if params.get(key, "").startswith("http")), None)
+        return target
+    if parts.scheme not in ("http", "https"):
+        return None
+    host = parts.netloc.lower()
+    hostname = host.split(":")[0]
+    if engine_host and (host == engine_host or hostname == engine_host or hostname.endswith("." + engine_host)):
+        params = dict(parse_qsl(parts.query))
+        return next((params[key] for key in REDIRECT_PARAMS if params.get(key, "").startswith("http")), None)
+    return href
+
+
+def _engine_host(netloc):
+    """The engine's domain, or host:port for local servers so other ports still count as results."""
+    netloc = netloc.lower()
+    host = netloc.split(":")[0]
+    if host == "localhost" or host.replace(".", "").isdigit():
+        return netloc
+    return ".".join(host.split(".")[-2:])
+
+
+class LinkParser(HTMLParser):
+    """Collects (href, text) of anchors from a results page."""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+        self.href = None
+        self.text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self.href = dict(attrs).get("href")
+            self.text = []
+
+    def handle_data(self, data):
+        if self.href is not None:
+            self.text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self.href is not None:
+            self.links.append((self.href, " ".join("".join(self.text).split())))
+            self.href = None
+
+
+class TextParser(HTMLParser):
+    """Visible text of a page, without scripts, styles and navigation."""
+
+    SKIP_TAGS = {"script", "style", "noscript", "nav", "header", "footer", "svg"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.skipping = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self.skipping += 1
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self.skipping:
+            self.skipping -= 1
+
+    def handle_data(self, data):
+        if not self.skipping and data.strip():
+            self.parts.append(data.strip())
+
+
+def parse_results(html, engine_url):
+    """Outbound result links of a results page, in page order."""
+    engine_host = _engine_host(urlsplit(engine_url).netloc)
+    parser = LinkParser()
+    parser.feed(html)
+    results = []
+    seen = set()
+    for href, title in parser.links:
+        url = unwrap_link(href, engine_host) if href else None
+        if not url or not title:
+            continue
+        key = normalize_url(url)
+        if key in seen:
+            continue
+        seen.add(key)
+        results.append({"url": url, "title": title})
+        if len(results) >= RESULTS_PER_ENGINE:
+            break
+    return results
+
+
+def merge_results(ranked_lists):
+    """Deduplicate results across engines, ranking by reciprocal rank fusion."""
+    merged = {}
+    for engine, results in ranked_lists.items():
+        for rank, result in enumerate(results):
+            key = normalize_url(result["url"])
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {"url": result["url"], "title": result["title"], "engines": [], "score": 0.0}
+            entry["engines"].append(engine)
+            entry["score"] += 1.0 / (RRF_K + rank + 1)
+    return sorted(merged.values(), key=lambda entry: entry["score"], reverse=True)
+
+
+class WebSearch:
+    """Concurrent multi-engine search with a TTL cache keyed by normalized query."""
+
+    def __init__(self, engines=None, engine_timeout=ENGINE_TIMEOUT, cache_ttl=CACHE_TTL):
+        self.engines = engines if engines is not None else load_engines()
+        self.engine_timeout = engine_timeout
+        self.cache_ttl = cache_ttl
+        self.cache = ToolResultCache()
+
+    async def query_engine(self, name, template, query):
+        url = template.format(query=quote_plus(query))
+        response = await asyncio.wait_for(get_http_client().get(url), self.engine_timeout)
+        response.raise_for_status()
+        return parse_results(response.text, url)
+
+    async def search(self, query, max_results=MAX_RESULTS):
+        """Merged results from every engine that answers within the engine timeout."""
+        key = ("search", normalize_query(query))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached[:max_results]
+
+        started = time.perf_counter()
+        names = list(self.engines)
+        responses = await asyncio.gather(*(self.query_engine(name, self.engines[name], query) for name in names),
+                                         return_exceptions=True)
+        ranked_lists = {}
+        for name, response in zip(names, responses):
+            if isinstance(response, BaseException):
+                logging.warning(f"Search engine {name} failed: {type(response).__name__}: {response}")
+            elif response:
+                ranked_lists[name] = response
+        results = merge_results(ranked_lists)
+        logging.info(f"Web search: {len(results)} results from {len(ranked_lists)}/{len(names)} engines "
+                     f"in {time.perf_counter() - started:.2f}s")
+        if results:
+            self.cache.set(key, results, self.cache_ttl)
+        return results[:max_results]
+
+    async def fetch_page(self, url):
+        key = ("page", normalize_url(url))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        response = await asyncio.wait_for(get_http_client().get(url), PAGE_TIMEOUT)
+        response.raise_for_status()
+        parser = TextParser()
+        parser.feed(response.text)
+        text = " ".join(parser.parts)[:PAGE_TEXT_LIMIT]
+        self.cache.set(key, text, self.cache_ttl)
+        return text
+
+    async def fetch_pages(self, urls):
+        """Page texts for the given URLs, fetched in parallel; failures are skipped."""
+        texts = await asyncio.gather(*(self.fetch_page(url) for url in urls), return_exceptions=True)
+        return [{"url": url, "text": text} for url, text in zip(urls, texts)
+                if not isinstance(text, BaseException) and text]
+
+    async def search_and_read(self, query, pages=PAGES_TO_READ):
+        """The web_search tool: merged results plus the text of the top pages to summarize."""
+        results = await self.search(query)
+        return {
+            "results": [{"title": result["title"], "url": result["url"], "engines": result["engines"]}
+                        for result in results],
+            "pages": await self.fetch_pages([result["url"] for result in results[:pages]]),
+        }
@@ -0,0 +1,37 @@
+import importlib
+import json
+import os
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_FILE = os.path.join(ROOT_DIR, "providers", "models.json")
+
+# Provider dropdown name -> (module, class). Imported lazily so a missing SDK
+# only matters for the provider that needs it.
+CHATBOT_CLASSES = {
+    "Ollama": ("local.ollama", "OllamaChatbot"),
+    "OpenAI": ("providers.openai", "OpenAIChatbot"),
+    "Groq": ("providers.groq", "GroqChatbot"),
+    "TogetherAI": ("providers.togetherai", "TogetherAIChatbot"),
+    "DeepSeek": ("providers.deepseek", "DeepSeekChatbot"),
+}
+
+LOCAL_PROVIDERS = {"Ollama"}
+
+# providers/models.json predates the dropdown names
+MODELS_FILE_KEYS = {"TogetherAI": "Together"}
+
+
+def load_provider_models(provider):
+    """Return the known model names for a provider from providers/models.json."""
+    with open(MODELS_FILE, 'r') as file:
+        data = json.load(file)
+    return data.get(MODELS_FILE_KEYS.get(provider, provider), [])
+
+
+def create_chatbot(provider, model, **kwargs):
+    """Instantiate the chatbot class behind a provider dropdown entry."""
+    if provider not in CHATBOT_CLASSES:
+        raise ValueError(f"Provider {provider} is not supported.")
+    module_name, class_name = CHATBOT_CLASSES[provider]
+    chatbot_class = getattr(importlib.import_module(module_name), class_name)
+    return chatbot_class(model, **kwargs)
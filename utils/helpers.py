@@ -0,0 +1,48 @@
+import asyncio
+import threading
+import time
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop():
+    """Return the shared background asyncio loop, starting it on first use."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=_loop.run_forever, name="supernova-async", daemon=True)
+            thread.start()
+    return _loop
+
+
+def run_coroutine(coro):
+    """Schedule a coroutine on the shared loop and return a concurrent Future."""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+class StreamStats:
+    """Track latency and throughput of a streamed generation."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at = None
+        self.tokens = 0
+
+    def on_token(self):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.tokens += 1
+
+    def finish(self):
+        """Return the summary dict once the stream has ended."""
+        finished = time.perf_counter()
+        first = self.first_token_at or finished
+        generation_time = finished - first
+        return {
+            "first_token_latency": first - self.started,
+            "total_latency": finished - self.started,
+            "tokens": self.tokens,
+            "tokens_per_sec": self.tokens / generation_time if generation_time > 0 else 0.0,
+        }
@@ -0,0 +1,367 @@
+"""Streaming speech-to-text for the input box.
+
+Audio from the microphone (or a WAV file) is written into a ring buffer and
+split into utterances by an energy-based voice activity detector. While the
+user speaks, the growing utterance is re-transcribed in a worker process to
+show partial text; when they pause, the utterance is transcribed once more
+as final text.
+
+    python -m voice_handler.voice_input recording.wav
+"""
+import logging
+import multiprocessing
+import queue
+import sys
+import time
+import wave
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SAMPLE_RATE = 16000
+FRAME_SIZE = SAMPLE_RATE * 30 // 1000  # 30 ms frames
+DEFAULT_MODEL = "tiny.en"
+PRE_ROLL_SECONDS = 0.3
+SILENCE_SECONDS = 0.3
+PARTIAL_INTERVAL = 0.5
+MAX_UTTERANCE_SECONDS = 25
+RESULT_TIMEOUT = 10
+
+
+class RingBuffer:
+    """Fixed-size audio buffer addressed by absolute sample positions."""
+
+    def __init__(self, seconds=30, sample_rate=SAMPLE_RATE):
+        self.data = np.zeros(int(seconds * sample_rate), dtype=np.float32)
+        self.written = 0
+
+    def write(self, samples):
+        size = len(self.data)
+        count = len(samples)
+        if count > size:
+            self.written += count - size
+            samples = samples[-size:]
+            count = size
+        start = self.written % size
+        split = min(count, size - start)
+        self.data[start:start + split] = samples[:split]
+        self.data[:count - split] = samples[split:]
+        self.written += count
+
+    def read(self, start, end=None):
+        """Samples from start to end, clamped to what is still buffered."""
+        size = len(self.data)
+        end = self.written if end is None else min(end, self.written)
+        start = max(start, self.written - size, 0)
+        if start >= end:
+            return np.zeros(0, dtype=np.float32)
+        first, last = start % size, end % size
+        if first < last:
+            return self.data[first:last].copy()
+        return np.concatenate((self.data[first:], self.data[:last]))
+
+
+class EnergyVAD:
+    """Frame-level speech detector: RMS energy well above an adaptive noise floor."""
+
+    def __init__(self, ratio=3.0, min_energy=0.005):
+        self.ratio = ratio
+        self.min_energy = min_energy
+        self.noise_floor = min_energy
+
+    def is_speech(self, frame):
+        energy = float(np.sqrt(np.mean(frame * frame))) if len(frame) else 0.0
+        speech = energy > max(self.min_energy, self.noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * energy
+        return speech
+
+
+class WavSource:
+    """Frames from a WAV file, optionally paced like a live microphone."""
+
+    def __init__(self, path, realtime=False):
+        self.path = path
+        self.realtime = realtime
+        self.stopped = False
+
+    def frames(self):
+        with wave.open(self.path, 'rb') as wav:
+            rate = wav.getframerate()
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            raw = wav.readframes(wav.getnframes())
+        dtype = {1: np.uint8, 2: np.int16, 4: np.int32}[width]
+        audio = np.frombuffer(raw, dtype=dtype).astype(np.float32)
+        if width == 1:
+            audio = (audio - 128) / 128
+        else:
+            audio /= float(2 ** (8 * width - 1))
+        if channels > 1:
+            audio = audio.reshape(-1, channels).mean(axis=1)
+        if rate != SAMPLE_RATE:
+            positions = np.arange(0, len(audio), rate / SAMPLE_RATE)
+            audio = np.interp(positions, np.arange(len(audio)), audio).astype(np.float32)
+
+        for start in range(0, len(audio), FRAME_SIZE):
+            if self.stopped:
+                break
+            if self.realtime:
+                time.sleep(FRAME_SIZE / SAMPLE_RATE)
+            yield audio[start:start + FRAME_SIZE]
+
+    def stop(self):
+        self.stopped = True
+
+
+class MicrophoneSource:
+    """Frames from the default input device via sounddevice."""
+
+    def __init__(self):
+        self.frames_queue = queue.Queue()
+        self.stopped = False
+
+    def frames(self):
+        import sounddevice
+
+        def callback(indata, frame_count, time_info, status):
+            self.frames_queue.put(indata[:, 0].copy())
+
+        with sounddevice.InputStream(samplerate=SAMPLE_RATE, channels=1, dtype='float32',
+                                     blocksize=FRAME_SIZE, callback=callback):
+            while not self.stopped:
+                try:
+                    yield self.frames_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+    def stop(self):
+        self.stopped = True
+
+
+def transcription_worker(model_name, language, requests, results):
+    """Worker process loop: loads the model once and transcribes queued utterances."""
+    try:
+        from faster_whisper import WhisperModel
+        model = WhisperModel(model_name, device="cpu", compute_type="int8")
+    except Exception as e:
+        results.put(("error", (None, None, f"Could not load speech model {model_name}: {e}")))
+        return
+    results.put(("ready", None))
+
+    while True:
+        jobs = [requests.get()]
+        while True:
+            try:
+                jobs.append(requests.get_nowait())
+            except queue.Empty:
+                break
+        if None in jobs:
+            break
+        # A partial is stale once anything newer for its utterance is queued
+        latest = {utterance_id: index for index, (utterance_id, _, _) in enumerate(jobs)}
+        for index, (utterance_id, audio, final) in enumerate(jobs):
+            if not final and latest[utterance_id] != index:
+                results.put(("skipped", utterance_id))
+                continue
+            kind = "final" if final else "partial"
+            try:
+                segments, _ = model.transcribe(audio, language=language, beam_size=1,
+                                               without_timestamps=True, condition_on_previous_text=False)
+                text = " ".join(segment.text.strip() for segment in segments).strip()
+                results.put((kind, (utterance_id, text)))
+            except Exception as e:
+                results.put(("error", (kind, utterance_id, f"Transcription failed: {e}")))
+
+
+class Transcriber:
+    """A speech model kept warm in a separate process between recordings."""
+
+    def __init__(self, model_name=DEFAULT_MODEL, language="en"):
+        self.model_name = model_name
+        self.language = language
+        self.process = None
+        self.requests = None
+        self.results = None
+
+    def start(self):
+        if self.process is not None and self.process.is_alive():
+            return
+        context = multiprocessing.get_context("spawn")
+        self.requests = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(target=transcription_worker,
+                                       args=(self.model_name, self.language, self.requests, self.results),
+                                       daemon=True)
+        self.process.start()
+
+    def submit(self, utterance_id, audio, final):
+        self.requests.put((utterance_id, audio, final))
+
+    def poll(self, timeout=None):
+        """Next (kind, payload) result, or None if nothing arrived in time."""
+        try:
+            return self.results.get(timeout=timeout) if timeout else self.results.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        if self.process is not None and self.process.is_alive():
+            self.requests.put(None)
+            self.process.join(timeout=2)
+        self.process = None
+
+
+class VoiceCaptureThread(QThread):
+    """Segments audio into utterances and streams their transcripts."""
+    partial_text = pyqtSignal(str)
+    final_text = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, transcriber, source):
+        super().__init__()
+        self.transcriber = transcriber
+        self.source = source
+        self.buffer = RingBuffer(MAX_UTTERANCE_SECONDS + 5)
+        self.vad = EnergyVAD()
+        self.utterance_id = 0
+        self.utterance_start = None
+        self.speech_frames = 0
+        self.silent_frames = 0
+        self.last_partial = 0
+        self.in_flight = 0
+        self.pending_finals = set()
+
+    def run(self):
+        try:
+            for frame in self.source.frames():
+                self.buffer.write(frame)
+                self.process_frame(frame)
+                self.drain_results()
+            if self.utterance_start is not None:
+                self.finish_utterance()
+            # Wait for the last utterances so stopping never loses words
+            deadline = time.monotonic() + RESULT_TIMEOUT
+            while self.pending_finals and time.monotonic() < deadline:
+                self.handle_result(self.transcriber.poll(timeout=0.1))
+        except Exception as e:
+            logging.error(f"Voice input failed: {e}")
+            self.error.emit(f"Voice input failed: {e}")
+
+    def process_frame(self, frame):
+        silence_limit = int(SILENCE_SECONDS * SAMPLE_RATE / FRAME_SIZE)
+        if self.vad.is_speech(frame):
+            self.speech_frames += 1
+            self.silent_frames = 0
+            if self.utterance_start is None and self.speech_frames >= 2:
+                self.utterance_id += 1
+                self.utterance_start = self.buffer.written - int((PRE_ROLL_SECONDS * SAMPLE_RATE))
+                self.last_partial = self.buffer.written
+        else:
+            self.speech_frames = 0
+            self.silent_frames += 1
+
+        if self.utterance_start is None:
+            return
+        length = self.buffer.written - self.utterance_start
+        if self.silent_frames >= silence_limit or length >= MAX_UTTERANCE_SECONDS * SAMPLE_RATE:
+            self.finish_utterance()
+        elif self.in_flight == 0 and self.buffer.written - self.last_partial >= PARTIAL_INTERVAL * SAMPLE_RATE:
+            # Only one partial at a time, so partials never delay the final transcript
+            self.last_partial = self.buffer.written
+            self.in_flight += 1
+            self.transcriber.submit(self.utterance_id, self.buffer.read(self.utterance_start), False)
+
+    def finish_utterance(self):
+        self.transcriber.submit(self.utterance_id, self.buffer.read(self.utterance_start), True)
+        self.pending_finals.add(self.utterance_id)
+        self.utterance_start = None
+        self.silent_frames = 0
+
+    def drain_results(self):
+        result = self.transcriber.poll()
+        while result is not None:
+            self.handle_result(result)
+            result = self.transcriber.poll()
+
+    def handle_result(self, result):
+        if result is None:
+            return
+        kind, payload = result
+        if kind == "error":
+            # (job kind, utterance id, message); the job fields are None when the model failed to load
+            job, utterance_id, message = payload
+            if job == "partial":
+                self.in_flight = max(0, self.in_flight - 1)
+            elif job == "final":
+                self.pending_finals.discard(utterance_id)
+            self.error.emit(message)
+        elif kind == "skipped":
+            self.in_flight = max(0, self.in_flight - 1)
+        elif kind == "partial":
+            self.in_flight = max(0, self.in_flight - 1)
+            utterance_id, text = payload
+            if utterance_id not in self.pending_finals and utterance_id == self.utterance_id and text:
+                self.partial_text.emit(text)
+        elif kind == "final":
+            utterance_id, text = payload
+            self.pending_finals.discard(utterance_id)
+            self.final_text.emit(text)
+
+    def stop(self):
+        self.source.stop()
+
+
+class VoiceInput(QObject):
+    """Push-to-talk style controller used by the main window's voice button."""
+    partial_text = pyqtSignal(str)
+    final_text = pyqtSignal(str)
+    error = pyqtSignal(str)
+    stopped = pyqtSignal()
+
+    def __init__(self, parent=None, model_name=DEFAULT_MODEL, language="en"):
+        super().__init__(parent)
+        self.transcriber = Transcriber(model_name, language)
+        self.thread = None
+
+    def is_listening(self):
+        return self.thread is not None and self.thread.isRunning()
+
+    def start(self, source=None):
+        if np is None:
+            self.error.emit("Voice input needs numpy, sounddevice and faster-whisper installed")
+            return
+        if self.is_listening():
+            return
+        self.transcriber.start()
+        self.thread = VoiceCaptureThread(self.transcriber, source or MicrophoneSource())
+        self.thread.partial_text.connect(self.partial_text)
+        self.thread.final_text.connect(self.final_text)
+        self.thread.error.connect(self.error)
+        self.thread.finished.connect(self.stopped)
+        self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.thread.stop()
+
+    def shutdown(self):
+        self.stop()
+        if self.thread is not None:
+            self.thread.wait()
+        self.transcriber.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+    transcriber = Transcriber()
+    transcriber.start()
+    capture = VoiceCaptureThread(transcriber, WavSource(sys.argv[1]))
+    capture.partial_text.connect(lambda text: logging.info(f"... {text}"))
+    capture.final_text.connect(lambda text: logging.info(f"final: {text}"))
+    capture.run()
+    transcriber.close()